@@ -0,0 +1,359 @@
+"""Throughput and latency benchmark for the code runner.
+
+Run from the backend directory::
+
+    python -m benchmarks.code_runner_benchmark run --submissions 40 --concurrency 4 --output before.json
+    python -m benchmarks.code_runner_benchmark compare before.json after.json
+
+Every workload is measured through the direct path (``run_solution`` /
+``run_program`` from a thread pool) and/or the queued path
+(``run_in_runner_slot`` from ``task_execution_service``). The JSON report
+holds submissions/sec, latency percentiles, spawn overhead and peak memory
+per configuration, plus the runner settings it was taken with.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+from models.task import TaskTestCase
+from services import code_runner_service
+from services.code_runner_harness import find_node_binary
+from services.code_runner_service import (
+    run_program,
+    run_solution,
+    shutdown_runner_pool,
+    start_runner_pool,
+)
+from services.task_execution_service import (
+    RUN_CONCURRENCY_ADAPTIVE,
+    RUN_CONCURRENCY_MAX,
+    run_in_runner_slot,
+    runner_scheduler,
+)
+
+
+PATHS = ["direct", "queued"]
+
+
+@dataclass
+class Workload:
+    name: str
+    language: str
+    code: str
+    tests: List[TaskTestCase] = field(default_factory=list)
+    mode: str = "solution"
+
+
+def build_cases(pairs: list[tuple[str, str]]) -> List[TaskTestCase]:
+    return [TaskTestCase(input_data=input_data, expected_output=expected) for input_data, expected in pairs]
+
+
+SUM_CASES = build_cases([(f"{value} {value + 1}", str(2 * value + 1)) for value in range(5)])
+
+WORKLOADS = {
+    "python_trivial": Workload(
+        "python_trivial",
+        "python",
+        "a, b = map(int, input().split())\nprint(a + b)\n",
+        SUM_CASES,
+    ),
+    "python_cpu": Workload(
+        "python_cpu",
+        "python",
+        "a, b = map(int, input().split())\ntotal = 0\nfor i in range(300000):\n    total += i % 7\nprint(a + b)\n",
+        SUM_CASES,
+    ),
+    "python_timeout": Workload(
+        "python_timeout",
+        "python",
+        "while True:\n    pass\n",
+        SUM_CASES[:1],
+    ),
+    "python_big_output": Workload(
+        "python_big_output",
+        "python",
+        "for i in range(200000):\n    print(i)\n",
+        mode="program",
+    ),
+    "javascript_trivial": Workload(
+        "javascript_trivial",
+        "javascript",
+        'const [a, b] = require("fs").readFileSync(0, "utf8").trim().split(" ").map(Number);\nconsole.log(a + b);\n',
+        SUM_CASES,
+    ),
+    "javascript_cpu": Workload(
+        "javascript_cpu",
+        "javascript",
+        'const [a, b] = require("fs").readFileSync(0, "utf8").trim().split(" ").map(Number);\n'
+        "let total = 0;\nfor (let i = 0; i < 3000000; i++) total += i % 7;\nconsole.log(a + b);\n",
+        SUM_CASES,
+    ),
+    "javascript_timeout": Workload(
+        "javascript_timeout",
+        "javascript",
+        "while (true) {}\n",
+        SUM_CASES[:1],
+    ),
+    "javascript_big_output": Workload(
+        "javascript_big_output",
+        "javascript",
+        "for (let i = 0; i < 200000; i++) console.log(i);\n",
+        mode="program",
+    ),
+}
+EMPTY_PROGRAMS = {"python": "pass\n", "javascript": ";\n"}
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile; 0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def get_children_peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def execute_workload(workload: Workload, timeout_seconds: int) -> dict:
+    """Run one submission and return its latency and per-test peak memory."""
+    started_at = time.perf_counter()
+    if workload.mode == "program":
+        run_program(workload.language, workload.code, timeout_seconds=timeout_seconds)
+        test_peaks = []
+    else:
+        _passed, _passed_tests, _stdout, _stderr, test_results = run_solution(
+            workload.language,
+            workload.code,
+            workload.tests,
+            timeout_seconds=timeout_seconds,
+        )
+        test_peaks = [item.peak_memory_kb for item in test_results if item.peak_memory_kb is not None]
+    return {
+        "latency_ms": (time.perf_counter() - started_at) * 1000,
+        "peak_memory_kb": max(test_peaks, default=None),
+    }
+
+
+def run_direct(action: Callable[[], dict], submissions: int, concurrency: int) -> List[dict]:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(action) for _ in range(submissions)]
+        return [future.result() for future in futures]
+
+
+def run_queued(action: Callable[[], dict], submissions: int, loop: asyncio.AbstractEventLoop) -> List[dict]:
+    # The runner semaphore binds to the first loop that waits on it, so every
+    # queued configuration shares one loop.
+    async def submit_all() -> List[dict]:
+        return list(await asyncio.gather(*(run_in_runner_slot(action) for _ in range(submissions))))
+
+    return loop.run_until_complete(submit_all())
+
+
+def measure_spawn_overhead(language: str, samples: int) -> dict:
+    """Median latency of an empty program: cold process versus the runner."""
+    if language == "python":
+        command = [sys.executable, "-I", "-B", "-S", "-c", "pass"]
+    else:
+        command = [find_node_binary(), "-e", ";"]
+    cold = []
+    runner = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=False)
+        cold.append((time.perf_counter() - started_at) * 1000)
+        started_at = time.perf_counter()
+        run_program(language, EMPTY_PROGRAMS[language])
+        runner.append((time.perf_counter() - started_at) * 1000)
+    return {
+        "cold_process_ms": round(statistics.median(cold), 2),
+        "runner_ms": round(statistics.median(runner), 2),
+    }
+
+
+def benchmark_configuration(
+    workload: Workload,
+    path: str,
+    submissions: int,
+    concurrency: int,
+    timeout_seconds: int,
+    loop: asyncio.AbstractEventLoop,
+) -> dict:
+    action = lambda: execute_workload(workload, timeout_seconds)  # noqa: E731
+    started_at = time.perf_counter()
+    if path == "queued":
+        samples = run_queued(action, submissions, loop)
+    else:
+        samples = run_direct(action, submissions, concurrency)
+    elapsed = time.perf_counter() - started_at
+
+    latencies = [sample["latency_ms"] for sample in samples]
+    peaks = [sample["peak_memory_kb"] for sample in samples if sample["peak_memory_kb"] is not None]
+    return {
+        "workload": workload.name,
+        "language": workload.language,
+        "mode": workload.mode,
+        "path": path,
+        "submissions": submissions,
+        "concurrency": runner_scheduler.capacity if path == "queued" else concurrency,
+        "tests_per_submission": len(workload.tests) if workload.mode == "solution" else 1,
+        "elapsed_seconds": round(elapsed, 3),
+        "submissions_per_second": round(submissions / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2),
+        },
+        "peak_memory_kb": {
+            "test_max": max(peaks, default=None),
+            "test_p95": percentile(peaks, 95) if peaks else None,
+            "children_max": get_children_peak_rss_kb(),
+        },
+    }
+
+
+def collect_settings() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pool_size": code_runner_service.POOL_SIZE,
+        "parallel_tests": code_runner_service.PARALLEL_TESTS,
+        "parallel_slots": code_runner_service.PARALLEL_SLOTS,
+        "report_mode": code_runner_service.SOLUTION_REPORT_MODE,
+        "run_concurrency_adaptive": RUN_CONCURRENCY_ADAPTIVE,
+        "run_concurrency_max": RUN_CONCURRENCY_MAX,
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    names = args.workloads.split(",") if args.workloads else list(WORKLOADS)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        raise SystemExit(f"Unknown workloads: {', '.join(unknown)}")
+    if not find_node_binary():
+        names = [name for name in names if WORKLOADS[name].language != "javascript"]
+    paths = PATHS if args.path == "all" else [args.path]
+
+    loop = asyncio.new_event_loop()
+    start_runner_pool()
+    try:
+        languages = sorted({WORKLOADS[name].language for name in names})
+        report = {
+            "generated_at": datetime.utcnow().isoformat(),
+            "settings": collect_settings(),
+            "spawn_overhead": {
+                language: measure_spawn_overhead(language, args.spawn_samples)
+                for language in languages
+            },
+            "results": [],
+        }
+        for name in names:
+            for path in paths:
+                result = benchmark_configuration(
+                    WORKLOADS[name],
+                    path,
+                    args.submissions,
+                    args.concurrency,
+                    args.timeout,
+                    loop,
+                )
+                report["results"].append(result)
+                print(format_result(result), file=sys.stderr)
+    finally:
+        shutdown_runner_pool()
+        loop.close()
+    return report
+
+
+def format_result(result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{result['workload']:<24} {result['path']:<7} "
+        f"{result['submissions_per_second']:>8.2f}/s  "
+        f"p50 {latency['p50']:>8.1f}ms  p95 {latency['p95']:>8.1f}ms  p99 {latency['p99']:>8.1f}ms"
+    )
+
+
+def compare_reports(before: dict, after: dict) -> List[dict]:
+    """Pair configurations of two reports and compute relative changes."""
+    baseline = {(item["workload"], item["path"]): item for item in before.get("results", [])}
+    rows = []
+    for item in after.get("results", []):
+        previous = baseline.get((item["workload"], item["path"]))
+        if previous is None:
+            continue
+        row = {"workload": item["workload"], "path": item["path"]}
+        for metric, old, new in [
+            ("submissions_per_second", previous["submissions_per_second"], item["submissions_per_second"]),
+            ("p50_ms", previous["latency_ms"]["p50"], item["latency_ms"]["p50"]),
+            ("p95_ms", previous["latency_ms"]["p95"], item["latency_ms"]["p95"]),
+            ("p99_ms", previous["latency_ms"]["p99"], item["latency_ms"]["p99"]),
+        ]:
+            row[metric] = {
+                "before": old,
+                "after": new,
+                "change_percent": round((new - old) / old * 100, 1) if old else None,
+            }
+        rows.append(row)
+    return rows
+
+
+def write_json(payload: object, output: str | None) -> None:
+    serialized = json.dumps(payload, ensure_ascii=False, indent=2)
+    if output:
+        Path(output).write_text(serialized + "\n", encoding="utf-8")
+    else:
+        print(serialized)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the code runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run workloads and print a JSON report")
+    run_parser.add_argument("--workloads", default="", help=f"Comma-separated subset of: {', '.join(WORKLOADS)}")
+    run_parser.add_argument("--path", choices=[*PATHS, "all"], default="all")
+    run_parser.add_argument("--submissions", type=int, default=20)
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--timeout", type=int, default=1)
+    run_parser.add_argument("--spawn-samples", type=int, default=10)
+    run_parser.add_argument("--output", help="Write the report to this file instead of stdout")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two JSON reports")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--output")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        before = json.loads(Path(args.before).read_text(encoding="utf-8"))
+        after = json.loads(Path(args.after).read_text(encoding="utf-8"))
+        write_json(compare_reports(before, after), args.output)
+        return
+    write_json(run_benchmark(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,18 +8,26 @@ from passlib.context import CryptContext
 
 from models.achievement import Achievement
 from models.attendance import AttendanceSession
+from models.cache_version import CacheVersion
 from models.course import Course
 from models.course_request import CourseRequest
 from models.event import Event
 from models.group import Group
+from models.leaderboard_entry import LeaderboardEntry
 from models.news_article import NewsArticle
+from models.rate_limit_counter import RateLimitCounter
 from models.student_course_enrollment import StudentCourseEnrollment
-from models.task import Task
+from models.submission_record import SubmissionRecord
+from models.submission_job import SubmissionJob
+from models.task import Task, TaskStatus
+from models.task_result_record import TaskResultRecord
 from models.topic import Topic
 from models.user import User, UserType
+from models.verdict_cache_entry import VerdictCacheEntry
 from services.achievement_service import ensure_default_achievements
 from services.seed_learning_content_service import ensure_demo_learning_content
 from services.seed_news_content_service import ensure_default_news_articles
+from services.verdict_cache_service import VERDICT_CACHE_TTL_SECONDS
 
 
 load_dotenv()
@@ -56,7 +64,7 @@ async def ping_database():
     await get_mongo_client().admin.command("ping")
 
 
-async def init_database():
+async def init_database(seed_defaults: bool = True):
     try:
         await ping_database()
         database = get_database()
@@ -67,20 +75,28 @@ async def init_database():
             CourseRequest,
             Group,
             Task,
+            TaskResultRecord,
             Topic,
             Event,
             NewsArticle,
             Achievement,
             AttendanceSession,
             StudentCourseEnrollment,
+            SubmissionJob,
+            SubmissionRecord,
+            VerdictCacheEntry,
+            RateLimitCounter,
+            LeaderboardEntry,
+            CacheVersion,
         ]
         await init_beanie(database=database, document_models=document_models)
 
         await create_custom_indexes(database)
-        await ensure_default_achievements()
-        await ensure_default_staff_users()
-        await ensure_default_news_articles()
-        await ensure_demo_learning_content()
+        if seed_defaults:
+            await ensure_default_achievements()
+            await ensure_default_staff_users()
+            await ensure_default_news_articles()
+            await ensure_demo_learning_content()
     except Exception:
         logger.exception("Database initialization failed")
         await close_database()
@@ -89,49 +105,93 @@ async def init_database():
     logger.info("Database initialized successfully")
 
 
+CUSTOM_INDEXES = [
+    ("users", "tg_username", {"unique": True}),
+    ("users", "phone", {"unique": True, "partialFilterExpression": {"phone": {"$type": "string"}}}),
+    ("users", "telegram_id", {"sparse": True}),
+    ("users", "linked_student_ids", {}),
+    ("courses", "teacher_ids", {}),
+    ("courses", "student_ids", {}),
+    ("course_requests", "course_id", {}),
+    ("course_requests", "created_at", {}),
+    ("news_articles", "slug", {"unique": True}),
+    ("news_articles", "created_at", {}),
+    ("groups", "course_id", {}),
+    ("groups", "students", {}),
+    ("groups", "teachers", {}),
+    ("attendance_sessions", [("group_id", 1), ("date", 1)], {"unique": True}),
+    ("attendance_sessions", "original_date", {}),
+    ("attendance_sessions", "course_id", {}),
+    ("student_course_enrollments", [("student_id", 1), ("course_id", 1)], {"unique": True}),
+    ("student_course_enrollments", "group_id", {}),
+    ("student_course_enrollments", "payment_mode", {}),
+    ("tasks", "topic_id", {}),
+    ("task_results", [("user_id", 1), ("task_id", 1)], {"unique": True}),
+    ("task_results", [("course_id", 1), ("user_id", 1)], {}),
+    ("task_results", [("task_id", 1), ("status", 1)], {}),
+    ("task_results", "topic_id", {}),
+    (
+        "task_results",
+        [("course_id", 1), ("last_submission.created_at", -1)],
+        {
+            "name": "pending_review_queue",
+            "partialFilterExpression": {"status": TaskStatus.PENDING_REVIEW.value},
+        },
+    ),
+    ("topics", "course_id", {}),
+    ("submission_jobs", [("status", 1), ("created_at", 1)], {}),
+    ("submission_jobs", "user_id", {}),
+    ("submissions", [("task_id", 1), ("user_id", 1), ("created_at", -1)], {}),
+    ("verdict_cache", "key", {"unique": True}),
+    ("verdict_cache", "task_id", {}),
+    ("verdict_cache", "created_at", {"expireAfterSeconds": VERDICT_CACHE_TTL_SECONDS}),
+    ("rate_limits", [("key", 1), ("window_start", 1)], {"unique": True}),
+    ("rate_limits", "expires_at", {"expireAfterSeconds": 0}),
+    ("leaderboards", [("course_id", 1), ("user_id", 1)], {"unique": True}),
+    ("leaderboards", [("course_id", 1), ("points", -1), ("surname", 1), ("name", 1), ("user_id", 1)], {}),
+    ("leaderboards", "user_id", {}),
+    ("cache_versions", "key", {"unique": True}),
+    ("achievements", "key", {"unique": True}),
+    ("achievements", "course_id", {}),
+]
+
+
 async def create_custom_indexes(database):
+    """Create every index on its own, so one conflicting index does not skip the rest."""
     try:
         user_indexes = await database.users.index_information()
         if "phone_1" in user_indexes:
             await database.users.drop_index("phone_1")
-
-        await database.users.create_index("tg_username", unique=True)
-        await database.users.create_index(
-            "phone",
-            unique=True,
-            partialFilterExpression={"phone": {"$type": "string"}},
-        )
-        await database.users.create_index("telegram_id", sparse=True)
-        await database.users.create_index("linked_student_ids")
-
-        await database.courses.create_index("teacher_ids")
-        await database.courses.create_index("student_ids")
-        await database.course_requests.create_index("course_id")
-        await database.course_requests.create_index("created_at")
-        await database.news_articles.create_index("slug", unique=True)
-        await database.news_articles.create_index("created_at")
-
-        await database.groups.create_index("course_id")
-        await database.groups.create_index("students")
-        await database.groups.create_index("teachers")
-        await database.attendance_sessions.create_index([("group_id", 1), ("date", 1)], unique=True)
-        await database.attendance_sessions.create_index("original_date")
-        await database.attendance_sessions.create_index("course_id")
-        await database.student_course_enrollments.create_index(
-            [("student_id", 1), ("course_id", 1)],
-            unique=True,
-        )
-        await database.student_course_enrollments.create_index("group_id")
-        await database.student_course_enrollments.create_index("payment_mode")
-
-        await database.tasks.create_index("topic_id")
-
-        await database.topics.create_index("course_id")
-
-        await database.achievements.create_index("key", unique=True)
-        await database.achievements.create_index("course_id")
     except Exception as exc:
-        logger.warning("Error creating indexes: %s", exc)
+        logger.warning("Error dropping the old phone index: %s", exc)
+
+    for collection_name, keys, options in CUSTOM_INDEXES:
+        try:
+            await ensure_index(database, collection_name, keys, **options)
+        except Exception as exc:
+            logger.warning("Error creating index %s on %s: %s", keys, collection_name, exc)
+
+
+async def ensure_index(database, collection_name: str, keys, **options) -> None:
+    """Create an index; a TTL index that exists with another expiry is changed in place."""
+    collection = database[collection_name]
+    key_pattern = [(keys, 1)] if isinstance(keys, str) else list(keys)
+    expire_after_seconds = options.get("expireAfterSeconds")
+    if expire_after_seconds is not None:
+        for info in (await collection.index_information()).values():
+            current = info.get("expireAfterSeconds")
+            if [(field, int(direction)) for field, direction in info["key"]] != key_pattern or current is None:
+                continue
+            if current != expire_after_seconds:
+                await database.command(
+                    {
+                        "collMod": collection_name,
+                        "index": {"keyPattern": dict(key_pattern), "expireAfterSeconds": expire_after_seconds},
+                    }
+                )
+                logger.info("Changed TTL of %s.%s to %s seconds", collection_name, keys, expire_after_seconds)
+            return
+    await collection.create_index(key_pattern, **options)
 
 
 async def ensure_default_staff_users():
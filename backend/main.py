@@ -21,6 +21,8 @@ from routers.tasks import router as tasks_router
 from routers.teaching import router as teaching_router
 from routers.topics import router as topics_router
 from routers.users import router as users_router
+from services.code_runner_service import shutdown_runner_pool, start_runner_pool
+from services.document_loader import close_document_loader, open_document_loader
 
 
 load_dotenv()
@@ -45,9 +47,11 @@ def parse_allowed_origins(value: str | None) -> list[str]:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_database()
+    start_runner_pool()
     try:
         yield
     finally:
+        shutdown_runner_pool()
         await close_database()
 
 
@@ -78,6 +82,16 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def document_loader_middleware(request: Request, call_next):
+    # Each request gets its own identity map, see services/document_loader.py.
+    token = open_document_loader()
+    try:
+        return await call_next(request)
+    finally:
+        await close_document_loader(token)
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.error("HTTP %s error on %s: %s", exc.status_code, request.url, exc.detail)
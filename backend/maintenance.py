@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+
+from database import close_database, init_database
+from services.course_stats_service import rebuild_all_course_aggregates
+from services.leaderboard_service import rebuild_all_leaderboards
+from services.task_result_service import migrate_embedded_task_results, migrate_result_submissions
+
+
+load_dotenv()
+
+
+async def migrate() -> None:
+    moved = await migrate_embedded_task_results()
+    print(f"Moved {moved} task results to the task_results collection")
+    changed = await migrate_result_submissions()
+    print(f"Pointed {changed} task results at their stored submissions")
+    await rebuild_aggregates()
+    await rebuild_leaderboards()
+
+
+async def rebuild_aggregates() -> None:
+    rebuilt = await rebuild_all_course_aggregates()
+    print(f"Rebuilt points and task counts of {rebuilt} courses")
+
+
+async def rebuild_leaderboards() -> None:
+    rebuilt = await rebuild_all_leaderboards()
+    print(f"Rebuilt leaderboards of {rebuilt} courses")
+
+
+COMMANDS = {
+    "migrate": migrate,
+    "rebuild-aggregates": rebuild_aggregates,
+    "rebuild-leaderboards": rebuild_leaderboards,
+}
+
+
+async def run_command(name: str) -> None:
+    await init_database(seed_defaults=False)
+    try:
+        await COMMANDS[name]()
+    finally:
+        await close_database()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Data migrations and repairs")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    asyncio.run(run_command(args.command))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from beanie import Document
+from pydantic import Field
+
+
+class CacheVersion(Document):
+    """A counter that writes bump to make cached responses stale in every process."""
+
+    key: str = Field(...)
+    version: int = Field(default=0)
+
+    class Settings:
+        name = "cache_versions"
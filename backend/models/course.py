@@ -19,6 +19,12 @@ class Course(Document):
     schedule_weekdays: List[int] = Field(default_factory=list)
     schedule_start_time: Optional[str] = Field(default=None, pattern=r"^\d{2}:\d{2}$")
     schedule_end_time: Optional[str] = Field(default=None, pattern=r"^\d{2}:\d{2}$")
+    # Maintained by services/course_stats_service.py on task changes. Not
+    # validated as non-negative: a drifted counter must not make the document
+    # unreadable, readers clamp it instead.
+    total_points: int = Field(default=0)
+    total_tasks: int = Field(default=0)
+    has_manual_review_tasks: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -26,37 +32,19 @@ class Course(Document):
         self.updated_at = datetime.utcnow()
 
     async def get_total_tasks(self) -> int:
-        from models.topic import Topic
-
-        total = 0
-        for topic_id in self.topic_ids:
-            topic = await Topic.get(topic_id)
-            if topic:
-                total += len(topic.task_ids)
-        return total
+        return max(self.total_tasks, 0)
 
     async def get_total_points(self) -> int:
-        from models.topic import Topic
-
-        total = 0
-        for topic_id in self.topic_ids:
-            topic = await Topic.get(topic_id)
-            if topic:
-                total += await topic.get_total_points()
-        return total
+        return max(self.total_points, 0)
 
     async def get_total_students(self) -> int:
         return len(set(self.student_ids))
 
     async def get_user_points(self, user_id: str) -> int:
-        from models.topic import Topic
+        from models.task_result_record import TaskResultRecord
 
-        total = 0
-        for topic_id in self.topic_ids:
-            topic = await Topic.get(topic_id)
-            if topic:
-                total += await topic.get_user_points(user_id)
-        return total
+        points, _solved = await TaskResultRecord.summarize({"user_id": user_id, "course_id": str(self.id)})
+        return points
 
     async def get_user_success_percent(self, user_id: str) -> float:
         total_points = await self.get_total_points()
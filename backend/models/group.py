@@ -19,23 +19,18 @@ class Group(Document):
     schedule_slots: List[GroupScheduleSlot] = Field(default_factory=list)
     start_date: Optional[str] = Field(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$")
     current_topic_id: Optional[str] = Field(default=None)
+    runner_weight: float = Field(default=1.0, gt=0, le=10)
 
     async def get_total_students(self) -> int:
         return len(self.students)
 
     async def get_user_success_percent(self, user_id: str) -> float:
         from models.course import Course
-        from models.topic import Topic
+        from models.task_result_record import TaskResultRecord
 
-        total = 0
-        solved = 0
         course = await Course.get(self.course_id)
-        if course:
-            for topic_id in course.topic_ids:
-                topic = await Topic.get(topic_id)
-                if topic:
-                    total += len(topic.task_ids)
-                    solved += await topic.get_user_solved_count(user_id)
+        total = await course.get_total_tasks() if course else 0
+        _points, solved = await TaskResultRecord.summarize({"user_id": user_id, "course_id": self.course_id})
         return (solved / total * 100) if total > 0 else 0.0
 
     class Settings:
@@ -0,0 +1,21 @@
+from beanie import Document
+from pydantic import Field
+
+
+class LeaderboardEntry(Document):
+    """A student's standing in a course, kept in step with their task results.
+
+    The student's name is copied here so the board can be sorted and paged
+    by the database; it is rewritten when the student renames themselves.
+    """
+
+    course_id: str = Field(...)
+    user_id: str = Field(...)
+    points: int = Field(default=0)
+    solved: int = Field(default=0)
+    surname: str = Field(default="")
+    name: str = Field(default="")
+    tg_username: str = Field(default="")
+
+    class Settings:
+        name = "leaderboards"
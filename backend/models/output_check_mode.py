@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class OutputCheckMode(str, Enum):
+    EXACT = "exact"
+    TOKENS = "tokens"
+    FLOAT = "float"
+    UNORDERED_LINES = "unordered_lines"
+
+
+DEFAULT_FLOAT_TOLERANCE = 1e-6
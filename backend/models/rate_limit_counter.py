@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+class RateLimitCounter(Document):
+    key: str = Field(...)
+    window_start: int = Field(..., ge=0)
+    hits: int = Field(default=0, ge=0)
+    expires_at: datetime = Field(...)
+
+    class Settings:
+        name = "rate_limits"
@@ -0,0 +1,31 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from beanie import Document
+from pydantic import Field
+
+
+class SubmissionJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class SubmissionJob(Document):
+    task_id: str = Field(...)
+    user_id: str = Field(...)
+    code: str = Field(...)
+    status: SubmissionJobStatus = Field(default=SubmissionJobStatus.QUEUED)
+    attempts: int = Field(default=0, ge=0)
+    worker_id: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    newly_unlocked_achievement_ids: List[str] = Field(default_factory=list)
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "submission_jobs"
@@ -0,0 +1,17 @@
+from beanie import Document
+from pydantic import Field
+
+from models.task import TaskSubmission
+
+
+class SubmissionRecord(TaskSubmission, Document):
+    """One submission of a student, kept outside the task document."""
+
+    task_id: str = Field(...)
+    user_id: str = Field(...)
+
+    def to_submission(self) -> TaskSubmission:
+        return TaskSubmission.model_validate(self.model_dump(include=set(TaskSubmission.model_fields)))
+
+    class Settings:
+        name = "submissions"
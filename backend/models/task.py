@@ -5,6 +5,8 @@ from typing import List, Optional
 from beanie import Document
 from pydantic import BaseModel, Field
 
+from models.output_check_mode import DEFAULT_FLOAT_TOLERANCE, OutputCheckMode
+
 
 class TaskStatus(str, Enum):
     NO_ATTEMPTS = "no_attempts"
@@ -26,6 +28,8 @@ class TaskTestRunResult(BaseModel):
     stderr: str = Field(default="")
     passed: bool = Field(default=False)
     is_public: bool = Field(default=True)
+    cpu_time_ms: Optional[int] = Field(default=None)
+    peak_memory_kb: Optional[int] = Field(default=None)
 
 
 class TaskSubmission(BaseModel):
@@ -41,7 +45,28 @@ class TaskSubmission(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
-class TaskResult(BaseModel):
+class TaskSubmissionRef(BaseModel):
+    """A submission stored in ``submissions``, with what a result needs to rank it."""
+
+    # None only on results written before refs, until ``maintenance.py migrate``.
+    submission_id: Optional[str] = None
+    passed: bool
+    passed_tests: int
+    total_tests: int
+    created_at: datetime
+
+    @classmethod
+    def of(cls, submission_id: str, submission: TaskSubmission) -> "TaskSubmissionRef":
+        return cls(
+            submission_id=submission_id,
+            passed=submission.passed,
+            passed_tests=submission.passed_tests,
+            total_tests=submission.total_tests,
+            created_at=submission.created_at,
+        )
+
+
+class TaskResultState(BaseModel):
     user_id: str
     score: int = Field(default=0, ge=0)
     status: TaskStatus = Field(default=TaskStatus.NO_ATTEMPTS)
@@ -49,20 +74,22 @@ class TaskResult(BaseModel):
     solved_at: Optional[datetime] = None
     reviewed_at: Optional[datetime] = None
     review_comment: Optional[str] = None
-    last_submission: Optional[TaskSubmission] = None
-    best_submission: Optional[TaskSubmission] = None
-    submission_history: List[TaskSubmission] = Field(default_factory=list)
 
-    def add_submission(self, submission: TaskSubmission) -> None:
-        self.last_submission = submission
-        self.submission_history.append(submission)
-        if self._is_better_submission(submission, self.best_submission):
-            self.best_submission = submission
+
+class TaskResult(TaskResultState):
+    last_submission: Optional[TaskSubmissionRef] = None
+    best_submission: Optional[TaskSubmissionRef] = None
+
+    def add_submission(self, submission_id: str, submission: TaskSubmission) -> None:
+        ref = TaskSubmissionRef.of(submission_id, submission)
+        self.last_submission = ref
+        if self._is_better_submission(ref, self.best_submission):
+            self.best_submission = ref
 
     @staticmethod
     def _is_better_submission(
-        candidate: TaskSubmission,
-        current: Optional[TaskSubmission],
+        candidate: TaskSubmissionRef,
+        current: Optional[TaskSubmissionRef],
     ) -> bool:
         if current is None:
             return True
@@ -75,6 +102,13 @@ class TaskResult(BaseModel):
         return candidate.created_at >= current.created_at
 
 
+class EmbeddedTaskResult(TaskResultState):
+    # Legacy: results now live in ``task_results`` and point at ``submissions``.
+    last_submission: Optional[TaskSubmission] = None
+    best_submission: Optional[TaskSubmission] = None
+    submission_history: List[TaskSubmission] = Field(default_factory=list)
+
+
 class Task(Document):
     topic_id: str = Field(...)
     title: str = Field(..., min_length=1, max_length=200)
@@ -85,35 +119,17 @@ class Task(Document):
     language: str = Field(default="python", max_length=20)
     requires_manual_review: bool = Field(default=False)
     tests: List[TaskTestCase] = Field(default_factory=list)
+    check_mode: OutputCheckMode = Field(default=OutputCheckMode.EXACT)
+    float_tolerance: float = Field(default=DEFAULT_FLOAT_TOLERANCE, ge=0)
     order: int = Field(default=0, ge=0)
-    results: List[TaskResult] = Field(default_factory=list)
+    # Legacy: results live in the ``task_results`` collection; ``python
+    # maintenance.py migrate`` moves them there and empties this list.
+    results: List[EmbeddedTaskResult] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     def touch(self) -> None:
         self.updated_at = datetime.utcnow()
 
-    def get_result_for_student(self, user_id: str) -> Optional[TaskResult]:
-        for result in self.results:
-            if result.user_id == user_id:
-                return result
-        return None
-
-    def get_status_for_student(self, user_id: str) -> TaskStatus:
-        result = self.get_result_for_student(user_id)
-        return result.status if result else TaskStatus.NO_ATTEMPTS
-
-    def get_score_for_student(self, user_id: str) -> int:
-        result = self.get_result_for_student(user_id)
-        return result.score if result else 0
-
-    def upsert_result(self, user_id: str) -> TaskResult:
-        existing = self.get_result_for_student(user_id)
-        if existing:
-            return existing
-        created = TaskResult(user_id=user_id)
-        self.results.append(created)
-        return created
-
     class Settings:
         name = "tasks"
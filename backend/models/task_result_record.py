@@ -0,0 +1,44 @@
+from typing import Dict, Optional, Tuple
+
+from beanie import Document
+from pydantic import Field
+
+from models.task import TaskResult, TaskStatus
+
+
+class TaskResultRecord(TaskResult, Document):
+    """A student's result for one task, with its course and lesson denormalized."""
+
+    task_id: str = Field(...)
+    course_id: str = Field(...)
+    topic_id: str = Field(...)
+    # Bumped by every write; a write based on an older version is rejected.
+    version: int = Field(default=0, ge=0)
+
+    @classmethod
+    async def summarize(cls, match: dict) -> Tuple[int, int]:
+        """Earned points and solved task count over the results matching ``match``."""
+        totals = await cls.summarize_by(match, None)
+        return totals.get(None, (0, 0))
+
+    @classmethod
+    async def summarize_by(cls, match: dict, field: Optional[str]) -> Dict[Optional[str], Tuple[int, int]]:
+        """Earned points and solved task count per value of ``field`` in one aggregation."""
+        rows = await cls.get_motor_collection().aggregate(
+            [
+                {"$match": match},
+                {
+                    "$group": {
+                        "_id": f"${field}" if field else None,
+                        "points": {"$sum": "$score"},
+                        "solved": {
+                            "$sum": {"$cond": [{"$eq": ["$status", TaskStatus.CORRECT.value]}, 1, 0]}
+                        },
+                    }
+                },
+            ]
+        ).to_list(length=None)
+        return {row["_id"]: (row["points"], row["solved"]) for row in rows}
+
+    class Settings:
+        name = "task_results"
@@ -14,6 +14,12 @@ class Topic(Document):
     task_ids: List[str] = Field(default_factory=list)
     order: int = Field(default=0, ge=0)
     is_open: bool = Field(default=False)
+    # Maintained by services/course_stats_service.py on task changes. Not
+    # validated as non-negative: a drifted counter must not make the document
+    # unreadable, readers clamp it instead.
+    total_points: int = Field(default=0)
+    total_tasks: int = Field(default=0)
+    has_manual_review_tasks: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -21,37 +27,21 @@ class Topic(Document):
         self.updated_at = datetime.utcnow()
 
     async def get_total_tasks(self) -> int:
-        return len(self.task_ids)
+        return max(self.total_tasks, 0)
 
     async def get_total_points(self) -> int:
-        from models.task import Task
-
-        total = 0
-        for task_id in self.task_ids:
-            task = await Task.get(task_id)
-            if task:
-                total += task.points
-        return total
+        return max(self.total_points, 0)
 
     async def get_user_points(self, user_id: str) -> int:
-        from models.task import Task
+        from models.task_result_record import TaskResultRecord
 
-        total = 0
-        for task_id in self.task_ids:
-            task = await Task.get(task_id)
-            if task:
-                total += task.get_score_for_student(user_id)
-        return total
+        points, _solved = await TaskResultRecord.summarize({"user_id": user_id, "task_id": {"$in": self.task_ids}})
+        return points
 
     async def get_user_solved_count(self, user_id: str) -> int:
-        from models.task import Task
-        from models.task import TaskStatus
+        from models.task_result_record import TaskResultRecord
 
-        solved = 0
-        for task_id in self.task_ids:
-            task = await Task.get(task_id)
-            if task and task.get_status_for_student(user_id) == TaskStatus.CORRECT:
-                solved += 1
+        _points, solved = await TaskResultRecord.summarize({"user_id": user_id, "task_id": {"$in": self.task_ids}})
         return solved
 
     async def get_user_success_percent(self, user_id: str) -> float:
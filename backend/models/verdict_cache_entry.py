@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from beanie import Document
+from pydantic import Field
+
+
+class VerdictCacheEntry(Document):
+    key: str = Field(...)
+    task_id: Optional[str] = Field(default=None)
+    value: Any = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "verdict_cache"
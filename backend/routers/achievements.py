@@ -16,8 +16,10 @@ from schemas.responses import (
     MessageResponse,
 )
 from services.auth_service import get_current_user_dependency, require_role
+from services.document_loader import load_document
 from services.learning_service import get_course_students
 from services.serializer_service import serialize_achievement
+from services.response_cache_service import discard_dashboard_sections
 
 
 router = APIRouter(prefix="/achievement", tags=["Достижения"])
@@ -33,7 +35,7 @@ async def can_manage_achievement(user: User, achievement: Achievement) -> bool:
         return False
     if not achievement.course_id:
         return True
-    course = await Course.get(achievement.course_id)
+    course = await load_document(Course, achievement.course_id)
     return bool(course and str(user.id) in course.teacher_ids)
 
 
@@ -143,7 +145,7 @@ async def update_achievement(
     payload: UpdateAchievementRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    achievement = await Achievement.get(achievement_id)
+    achievement = await load_document(Achievement, achievement_id)
     if not achievement:
         raise HTTPException(status_code=404, detail="Достижение не найдено")
     if not await can_manage_achievement(user, achievement):
@@ -155,6 +157,7 @@ async def update_achievement(
             setattr(achievement, field, value)
     achievement.touch()
     await achievement.save()
+    await discard_dashboard_sections()
     return MessageResponse(message="Достижение обновлено", success=True)
 
 
@@ -164,7 +167,7 @@ async def upload_achievement_avatar(
     file: UploadFile = File(...),
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    achievement = await Achievement.get(achievement_id)
+    achievement = await load_document(Achievement, achievement_id)
     if not achievement:
         raise HTTPException(status_code=404, detail="Достижение не найдено")
     if not await can_manage_achievement(user, achievement):
@@ -184,4 +187,5 @@ async def upload_achievement_avatar(
     achievement.touch()
     await achievement.save()
 
+    await discard_dashboard_sections()
     return {"url": achievement.avatar_url, "filename": filename}
@@ -4,6 +4,7 @@ from models.user import UserType
 from schemas.requests import ChangePasswordRequest, LoginRequest, RefreshRequest, RegisterRequest, UpdateUserRequest
 from schemas.responses import MessageResponse, RegisterResponse, TokenResponse, UserResponse
 from services.auth_service import get_auth_service
+from services.leaderboard_service import rename_leaderboard_member
 from services.serializer_service import serialize_achievement_notice, serialize_user
 from services.user_service import get_by_tg_username
 
@@ -93,6 +94,7 @@ async def update_user(
 
     user.touch()
     await user.save()
+    await rename_leaderboard_member(user)
     return MessageResponse(message="Данные пользователя обновлены", success=True)
 
 
@@ -1,9 +1,9 @@
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 
 from models.course import Course
 from models.course_request import CourseRequest
@@ -23,6 +23,7 @@ from schemas.responses import (
     CourseDetailResponse,
     CourseResponse,
     GroupResponse,
+    LeaderboardPageResponse,
     MessageResponse,
     PublicCourseDetailResponse,
     PublicCourseGroupResponse,
@@ -30,6 +31,8 @@ from schemas.responses import (
     UserCoursesResponse,
 )
 from services.auth_service import get_current_user_dependency, require_role
+from services.course_stats_service import add_child_id, remove_child_id
+from services.document_loader import clear_document, load_document, load_documents, prime_document
 from services.learning_service import (
     can_edit_course,
     get_course_students,
@@ -38,13 +41,19 @@ from services.learning_service import (
     get_groups_for_course,
     get_student_group_for_course,
 )
+from services.leaderboard_service import LEADERBOARD_PAGE_SIZE, add_leaderboard_members
+from services.progress_service import get_topics_progress
 from services.serializer_service import (
     build_group_schedule_summary,
+    build_leaderboard_page,
     serialize_course,
     serialize_course_member,
+    serialize_courses,
     serialize_group,
     serialize_topic,
 )
+from services.user_service import get_users_by_ids
+from services.response_cache_service import discard_dashboard_sections
 
 
 def lesson_is_available(topic: Topic, ordered_topics: list[Topic]) -> bool:
@@ -78,32 +87,33 @@ course_uploads_dir.mkdir(parents=True, exist_ok=True)
 @router.get("/my", response_model=UserCoursesResponse)
 async def my_courses(user: User = Depends(get_current_user_dependency)):
     courses = await get_courses_for_user(user)
-    serialized = [await serialize_course(course, user) for course in courses]
+    serialized = await serialize_courses(courses, user)
     return UserCoursesResponse(courses=serialized, total=len(serialized))
 
 
 @router.get("/list", response_model=List[CourseResponse])
 async def courses_list(user: User = Depends(get_current_user_dependency)):
     courses = await get_courses_for_user(user)
-    return [await serialize_course(course, user) for course in courses]
+    return await serialize_courses(courses, user)
 
 
 @router.get("/public/{course_id}", response_model=PublicCourseDetailResponse)
 async def public_course_detail(course_id: str):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
     topics = await Topic.find(Topic.course_id == course_id).to_list()
     topics.sort(key=lambda item: item.order)
     groups = await get_groups_for_course(course)
 
+    current_topics = {
+        str(topic.id): topic
+        for topic in await load_documents(Topic, [group.current_topic_id for group in groups])
+    }
     public_groups: List[PublicCourseGroupResponse] = []
     for group in groups:
-        current_topic_name = None
-        if group.current_topic_id:
-            current_topic = await Topic.get(group.current_topic_id)
-            if current_topic:
-                current_topic_name = current_topic.name
+        current_topic = current_topics.get(group.current_topic_id or "")
+        current_topic_name = current_topic.name if current_topic else None
         public_groups.append(
             PublicCourseGroupResponse(
                 id=str(group.id),
@@ -137,7 +147,7 @@ async def course_detail(
     course_id: str,
     user: User = Depends(get_current_user_dependency),
 ):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
 
@@ -151,11 +161,11 @@ async def course_detail(
     groups = await get_groups_for_course(course)
     course_students = []
     if editable:
-        for student_id in await get_course_students(course):
-            student = await User.get(student_id)
-            if student and student.user_type == UserType.STUDENT:
+        for student in await get_users_by_ids(await get_course_students(course)):
+            if student.user_type == UserType.STUDENT:
                 course_students.append(serialize_course_member(student))
         course_students.sort(key=lambda item: (item.surname.lower(), item.name.lower(), item.tg_username.lower()))
+    lesson_progress = await get_topics_progress(topics, str(user.id))
     return CourseDetailResponse(
         course=await serialize_course(course, user),
         groups=[await serialize_group(group, course) for group in groups],
@@ -166,6 +176,7 @@ async def course_detail(
                 user,
                 can_edit=editable,
                 can_access=await lesson_is_available_for_user(user, course, topic, topics, editable),
+                progress=lesson_progress.get(str(topic.id)),
             )
             for topic in topics
         ],
@@ -173,6 +184,32 @@ async def course_detail(
     )
 
 
+@router.get("/{course_id}/leaderboard", response_model=LeaderboardPageResponse)
+async def course_leaderboard(
+    course_id: str,
+    group_id: Optional[str] = Query(default=None),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=LEADERBOARD_PAGE_SIZE, ge=1, le=100),
+    user: User = Depends(get_current_user_dependency),
+):
+    course = await load_document(Course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Курс не найден")
+
+    user_courses = {str(item.id) for item in await get_courses_for_user(user)}
+    if user.user_type != UserType.ADMIN and course_id not in user_courses:
+        raise HTTPException(status_code=403, detail="Нет доступа к курсу")
+
+    if group_id:
+        group = await load_document(Group, group_id)
+        if not group or group.course_id != course_id:
+            raise HTTPException(status_code=404, detail="Группа не найдена")
+        member_ids = group.students
+    else:
+        member_ids = await get_course_students(course)
+    return await build_leaderboard_page(course, member_ids, offset, limit, user)
+
+
 @router.post("/add", response_model=MessageResponse)
 async def add_course(
     payload: CreateCourseRequest,
@@ -193,6 +230,9 @@ async def add_course(
         student_ids=payload.student_ids,
     )
     await course.insert()
+    prime_document(course)
+    await add_leaderboard_members(str(course.id), payload.student_ids)
+    await discard_dashboard_sections()
     return MessageResponse(message=f"РљСѓСЂСЃ '{course.name}' СЃРѕР·РґР°РЅ", success=True)
 
 
@@ -223,12 +263,13 @@ async def update_course(
     payload: UpdateCourseRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="РќРµС‚ РїСЂР°РІ РЅР° РёР·РјРµРЅРµРЅРёРµ РєСѓСЂСЃР°")
 
+    changes = {}
     for field in [
         "name",
         "description",
@@ -242,9 +283,9 @@ async def update_course(
     ]:
         value = getattr(payload, field)
         if value is not None:
-            setattr(course, field, value)
+            changes[field] = value
     course.touch()
-    await course.save()
+    await course.set({**changes, "updated_at": course.updated_at})
     if payload.programming_language is not None:
         topics = await Topic.find(Topic.course_id == course_id).to_list()
         for topic in topics:
@@ -255,6 +296,7 @@ async def update_course(
                 task.language = course.programming_language
                 task.touch()
                 await task.save()
+    await discard_dashboard_sections()
     return MessageResponse(message="РљСѓСЂСЃ РѕР±РЅРѕРІР»РµРЅ", success=True)
 
 
@@ -264,16 +306,22 @@ async def set_course_members(
     payload: SetCourseMembersRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="РќРµС‚ РїСЂР°РІ РЅР° РёР·РјРµРЅРµРЅРёРµ РєСѓСЂСЃР°")
 
-    course.student_ids = payload.student_ids
-    course.teacher_ids = list(set(payload.teacher_ids + [str(user.id)]))
     course.touch()
-    await course.save()
+    await course.set(
+        {
+            "student_ids": payload.student_ids,
+            "teacher_ids": list(set(payload.teacher_ids + [str(user.id)])),
+            "updated_at": course.updated_at,
+        }
+    )
+    await add_leaderboard_members(course_id, payload.student_ids)
+    await discard_dashboard_sections()
     return MessageResponse(message="РЎРѕСЃС‚Р°РІ РєСѓСЂСЃР° РѕР±РЅРѕРІР»РµРЅ", success=True)
 
 
@@ -283,7 +331,7 @@ async def create_course_group(
     payload: CreateCourseGroupRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
     if not await can_edit_course(user, course):
@@ -297,14 +345,15 @@ async def create_course_group(
         schedule_slots=payload.schedule_slots,
         start_date=payload.start_date,
         current_topic_id=payload.current_topic_id,
+        runner_weight=payload.runner_weight,
     )
     await group.insert()
+    prime_document(group)
 
-    if str(group.id) not in course.group_ids:
-        course.group_ids.append(str(group.id))
-        course.touch()
-        await course.save()
+    await add_child_id(course, "group_ids", str(group.id))
+    await add_leaderboard_members(course_id, group.students)
 
+    await discard_dashboard_sections()
     return await serialize_group(group, course)
 
 
@@ -315,13 +364,13 @@ async def update_course_group(
     payload: UpdateCourseGroupRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="РќРµС‚ РїСЂР°РІ РЅР° РёР·РјРµРЅРµРЅРёРµ РєСѓСЂСЃР°")
 
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group or group.course_id != course_id:
         raise HTTPException(status_code=404, detail="Р“СЂСѓРїРїР° РЅРµ РЅР°Р№РґРµРЅР°")
 
@@ -333,6 +382,8 @@ async def update_course_group(
         group.start_date = payload.start_date or None
     if "current_topic_id" in payload.model_fields_set:
         group.current_topic_id = payload.current_topic_id or None
+    if payload.runner_weight is not None:
+        group.runner_weight = payload.runner_weight
     if payload.student_ids is not None:
         await group.save()
         course_groups = await get_groups_for_course(course)
@@ -347,9 +398,11 @@ async def update_course_group(
                     if student_id not in normalized_student_ids
                 ]
             await course_group.save()
-        group = await Group.get(group_id)
+        await add_leaderboard_members(course_id, normalized_student_ids)
+        group = await load_document(Group, group_id)
     group.teachers = list(set(group.teachers + course.teacher_ids + [str(user.id)]))
     await group.save()
+    await discard_dashboard_sections()
     return await serialize_group(group, course)
 
 
@@ -359,26 +412,26 @@ async def delete_course_group(
     group_id: str,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="РќРµС‚ РїСЂР°РІ РЅР° РёР·РјРµРЅРµРЅРёРµ РєСѓСЂСЃР°")
 
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group or group.course_id != course_id:
         raise HTTPException(status_code=404, detail="Р“СЂСѓРїРїР° РЅРµ РЅР°Р№РґРµРЅР°")
 
-    course.group_ids = [item for item in course.group_ids if item != group_id]
-    course.touch()
-    await course.save()
+    await remove_child_id(course, "group_ids", group_id)
     await group.delete()
+    clear_document(Group, group.id)
+    await discard_dashboard_sections()
     return MessageResponse(message="Р“СЂСѓРїРїР° СѓРґР°Р»РµРЅР°", success=True)
 
 
 @router.post("/{course_id}/request", response_model=MessageResponse)
 async def create_course_request(course_id: str, payload: CreateCourseRequestLeadRequest):
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="РљСѓСЂСЃ РЅРµ РЅР°Р№РґРµРЅ")
 
@@ -390,6 +443,7 @@ async def create_course_request(course_id: str, payload: CreateCourseRequestLead
         comment=payload.comment,
     )
     await request.insert()
+    await discard_dashboard_sections()
     return MessageResponse(
         message="Р—Р°СЏРІРєР° РѕС‚РїСЂР°РІР»РµРЅР°. РњС‹ СЃРІСЏР¶РµРјСЃСЏ СЃ РІР°РјРё.",
         success=True,
@@ -5,6 +5,10 @@ from models.user import UserType
 from schemas.requests import CreateGroupRequest, UpdateGroupRequest, AddStudentsToGroupRequest, AddTeachersToGroupRequest
 from schemas.responses import GroupResponse, MessageResponse, UserGroupsResponse
 from services.auth_service import get_current_user_with_role
+from services.course_stats_service import add_child_id
+from services.document_loader import load_document, prime_document
+from services.leaderboard_service import add_leaderboard_members
+from services.response_cache_service import discard_dashboard_sections
 from services.user_service import get_by_tg_username
 
 router = APIRouter(prefix="/group", tags=["Группы"])
@@ -18,7 +22,7 @@ async def create_group(
     
     # Проверяем существование курса
     from models.course import Course
-    course = await Course.get(group_data.course_id)
+    course = await load_document(Course, group_data.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     
@@ -29,10 +33,11 @@ async def create_group(
         description=group_data.description
     )
     await group.insert()
+    prime_document(group)
     
     # Добавляем группу в курс
-    course.group_ids.append(str(group.id))
-    await course.save()
+    await add_child_id(course, "group_ids", str(group.id))
+    await discard_dashboard_sections()
     
     return MessageResponse(
         message=f"Группа '{group.name}' успешно создана с ID: {str(group.id)}",
@@ -46,7 +51,7 @@ async def update_group(
     access_token: str = Body(..., description="Токен доступа преподавателя")
 ):
     user = await get_current_user_with_role(access_token, UserType.TEACHER)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Группа не найдена")
     
@@ -56,6 +61,7 @@ async def update_group(
         group.description = group_data.description
     
     await group.save()
+    await discard_dashboard_sections()
     return MessageResponse(
         message=f"Группа '{group.name}' успешно обновлена",
         success=True
@@ -70,7 +76,7 @@ async def add_students_to_group_bulk(
     from services.user_service import get_user_ids_by_tg_usernames
     
     user = await get_current_user_with_role(access_token, UserType.TEACHER)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Группа не найдена")
     
@@ -84,6 +90,8 @@ async def add_students_to_group_bulk(
             added_count += 1
     
     await group.save()
+    await add_leaderboard_members(group.course_id, student_user_ids)
+    await discard_dashboard_sections()
     return MessageResponse(
         message=f"Добавлено {added_count} студентов в группу '{group.name}'",
         success=True
@@ -98,7 +106,7 @@ async def add_student_to_group(
     from services.user_service import get_user_id_by_tg_username
     
     user = await get_current_user_with_role(access_token, UserType.TEACHER)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     student = await get_by_tg_username(student_tg)
     
     if not group:
@@ -110,6 +118,8 @@ async def add_student_to_group(
     if student_user_id not in group.students:
         group.students.append(student_user_id)
         await group.save()
+        await add_leaderboard_members(group.course_id, [student_user_id])
+        await discard_dashboard_sections()
         return MessageResponse(
             message=f"Студент {student_tg} успешно добавлен в группу {group.name}",
             success=True
@@ -127,7 +137,7 @@ async def remove_student_from_group(
     access_token: str = Body(..., description="Токен доступа преподавателя")
 ):
     user = await get_current_user_with_role(access_token, UserType.TEACHER)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     student = await get_by_tg_username(student_tg)
     
     if not group:
@@ -139,6 +149,7 @@ async def remove_student_from_group(
     if student_user_id in group.students:
         group.students.remove(student_user_id)
         await group.save()
+        await discard_dashboard_sections()
         return MessageResponse(
             message=f"Студент {student_tg} успешно удален из группы {group.name}",
             success=True
@@ -156,7 +167,7 @@ async def add_teacher_to_group(
     access_token: str = Body(..., description="Токен доступа администратора")
 ):
     user = await get_current_user_with_role(access_token, UserType.ADMIN)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     teacher = await get_by_tg_username(teacher_tg)
     
     if not group:
@@ -168,6 +179,7 @@ async def add_teacher_to_group(
     if teacher_user_id not in group.teachers:
         group.teachers.append(teacher_user_id)
         await group.save()
+        await discard_dashboard_sections()
         return MessageResponse(
             message=f"Преподаватель {teacher_tg} успешно добавлен в группу {group.name}",
             success=True
@@ -185,7 +197,7 @@ async def remove_teacher_from_group(
     access_token: str = Body(..., description="Токен доступа администратора")
 ):
     user = await get_current_user_with_role(access_token, UserType.ADMIN)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     teacher = await get_by_tg_username(teacher_tg)
     
     if not group:
@@ -197,6 +209,7 @@ async def remove_teacher_from_group(
     if teacher_user_id in group.teachers:
         group.teachers.remove(teacher_user_id)
         await group.save()
+        await discard_dashboard_sections()
         return MessageResponse(
             message=f"Преподаватель {teacher_tg} успешно удален из группы {group.name}",
             success=True
@@ -215,7 +228,7 @@ async def group_info(
     from services.user_service import get_tg_usernames_by_user_ids
     
     await get_current_user_with_role(access_token, UserType.STUDENT)
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Группа не найдена")
     
@@ -1,15 +1,21 @@
+import asyncio
+import json
+import logging
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from models.achievement import AchievementTrigger
 from models.course import Course
+from models.output_check_mode import OutputCheckMode
 from models.programming_language import (
     ProgrammingLanguage,
     get_programming_language_label,
     normalize_programming_language,
 )
+from models.submission_job import SubmissionJob
 from models.task import Task, TaskStatus, TaskSubmission, TaskTestCase
 from models.topic import Topic
 from models.user import User, UserType
@@ -20,7 +26,15 @@ from schemas.requests import (
     SubmitTaskSolutionRequest,
     UpdateTaskRequest,
 )
-from schemas.responses import MessageResponse, TaskCodeRunResponse, TaskResponse
+from schemas.responses import (
+    MessageResponse,
+    PendingReviewPageResponse,
+    SubmissionJobResponse,
+    SubmissionQueueStatsResponse,
+    TaskCodeRunResponse,
+    TaskResponse,
+    TaskSubmissionPageResponse,
+)
 from services.achievement_service import unlock_achievements_for_trigger
 from services.auth_service import get_current_user_dependency, require_role
 from services.code_runner_service import (
@@ -29,17 +43,60 @@ from services.code_runner_service import (
     run_python_program,
     run_python_solution,
 )
+from services.course_stats_service import add_child_id, apply_task_change, remove_child_id
+from services.document_loader import clear_document, load_document, prime_document
 from services.learning_service import (
     can_edit_course,
     get_courses_for_user,
     get_group_visible_topic_order,
     get_student_group_for_course,
 )
-from services.serializer_service import serialize_achievement_notice, serialize_task
-from services.task_execution_service import run_code_with_queue, submit_code_with_queue
+from services.response_cache_service import discard_dashboard_sections
+from services.serializer_service import (
+    build_dashboard_pending_reviews,
+    serialize_achievement_notice,
+    serialize_submission,
+    serialize_submission_job,
+    serialize_task,
+    serialize_test_run_result,
+)
+from services.submission_history_service import (
+    SUBMISSION_PAGE_SIZE,
+    get_submission_page,
+    mark_submission_reviewed,
+    store_submission,
+)
+from services.submission_queue_service import (
+    SUBMISSION_QUEUE_ENABLED,
+    enqueue_submission,
+    get_queue_stats,
+)
+from services.task_execution_service import (
+    RUN_LANE,
+    consume_run_rate_limit,
+    consume_submit_rate_limit,
+    get_runner_stats,
+    get_runner_weight,
+    run_in_runner_slot,
+    stream_code_with_queue,
+)
+from services.task_result_service import REVIEW_PAGE_SIZE, delete_task_results, update_task_result
+from services.verdict_cache_service import (
+    get_cached_program,
+    get_cached_solution,
+    invalidate_task_verdicts,
+    program_cache_key,
+    solution_cache_key,
+    store_program,
+    store_solution,
+)
 
 
 router = APIRouter(prefix="/task", tags=["Задачи"])
+logger = logging.getLogger("tasks")
+# Streamed submissions keep judging after the client disconnects; hold the
+# tasks here so they are not garbage-collected mid-run.
+_streamed_submissions: set[asyncio.Task] = set()
 
 
 def lesson_is_available(topic: Topic, ordered_topics: list[Topic]) -> bool:
@@ -72,11 +129,27 @@ def ensure_task_language_matches_course(requested_language: str | None, course:
     return course_language
 
 
-def run_solution_for_language(language: str, code: str, tests: list[TaskTestCase]):
+def run_solution_for_language(
+    language: str,
+    code: str,
+    tests: list[TaskTestCase],
+    on_test_result=None,
+    check_mode: OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
+):
     normalized_language = normalize_programming_language(language)
-    if normalized_language == ProgrammingLanguage.JAVASCRIPT:
-        return run_javascript_solution(code, tests)
-    return run_python_solution(code, tests)
+    run_solution = (
+        run_javascript_solution
+        if normalized_language == ProgrammingLanguage.JAVASCRIPT
+        else run_python_solution
+    )
+    return run_solution(
+        code,
+        tests,
+        on_test_result=on_test_result,
+        check_mode=check_mode,
+        float_tolerance=float_tolerance,
+    )
 
 
 def run_program_for_language(language: str, code: str, input_data: str):
@@ -86,12 +159,42 @@ def run_program_for_language(language: str, code: str, input_data: str):
     return run_python_program(code, input_data=input_data)
 
 
+async def judge_with_verdict_cache(
+    task: Task,
+    code: str,
+    judge: Callable[[], Awaitable[tuple]],
+) -> tuple:
+    if not task.tests:
+        return await judge()
+    cache_key = solution_cache_key(
+        task.language,
+        code,
+        task.tests,
+        check_mode=task.check_mode,
+        float_tolerance=task.float_tolerance,
+    )
+    cached_outcome = await get_cached_solution(cache_key)
+    if cached_outcome is not None:
+        return cached_outcome
+    run_outcome = await judge()
+    await store_solution(cache_key, run_outcome, str(task.id))
+    return run_outcome
+
+
+async def get_runner_share(user: User, course: Course) -> tuple[str, float]:
+    """Owner key and fair-share weight of the user's runs in this course."""
+    group = None
+    if user.user_type == UserType.STUDENT:
+        group = await get_student_group_for_course(str(user.id), str(course.id))
+    return str(user.id), get_runner_weight(user.user_type.value, getattr(group, "runner_weight", 1.0))
+
+
 async def ensure_topic_access(user: User, topic: Topic, editable: bool) -> None:
     if editable or user.user_type != UserType.STUDENT:
         return
     course_topics = await Topic.find(Topic.course_id == topic.course_id).to_list()
     course_topics.sort(key=lambda item: item.order)
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     student_group = await get_student_group_for_course(str(user.id), str(course.id)) if course else None
     visible_order = get_group_visible_topic_order(student_group, course_topics)
     if topic.order > visible_order:
@@ -99,10 +202,10 @@ async def ensure_topic_access(user: User, topic: Topic, editable: bool) -> None:
 
 
 async def get_task_course(task: Task) -> Course:
-    topic = await Topic.get(task.topic_id)
+    topic = await load_document(Topic, task.topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     return course
@@ -113,10 +216,10 @@ async def add_task(
     payload: CreateTaskRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    topic = await Topic.get(payload.topic_id)
+    topic = await load_document(Topic, payload.topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     if not await can_edit_course(user, course):
@@ -132,12 +235,21 @@ async def add_task(
         language=ensure_task_language_matches_course(payload.language, course),
         requires_manual_review=payload.requires_manual_review,
         tests=[TaskTestCase(**item.model_dump()) for item in payload.tests],
+        check_mode=payload.check_mode,
+        float_tolerance=payload.float_tolerance,
         order=payload.order,
     )
     await task.insert()
-    topic.task_ids.append(str(task.id))
-    topic.touch()
-    await topic.save()
+    prime_document(task)
+    await add_child_id(topic, "task_ids", str(task.id))
+    await apply_task_change(
+        course,
+        topic,
+        points=task.points,
+        tasks=1,
+        manual_review_changed=task.requires_manual_review,
+    )
+    await discard_dashboard_sections()
     return MessageResponse(message=f"Задача '{task.title}' создана", success=True)
 
 
@@ -147,13 +259,15 @@ async def update_task(
     payload: UpdateTaskRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    task = await Task.get(task_id)
+    task = await load_document(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     course = await get_task_course(task)
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="Нет прав на изменение задачи")
 
+    previous_points = task.points
+    previous_manual_review = task.requires_manual_review
     for field in [
         "title",
         "condition",
@@ -161,6 +275,8 @@ async def update_task(
         "points",
         "starter_code",
         "requires_manual_review",
+        "check_mode",
+        "float_tolerance",
         "order",
     ]:
         value = getattr(payload, field)
@@ -169,8 +285,20 @@ async def update_task(
     task.language = ensure_task_language_matches_course(payload.language, course)
     if payload.tests is not None:
         task.tests = [TaskTestCase(**item.model_dump()) for item in payload.tests]
+        await invalidate_task_verdicts(str(task.id))
     task.touch()
     await task.save()
+    manual_review_changed = task.requires_manual_review != previous_manual_review
+    if task.points != previous_points or manual_review_changed:
+        topic = await load_document(Topic, task.topic_id)
+        if topic:
+            await apply_task_change(
+                course,
+                topic,
+                points=task.points - previous_points,
+                manual_review_changed=manual_review_changed,
+            )
+    await discard_dashboard_sections()
     return MessageResponse(message="Задача обновлена", success=True)
 
 
@@ -179,33 +307,59 @@ async def delete_task(
     task_id: str,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    task = await Task.get(task_id)
+    task = await load_document(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
-    topic = await Topic.get(task.topic_id)
+    topic = await load_document(Topic, task.topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="Нет прав на удаление задачи")
 
-    topic.task_ids = [item for item in topic.task_ids if item != str(task.id)]
-    topic.touch()
-    await topic.save()
+    await remove_child_id(topic, "task_ids", str(task.id))
     await task.delete()
+    clear_document(Task, task.id)
+    await apply_task_change(
+        course,
+        topic,
+        points=-task.points,
+        tasks=-1,
+        manual_review_changed=task.requires_manual_review,
+    )
+    await delete_task_results(str(course.id), task_id=str(task.id))
+    await invalidate_task_verdicts(str(task.id))
+    await discard_dashboard_sections()
     return MessageResponse(message="Задача удалена", success=True)
 
+@router.get("/reviews", response_model=PendingReviewPageResponse)
+async def pending_reviews(
+    course_id: Optional[str] = Query(default=None),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=REVIEW_PAGE_SIZE, ge=1, le=100),
+    user: User = Depends(require_role(UserType.TEACHER)),
+):
+    courses = await get_courses_for_user(user)
+    if course_id:
+        courses = [course for course in courses if str(course.id) == course_id]
+        if not courses:
+            raise HTTPException(status_code=404, detail="Курс не найден")
+
+    reviews, total = await build_dashboard_pending_reviews(user, courses, offset, limit)
+    return PendingReviewPageResponse(items=reviews, total=total, offset=offset, limit=limit)
+
+
 @router.get("/topic/{topic_id}", response_model=List[TaskResponse])
 async def tasks_for_topic(
     topic_id: str,
     user: User = Depends(get_current_user_dependency),
 ):
-    topic = await Topic.get(topic_id)
+    topic = await load_document(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     user_courses = {str(item.id) for item in await get_courses_for_user(user)}
@@ -222,7 +376,7 @@ async def task_detail(
     task_id: str,
     user: User = Depends(get_current_user_dependency),
 ):
-    task = await Task.get(task_id)
+    task = await load_document(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     course = await get_task_course(task)
@@ -230,22 +384,17 @@ async def task_detail(
     if user.user_type != UserType.ADMIN and str(course.id) not in user_courses:
         raise HTTPException(status_code=403, detail="Нет доступа к задаче")
     editable = await can_edit_course(user, course)
-    topic = await Topic.get(task.topic_id)
+    topic = await load_document(Topic, task.topic_id)
     if topic:
         await ensure_topic_access(user, topic, editable)
     return await serialize_task(task, user, can_edit=editable)
 
 
-@router.post("/{task_id}/submit", response_model=TaskResponse)
-async def submit_task_solution(
-    task_id: str,
-    payload: SubmitTaskSolutionRequest,
-    user: User = Depends(require_role(UserType.STUDENT)),
-):
+async def get_submittable_task(task_id: str, user: User) -> tuple[Task, Course]:
     if user.user_type != UserType.STUDENT:
         raise HTTPException(status_code=400, detail="Решения могут отправлять только ученики")
 
-    task = await Task.get(task_id)
+    task = await load_document(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     course = await get_task_course(task)
@@ -253,72 +402,274 @@ async def submit_task_solution(
     if str(course.id) not in user_courses:
         raise HTTPException(status_code=403, detail="Нет доступа к задаче")
 
-    topic = await Topic.get(task.topic_id)
+    topic = await load_document(Topic, task.topic_id)
     if topic:
         await ensure_topic_access(user, topic, editable=False)
+    return task, course
 
-    result = task.upsert_result(str(user.id))
-    already_solved = result.status == TaskStatus.CORRECT
 
-    passed, passed_tests, stdout, stderr, test_results = await submit_code_with_queue(
-        str(user.id),
-        str(task.id),
-        lambda: run_solution_for_language(
-            task.language,
-            payload.code,
-            task.tests,
-        ),
-    )
-    waiting_manual_review = passed and task.requires_manual_review and not already_solved
+def format_sse_event(event: str, data: object) -> str:
+    if hasattr(data, "model_dump_json"):
+        payload = data.model_dump_json()
+    else:
+        payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def stream_submission_events(
+    task: Task,
+    user: User,
+    course: Course,
+    code: str,
+) -> AsyncIterator[str]:
+    events: asyncio.Queue[str | None] = asyncio.Queue()
+    total_tests = len(task.tests)
+    reported_tests = 0
+
+    async def report_test(item) -> None:
+        nonlocal reported_tests
+        reported_tests += 1
+        await events.put(
+            format_sse_event(
+                "test",
+                {
+                    "index": reported_tests,
+                    "total": total_tests,
+                    "result": serialize_test_run_result(item, include_hidden_details=False).model_dump(),
+                },
+            )
+        )
 
-    result.attempts += 1
-    result.review_comment = None
+    async def run_streamed() -> tuple:
+        run_outcome = None
+        owner, weight = await get_runner_share(user, course)
+        async for kind, item in stream_code_with_queue(
+            lambda report: run_solution_for_language(
+                task.language,
+                code,
+                task.tests,
+                on_test_result=report,
+                check_mode=task.check_mode,
+                float_tolerance=task.float_tolerance,
+            ),
+            owner=owner,
+            weight=weight,
+        ):
+            if kind == "result":
+                run_outcome = item
+            elif kind == "queue":
+                await events.put(format_sse_event("queue", {"position": item}))
+            else:
+                await report_test(item)
+        return run_outcome
+
+    async def judge() -> None:
+        run_outcome = await judge_with_verdict_cache(task, code, run_streamed)
+        # A cached verdict never reaches the runner, so replay its tests.
+        for item in run_outcome[4][reported_tests:]:
+            await report_test(item)
+
+        newly_unlocked = await record_submission_result(task, user, course, code, run_outcome)
+        task_response = await serialize_task(task, user, can_edit=False)
+        task_response.newly_unlocked_achievements = [
+            serialize_achievement_notice(item) for item in newly_unlocked
+        ]
+        await events.put(format_sse_event("result", task_response))
+
+    judging = asyncio.ensure_future(judge())
+    _streamed_submissions.add(judging)
+    judging.add_done_callback(_streamed_submissions.discard)
+    judging.add_done_callback(lambda _: events.put_nowait(None))
+
+    while (event := await events.get()) is not None:
+        yield event
+    if not judging.cancelled() and (error := judging.exception()) is not None:
+        logger.error("Streamed submission of %s for task %s failed", user.id, task.id, exc_info=error)
+        yield format_sse_event("error", {"detail": "Не удалось проверить решение"})
+
+
+async def record_submission_result(
+    task: Task,
+    user: User,
+    course: Course,
+    code: str,
+    run_outcome: tuple,
+) -> list:
+    passed, passed_tests, stdout, stderr, test_results = run_outcome
     submission = TaskSubmission(
-        code=payload.code,
+        code=code,
         passed=passed,
         passed_tests=passed_tests,
         total_tests=len(task.tests),
         stdout=stdout,
         stderr=stderr,
         test_results=test_results,
-        waiting_manual_review=waiting_manual_review,
+        waiting_manual_review=passed and task.requires_manual_review,
     )
-    result.add_submission(submission)
-
-    newly_unlocked = await unlock_achievements_for_trigger(user, AchievementTrigger.FIRST_SUBMISSION)
-
-    if passed:
-        if waiting_manual_review:
-            result.status = TaskStatus.PENDING_REVIEW
+    # Stored first, so the result never points at a submission that is missing.
+    submission_id = await store_submission(str(task.id), str(user.id), submission)
+
+    def apply_submission(result) -> tuple[bool, bool, bool]:
+        already_solved = result.status == TaskStatus.CORRECT
+        was_pending_review = result.status == TaskStatus.PENDING_REVIEW
+        waiting_manual_review = submission.waiting_manual_review and not already_solved
+
+        result.attempts += 1
+        result.review_comment = None
+        result.add_submission(submission_id, submission)
+
+        if passed:
+            if waiting_manual_review:
+                result.status = TaskStatus.PENDING_REVIEW
+                result.score = 0
+                result.solved_at = None
+                result.reviewed_at = None
+            else:
+                result.status = TaskStatus.CORRECT
+                result.score = task.points
+                result.solved_at = result.solved_at or datetime.utcnow()
+        elif not already_solved:
+            result.status = TaskStatus.WRONG_ANSWER
             result.score = 0
             result.solved_at = None
-            result.reviewed_at = None
-        else:
-            result.status = TaskStatus.CORRECT
-            result.score = task.points
-            result.solved_at = result.solved_at or datetime.utcnow()
-            if not already_solved:
-                user.award_points(task.points)
-                newly_unlocked.extend(
-                    await unlock_achievements_for_trigger(
-                        user,
-                        AchievementTrigger.FIRST_SOLVED_TASK,
-                        course_id=str(course.id),
-                    )
-                )
-    elif not already_solved:
-        result.status = TaskStatus.WRONG_ANSWER
-        result.score = 0
-        result.solved_at = None
+        review_queue_changed = was_pending_review != (result.status == TaskStatus.PENDING_REVIEW)
+        return waiting_manual_review, passed and not waiting_manual_review and not already_solved, review_queue_changed
 
-    task.touch()
-    await task.save()
+    _result, (waiting_manual_review, newly_solved, review_queue_changed) = await update_task_result(
+        task,
+        str(course.id),
+        str(user.id),
+        apply_submission,
+    )
+    if submission.waiting_manual_review and not waiting_manual_review:
+        # The task was already solved, so this submission needs no review.
+        await mark_submission_reviewed(submission_id, None)
+    if review_queue_changed:
+        # The review queue is shown to every teacher of the course and to admins.
+        await discard_dashboard_sections()
+    else:
+        await discard_dashboard_sections(str(user.id))
+
+    newly_unlocked = await unlock_achievements_for_trigger(user, AchievementTrigger.FIRST_SUBMISSION)
+    if newly_solved:
+        user.award_points(task.points)
+        newly_unlocked.extend(
+            await unlock_achievements_for_trigger(
+                user,
+                AchievementTrigger.FIRST_SOLVED_TASK,
+                course_id=str(course.id),
+            )
+        )
     await user.save()
-    response = await serialize_task(task, user, can_edit=False)
-    response.newly_unlocked_achievements = [
+    return newly_unlocked
+
+
+@router.get("/queue/stats", response_model=SubmissionQueueStatsResponse)
+async def submission_queue_stats(
+    user: User = Depends(require_role(UserType.TEACHER)),
+):
+    return SubmissionQueueStatsResponse(**await get_queue_stats(), runner=get_runner_stats())
+
+
+@router.get("/jobs/{job_id}", response_model=SubmissionJobResponse)
+async def submission_job_detail(
+    job_id: str,
+    user: User = Depends(get_current_user_dependency),
+):
+    job = await SubmissionJob.get(job_id)
+    if not job or job.user_id != str(user.id):
+        raise HTTPException(status_code=404, detail="Отправка не найдена")
+    return await serialize_submission_job(job, user)
+
+
+@router.get("/{task_id}/submissions", response_model=TaskSubmissionPageResponse)
+async def task_submission_history(
+    task_id: str,
+    student_id: Optional[str] = Query(default=None),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=SUBMISSION_PAGE_SIZE, ge=1, le=100),
+    user: User = Depends(get_current_user_dependency),
+):
+    task = await load_document(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    course = await get_task_course(task)
+    editable = await can_edit_course(user, course)
+    if student_id and student_id != str(user.id):
+        if not editable:
+            raise HTTPException(status_code=403, detail="Нет доступа к истории отправок")
+    else:
+        user_courses = {str(item.id) for item in await get_courses_for_user(user)}
+        if user.user_type != UserType.ADMIN and str(course.id) not in user_courses:
+            raise HTTPException(status_code=403, detail="Нет доступа к задаче")
+        student_id = str(user.id)
+
+    submissions, total = await get_submission_page(str(task.id), student_id, offset, limit)
+    return TaskSubmissionPageResponse(
+        items=[serialize_submission(item, include_hidden_details=editable) for item in submissions],
+        total=total,
+        offset=offset,
+        limit=limit,
+    )
+
+
+@router.post("/{task_id}/submit", response_model=TaskResponse | SubmissionJobResponse)
+async def submit_task_solution(
+    task_id: str,
+    payload: SubmitTaskSolutionRequest,
+    response: Response,
+    queued: bool = Query(
+        default=SUBMISSION_QUEUE_ENABLED,
+        description="Поставить решение в очередь и сразу вернуть id проверки",
+    ),
+    user: User = Depends(require_role(UserType.STUDENT)),
+):
+    task, course = await get_submittable_task(task_id, user)
+
+    if queued:
+        await consume_submit_rate_limit(str(user.id), str(task.id))
+        job = await enqueue_submission(str(task.id), str(user.id), payload.code)
+        response.status_code = 202
+        return await serialize_submission_job(job, user)
+
+    await consume_submit_rate_limit(str(user.id), str(task.id))
+    owner, weight = await get_runner_share(user, course)
+    run_outcome = await judge_with_verdict_cache(
+        task,
+        payload.code,
+        lambda: run_in_runner_slot(
+            lambda: run_solution_for_language(
+                task.language,
+                payload.code,
+                task.tests,
+                check_mode=task.check_mode,
+                float_tolerance=task.float_tolerance,
+            ),
+            owner=owner,
+            weight=weight,
+        ),
+    )
+    newly_unlocked = await record_submission_result(task, user, course, payload.code, run_outcome)
+    task_response = await serialize_task(task, user, can_edit=False)
+    task_response.newly_unlocked_achievements = [
         serialize_achievement_notice(item) for item in newly_unlocked
     ]
-    return response
+    return task_response
+
+
+@router.post("/{task_id}/submit/stream")
+async def submit_task_solution_stream(
+    task_id: str,
+    payload: SubmitTaskSolutionRequest,
+    user: User = Depends(require_role(UserType.STUDENT)),
+):
+    task, course = await get_submittable_task(task_id, user)
+    await consume_submit_rate_limit(str(user.id), str(task.id))
+    return StreamingResponse(
+        stream_submission_events(task, user, course, payload.code),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/{task_id}/run", response_model=TaskCodeRunResponse)
@@ -327,7 +678,7 @@ async def run_task_code(
     payload: RunTaskCodeRequest,
     user: User = Depends(get_current_user_dependency),
 ):
-    task = await Task.get(task_id)
+    task = await load_document(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
 
@@ -337,19 +688,27 @@ async def run_task_code(
         raise HTTPException(status_code=403, detail="Нет доступа к задаче")
 
     editable = await can_edit_course(user, course)
-    topic = await Topic.get(task.topic_id)
+    topic = await load_document(Topic, task.topic_id)
     if topic:
         await ensure_topic_access(user, topic, editable)
 
-    success, exit_code, stdout, stderr, timed_out = await run_code_with_queue(
-        str(user.id),
-        str(task.id),
-        lambda: run_program_for_language(
-            task.language,
-            payload.code,
-            payload.input_data,
-        ),
-    )
+    await consume_run_rate_limit(str(user.id), str(task.id))
+    cache_key = program_cache_key(task.language, payload.code, payload.input_data)
+    run_outcome = await get_cached_program(cache_key)
+    if run_outcome is None:
+        owner, weight = await get_runner_share(user, course)
+        run_outcome = await run_in_runner_slot(
+            lambda: run_program_for_language(
+                task.language,
+                payload.code,
+                payload.input_data,
+            ),
+            lane=RUN_LANE,
+            owner=owner,
+            weight=weight,
+        )
+        await store_program(cache_key, run_outcome)
+    success, exit_code, stdout, stderr, timed_out = run_outcome
     return TaskCodeRunResponse(
         input_data=payload.input_data,
         stdout=stdout,
@@ -367,46 +726,46 @@ async def review_task_submission(
     payload: ReviewTaskSubmissionRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    task = await Task.get(task_id)
+    task = await load_document(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     course = await get_task_course(task)
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="Нет прав на ручную проверку")
 
-    student = await User.get(student_id)
+    student = await load_document(User, student_id)
     if not student or student.user_type != UserType.STUDENT:
         raise HTTPException(status_code=404, detail="Ученик не найден")
 
-    result = task.get_result_for_student(student_id)
-    if not result or not result.last_submission:
-        raise HTTPException(status_code=404, detail="У ученика нет отправки по задаче")
-    if result.status != TaskStatus.PENDING_REVIEW:
-        raise HTTPException(status_code=400, detail="Задача не ожидает ручной проверки")
+    def apply_review(result) -> None:
+        if not result.last_submission:
+            raise HTTPException(status_code=404, detail="У ученика нет отправки по задаче")
+        if result.status != TaskStatus.PENDING_REVIEW:
+            raise HTTPException(status_code=400, detail="Задача не ожидает ручной проверки")
 
-    result.review_comment = payload.comment
-    result.reviewed_at = datetime.utcnow()
-    result.last_submission.waiting_manual_review = False
-    result.last_submission.review_comment = payload.comment
+        result.review_comment = payload.comment
+        result.reviewed_at = datetime.utcnow()
+        if payload.approve:
+            result.status = TaskStatus.CORRECT
+            result.score = task.points
+            result.solved_at = result.solved_at or datetime.utcnow()
+        else:
+            result.status = TaskStatus.WRONG_ANSWER
+            result.score = 0
+            result.solved_at = None
 
+    result, _ = await update_task_result(task, str(course.id), student_id, apply_review)
+    await mark_submission_reviewed(result.last_submission.submission_id, payload.comment)
+    # The submission left the review queue of every teacher of the course.
+    await discard_dashboard_sections()
+    newly_unlocked = []
     if payload.approve:
-        result.status = TaskStatus.CORRECT
-        result.score = task.points
-        result.solved_at = result.solved_at or datetime.utcnow()
         student.award_points(task.points)
         newly_unlocked = await unlock_achievements_for_trigger(
             student,
             AchievementTrigger.FIRST_SOLVED_TASK,
             course_id=str(course.id),
         )
-    else:
-        newly_unlocked = []
-        result.status = TaskStatus.WRONG_ANSWER
-        result.score = 0
-        result.solved_at = None
-
-    task.touch()
-    await task.save()
     await student.save()
     response = await serialize_task(task, user, can_edit=True)
     response.newly_unlocked_achievements = [
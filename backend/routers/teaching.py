@@ -23,7 +23,9 @@ from services.billing_service import (
     mark_month_paid,
     parse_date,
 )
+from services.document_loader import load_document
 from services.learning_service import can_edit_course, get_student_group_for_course
+from services.response_cache_service import discard_dashboard_sections
 
 
 router = APIRouter(prefix="/teaching", tags=["Teaching"])
@@ -33,11 +35,11 @@ async def get_manageable_group(group_id: str, user: User) -> tuple[Group, Course
     if user.user_type not in {UserType.TEACHER, UserType.ADMIN}:
         raise HTTPException(status_code=403, detail="Недостаточно прав")
 
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Группа не найдена")
 
-    course = await Course.get(group.course_id)
+    course = await load_document(Course, group.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
 
@@ -55,11 +57,11 @@ async def get_manageable_student_course(
     if user.user_type not in {UserType.TEACHER, UserType.ADMIN}:
         raise HTTPException(status_code=403, detail="Недостаточно прав")
 
-    student = await User.get(student_id)
+    student = await load_document(User, student_id)
     if not student or student.user_type != UserType.STUDENT:
         raise HTTPException(status_code=404, detail="Ученик не найден")
 
-    course = await Course.get(course_id)
+    course = await load_document(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
 
@@ -252,6 +254,7 @@ async def update_student_payment_mode(
     enrollment.payment_mode = payload.payment_mode
     enrollment.touch()
     await enrollment.save()
+    await discard_dashboard_sections()
     return MessageResponse(message="Тип оплаты обновлен")
 
 
@@ -269,6 +272,7 @@ async def add_subscription_payment(
         group_id=str(group.id) if group else None,
     )
     await mark_month_paid(enrollment, payload.month, payload.note)
+    await discard_dashboard_sections()
     return MessageResponse(message="Оплата по абонементу сохранена")
 
 
@@ -291,4 +295,5 @@ async def add_lesson_prepayment(
     applied = await apply_prepayment(enrollment, course, group, payload.lessons_count, payload.note)
     if applied <= 0:
         raise HTTPException(status_code=400, detail="Не удалось применить предоплату к будущим занятиям")
+    await discard_dashboard_sections()
     return MessageResponse(message=f"Предоплата отмечена на {applied} занятий")
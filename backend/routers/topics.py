@@ -6,13 +6,18 @@ from models.user import User, UserType
 from schemas.requests import CreateTopicRequest, UpdateTopicRequest
 from schemas.responses import LessonDetailResponse, MessageResponse
 from services.auth_service import get_current_user_dependency, require_role
+from services.course_stats_service import add_child_id, refresh_manual_review_flags, remove_child_id, shift_totals
+from services.document_loader import clear_document, load_document, prime_document
 from services.learning_service import (
     can_edit_course,
     get_courses_for_user,
     get_group_visible_topic_order,
     get_student_group_for_course,
 )
+from services.progress_service import get_topics_progress
 from services.serializer_service import serialize_course, serialize_task, serialize_topic
+from services.task_result_service import delete_task_results
+from services.response_cache_service import discard_dashboard_sections
 from models.task import Task
 
 
@@ -46,7 +51,7 @@ async def add_topic(
     payload: CreateTopicRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    course = await Course.get(payload.course_id)
+    course = await load_document(Course, payload.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     if not await can_edit_course(user, course):
@@ -63,9 +68,9 @@ async def add_topic(
         is_open=len(existing_topics) == 0,
     )
     await topic.insert()
-    course.topic_ids.append(str(topic.id))
-    course.touch()
-    await course.save()
+    prime_document(topic)
+    await add_child_id(course, "topic_ids", str(topic.id))
+    await discard_dashboard_sections()
     return MessageResponse(message=f"Урок '{topic.name}' создан", success=True)
 
 
@@ -75,21 +80,23 @@ async def update_topic(
     payload: UpdateTopicRequest,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    topic = await Topic.get(topic_id)
+    topic = await load_document(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="Нет прав на изменение урока")
 
+    changes = {}
     for field in ["name", "description", "content", "resources", "order", "is_open"]:
         value = getattr(payload, field)
         if value is not None:
-            setattr(topic, field, value)
+            changes[field] = value
     topic.touch()
-    await topic.save()
+    await topic.set({**changes, "updated_at": topic.updated_at})
+    await discard_dashboard_sections()
     return MessageResponse(message="Урок обновлен", success=True)
 
 
@@ -98,19 +105,23 @@ async def delete_topic(
     topic_id: str,
     user: User = Depends(require_role(UserType.TEACHER)),
 ):
-    topic = await Topic.get(topic_id)
+    topic = await load_document(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
     if not await can_edit_course(user, course):
         raise HTTPException(status_code=403, detail="Нет прав на удаление урока")
 
-    course.topic_ids = [item for item in course.topic_ids if item != str(topic.id)]
-    course.touch()
-    await course.save()
+    await remove_child_id(course, "topic_ids", str(topic.id))
     await topic.delete()
+    clear_document(Topic, topic.id)
+    await delete_task_results(str(course.id), topic_id=str(topic.id))
+    await shift_totals(course, points=-topic.total_points, tasks=-topic.total_tasks)
+    if topic.has_manual_review_tasks:
+        await refresh_manual_review_flags(course)
+    await discard_dashboard_sections()
     return MessageResponse(message="Урок удален", success=True)
 
 
@@ -119,10 +130,10 @@ async def topic_detail(
     topic_id: str,
     user: User = Depends(get_current_user_dependency),
 ):
-    topic = await Topic.get(topic_id)
+    topic = await load_document(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Урок не найден")
-    course = await Course.get(topic.course_id)
+    course = await load_document(Course, topic.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Курс не найден")
 
@@ -138,15 +149,23 @@ async def topic_detail(
         raise HTTPException(status_code=403, detail="РЈСЂРѕРє РїРѕРєР° Р·Р°РєСЂС‹С‚")
     tasks = await Task.find(Task.topic_id == topic_id).to_list()
     tasks.sort(key=lambda item: item.order)
+    lesson_progress = await get_topics_progress(course_topics, str(user.id))
     return LessonDetailResponse(
         course=await serialize_course(course, user),
-        lesson=await serialize_topic(topic, user, can_edit=editable, can_access=can_access),
+        lesson=await serialize_topic(
+            topic,
+            user,
+            can_edit=editable,
+            can_access=can_access,
+            progress=lesson_progress.get(str(topic.id)),
+        ),
         course_lessons=[
             await serialize_topic(
                 item,
                 user,
                 can_edit=editable,
                 can_access=await lesson_is_available_for_user(user, course, item, course_topics, editable),
+                progress=lesson_progress.get(str(item.id)),
             )
             for item in course_topics
         ],
@@ -1,10 +1,12 @@
+import asyncio
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
-from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import JSONResponse
 
 from models.achievement import Achievement
 from models.course import Course
@@ -18,8 +20,17 @@ from schemas.requests import (
     LinkParentRequest,
     UpdateUserRequest,
 )
-from schemas.responses import AdminStudentsResponse, DashboardResponse, MessageResponse, StudentAdminResponse, UserResponse
+from schemas.responses import (
+    AdminStudentsResponse,
+    DashboardResponse,
+    DashboardSectionResponse,
+    MessageResponse,
+    StudentAdminResponse,
+    UserResponse,
+)
 from services.auth_service import AuthService, get_current_user_dependency, get_current_user_with_role, require_role
+from services.document_loader import load_document, load_documents, prime_document
+from services.leaderboard_service import add_leaderboard_members, rename_leaderboard_member
 from services.learning_service import (
     can_edit_course,
     get_course_students,
@@ -27,32 +38,42 @@ from services.learning_service import (
     get_student_group_assignments,
     sync_student_course_memberships,
 )
+from services.response_cache_service import (
+    dashboard_cache,
+    discard_dashboard_sections,
+    etag_matches,
+    get_dashboard_versions,
+)
 from services.serializer_service import (
     build_dashboard_pending_reviews,
     serialize_achievement,
-    serialize_course,
     serialize_course_option,
     serialize_course_request,
+    serialize_courses,
     serialize_student_admin,
     serialize_user,
 )
-from services.user_service import get_by_id, get_by_tg_username, get_linked_students_for_parent
+from services.user_service import (
+    get_by_id,
+    get_by_tg_username,
+    get_linked_students_for_parent,
+    get_users_by_ids,
+)
 
 
 router = APIRouter(prefix="/users", tags=["Пользователи"])
 uploads_dir = Path(os.getenv("UPLOADS_DIR", "uploads"))
 profile_uploads_dir = uploads_dir / "profiles"
 profile_uploads_dir.mkdir(parents=True, exist_ok=True)
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
 
 
 async def get_student_courses(student: User, allowed_course_ids: Set[str] | None = None) -> List[Course]:
     direct_courses = await Course.find({"student_ids": str(student.id)}).to_list()
     assignment_map = await get_student_group_assignments(str(student.id))
     merged = {str(course.id): course for course in direct_courses}
-    for course_id in assignment_map:
-        course = await Course.get(course_id)
-        if course:
-            merged[str(course.id)] = course
+    for course in await load_documents(Course, [course_id for course_id in assignment_map if course_id not in merged]):
+        merged[str(course.id)] = course
 
     result = list(merged.values())
     if allowed_course_ids is not None:
@@ -69,12 +90,12 @@ async def serialize_student_entry(
     return await serialize_student_admin(student, courses)
 
 
-async def get_manageable_courses(user: User) -> List[Course]:
+async def get_manageable_courses(user: User, courses: List[Course] | None = None) -> List[Course]:
     if user.user_type == UserType.ADMIN:
         return await Course.find_all().to_list()
 
     manageable_courses: List[Course] = []
-    for course in await get_courses_for_user(user):
+    for course in courses if courses is not None else await get_courses_for_user(user):
         if await can_edit_course(user, course):
             manageable_courses.append(course)
     return manageable_courses
@@ -90,11 +111,7 @@ async def get_manageable_students(user: User, manageable_courses: List[Course])
     for course in manageable_courses:
         student_ids.update(await get_course_students(course))
 
-    students: List[User] = []
-    for student_id in student_ids:
-        student = await User.get(student_id)
-        if student and student.user_type == UserType.STUDENT:
-            students.append(student)
+    students = [student for student in await get_users_by_ids(student_ids) if student.user_type == UserType.STUDENT]
 
     students.sort(key=lambda item: (item.surname.lower(), item.name.lower(), item.tg_username.lower()))
     return students
@@ -129,7 +146,7 @@ async def ensure_accessible_course_group_ids(
         course = manageable_map.get(course_id)
         if not course:
             raise HTTPException(status_code=403, detail="Selected group is not available")
-        group = await Group.get(group_id)
+        group = await load_document(Group, group_id)
         if not group or group.course_id != course_id:
             raise HTTPException(status_code=400, detail="Selected group does not belong to the course")
         normalized[course_id] = group_id
@@ -159,61 +176,173 @@ def can_manage_achievement(user: User, achievement: Achievement, course_map: dic
     return course is not None and str(user.id) in course.teacher_ids
 
 
-@router.get("/dashboard", response_model=DashboardResponse)
-async def dashboard(user: User = Depends(get_current_user_dependency)):
-    courses = await get_courses_for_user(user)
-    serialized_courses = [await serialize_course(course, user) for course in courses]
-    manageable_courses = await get_manageable_courses(user)
+class DashboardContext:
+    """Data shared by the dashboard sections of one user, each part loaded once on first use."""
+
+    def __init__(self, user: User):
+        self.user = user
+        self._loads: Dict[str, asyncio.Future] = {}
+
+    def _load_once(self, name: str, factory: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        if name not in self._loads:
+            self._loads[name] = asyncio.ensure_future(factory())
+        return self._loads[name]
+
+    async def courses(self) -> List[Course]:
+        return await self._load_once("courses", lambda: get_courses_for_user(self.user))
+
+    async def manageable_courses(self) -> List[Course]:
+        return await self._load_once("manageable_courses", self._load_manageable_courses)
+
+    async def _load_manageable_courses(self) -> List[Course]:
+        return await get_manageable_courses(self.user, await self.courses())
+
+    async def achievements(self) -> List[Achievement]:
+        return await self._load_once("achievements", lambda: Achievement.find_all().to_list())
+
+    async def cache_versions(self) -> Tuple[int, int]:
+        return await self._load_once("cache_versions", lambda: get_dashboard_versions(str(self.user.id)))
+
+
+def paginate(items: List[Any], offset: int, limit: Optional[int]) -> List[Any]:
+    return items[offset:offset + limit] if limit is not None else items[offset:]
+
+
+async def dashboard_courses(context: DashboardContext, offset: int, limit: Optional[int]):
+    courses = await context.courses()
+    return await serialize_courses(paginate(courses, offset, limit), context.user), len(courses)
+
+
+async def dashboard_achievements(context: DashboardContext, offset: int, limit: Optional[int]):
+    if context.user.user_type == UserType.PARENT:
+        return [], 0
+    achievements = await context.achievements()
+    return [
+        serialize_achievement(item, context.user)
+        for item in paginate(achievements, offset, limit)
+    ], len(achievements)
+
+
+async def dashboard_editable_achievements(context: DashboardContext, offset: int, limit: Optional[int]):
+    if context.user.user_type == UserType.PARENT:
+        return [], 0
+    course_map = {str(course.id): course for course in await context.courses()}
+    achievements = [
+        item
+        for item in await context.achievements()
+        if can_manage_achievement(context.user, item, course_map)
+    ]
+    return [
+        serialize_achievement(item, context.user, editable=True)
+        for item in paginate(achievements, offset, limit)
+    ], len(achievements)
+
+
+async def dashboard_available_courses(context: DashboardContext, offset: int, limit: Optional[int]):
+    courses = await context.manageable_courses()
+    options = await asyncio.gather(*(serialize_course_option(course) for course in paginate(courses, offset, limit)))
+    return list(options), len(courses)
+
+
+async def dashboard_pending_reviews(context: DashboardContext, offset: int, limit: Optional[int]):
+    return await build_dashboard_pending_reviews(context.user, await context.courses(), offset, limit)
+
+
+async def dashboard_managed_students(context: DashboardContext, offset: int, limit: Optional[int]):
+    if context.user.user_type not in {UserType.TEACHER, UserType.ADMIN}:
+        return [], 0
+    manageable_courses = await context.manageable_courses()
     manageable_course_ids = {str(course.id) for course in manageable_courses}
+    students = await get_manageable_students(context.user, manageable_courses)
+    entries = await asyncio.gather(
+        *(serialize_student_entry(student, manageable_course_ids) for student in paginate(students, offset, limit))
+    )
+    return list(entries), len(students)
+
+
+async def dashboard_linked_students(context: DashboardContext, offset: int, limit: Optional[int]):
+    if context.user.user_type != UserType.PARENT:
+        return [], 0
+    students = await get_linked_students_for_parent(context.user)
+    entries = await asyncio.gather(*(serialize_student_entry(student) for student in paginate(students, offset, limit)))
+    return list(entries), len(students)
+
+
+async def dashboard_course_requests(context: DashboardContext, offset: int, limit: Optional[int]):
+    if context.user.user_type not in {UserType.TEACHER, UserType.ADMIN}:
+        return [], 0
+    request_query = {}
+    if context.user.user_type == UserType.TEACHER:
+        request_query = {"course_id": {"$in": [str(course.id) for course in await context.manageable_courses()]}}
+    total = await CourseRequest.find(request_query).count()
+    requests = CourseRequest.find(request_query).sort("-created_at").skip(offset)
+    if limit is not None:
+        requests = requests.limit(limit)
+    return [serialize_course_request(item) for item in await requests.to_list()], total
+
+
+DASHBOARD_SECTIONS = {
+    "courses": dashboard_courses,
+    "achievements": dashboard_achievements,
+    "managed_students": dashboard_managed_students,
+    "linked_students": dashboard_linked_students,
+    "editable_achievements": dashboard_editable_achievements,
+    "available_courses": dashboard_available_courses,
+    "pending_reviews": dashboard_pending_reviews,
+    "course_requests": dashboard_course_requests,
+}
+
+
+async def load_dashboard_section(
+    context: DashboardContext,
+    section: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[str, dict]:
+    """ETag and payload of one dashboard section, served from the cache while it is fresh."""
+    key = (str(context.user.id), section, offset, limit, await context.cache_versions())
+    cached = dashboard_cache.get(key)
+    if cached is not None:
+        return cached
+    items, total = await DASHBOARD_SECTIONS[section](context, offset, limit)
+    payload = DashboardSectionResponse(
+        section=section,
+        items=[item.model_dump(mode="json") for item in items],
+        total=total,
+        offset=offset,
+        limit=limit,
+    ).model_dump(mode="json")
+    return dashboard_cache.put(key, payload), payload
 
-    achievements = await Achievement.find_all().to_list()
-    course_map = {str(course.id): course for course in courses}
-    if user.user_type == UserType.PARENT:
-        serialized_achievements = []
-        editable_achievements = []
-    else:
-        serialized_achievements = [serialize_achievement(item, user) for item in achievements]
-        editable_achievements = [
-            serialize_achievement(item, user, editable=True)
-            for item in achievements
-            if can_manage_achievement(user, item, course_map)
-        ]
-
-    managed_students: List[StudentAdminResponse] = []
-    linked_students: List[StudentAdminResponse] = []
-    available_courses = [await serialize_course_option(course) for course in manageable_courses]
-    pending_reviews = await build_dashboard_pending_reviews(user, courses)
-    course_requests = []
-    if user.user_type in {UserType.TEACHER, UserType.ADMIN}:
-        students = await get_manageable_students(user, manageable_courses)
-        managed_students = [
-            await serialize_student_entry(student, manageable_course_ids)
-            for student in students
-        ]
-        request_query = {}
-        if user.user_type == UserType.TEACHER:
-            request_query = {"course_id": {"$in": list(manageable_course_ids)}}
-        requests = await CourseRequest.find(request_query).sort("-created_at").to_list()
-        course_requests = [serialize_course_request(item) for item in requests]
-    elif user.user_type == UserType.PARENT:
-        linked_students = [
-            await serialize_student_entry(student)
-            for student in await get_linked_students_for_parent(user)
-        ]
 
+@router.get("/dashboard", response_model=DashboardResponse)
+async def dashboard(user: User = Depends(get_current_user_dependency)):
+    context = DashboardContext(user)
+    sections = await asyncio.gather(*(load_dashboard_section(context, section) for section in DASHBOARD_SECTIONS))
     return DashboardResponse(
         user=serialize_user(user),
-        courses=serialized_courses,
-        achievements=serialized_achievements,
-        managed_students=managed_students,
-        linked_students=linked_students,
-        editable_achievements=editable_achievements,
-        available_courses=available_courses,
-        pending_reviews=pending_reviews,
-        course_requests=course_requests,
+        **{section: payload["items"] for section, (_etag, payload) in zip(DASHBOARD_SECTIONS, sections)},
     )
 
 
+@router.get("/dashboard/{section}", response_model=DashboardSectionResponse)
+async def dashboard_section(
+    section: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=DASHBOARD_PAGE_SIZE, ge=1, le=200),
+    if_none_match: Optional[str] = Header(default=None),
+    user: User = Depends(get_current_user_dependency),
+):
+    if section not in DASHBOARD_SECTIONS:
+        raise HTTPException(status_code=404, detail="Раздел не найден")
+
+    etag, payload = await load_dashboard_section(DashboardContext(user), section, offset, limit)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+
 @router.get("/profile", response_model=UserResponse)
 async def current_profile(user: User = Depends(get_current_user_dependency)):
     return serialize_user(user)
@@ -254,6 +383,7 @@ async def update_profile(
 
     user.touch()
     await user.save()
+    await rename_leaderboard_member(user)
     return serialize_user(user)
 
 
@@ -350,11 +480,15 @@ async def create_student(
         password_hash=auth_service.get_password_hash(payload.password),
     )
     await student.insert()
+    prime_document(student)
     await sync_student_course_memberships(
         str(student.id),
         payload.course_ids,
         course_group_ids,
     )
+    for course_id in payload.course_ids:
+        await add_leaderboard_members(course_id, [str(student.id)])
+    await discard_dashboard_sections()
     return await serialize_student_entry(student, allowed_course_ids)
 
 
@@ -403,6 +537,7 @@ async def update_student(
 
     student.touch()
     await student.save()
+    await rename_leaderboard_member(student)
 
     if payload.course_ids is not None:
         await sync_student_course_memberships(
@@ -410,7 +545,10 @@ async def update_student(
             payload.course_ids,
             course_group_ids,
         )
+        for course_id in payload.course_ids:
+            await add_leaderboard_members(course_id, [str(student.id)])
 
+    await discard_dashboard_sections()
     return await serialize_student_entry(student, allowed_course_ids)
 
 
@@ -432,6 +570,10 @@ async def link_parent_to_student(
     if parent:
         if parent.user_type != UserType.PARENT:
             raise HTTPException(status_code=400, detail="Этот логин уже занят не родителем")
+        if str(student.id) not in parent.linked_student_ids:
+            parent.linked_student_ids.append(str(student.id))
+            parent.touch()
+            await parent.save()
     else:
         if not payload.name or not payload.surname or not payload.password:
             raise HTTPException(
@@ -453,13 +595,9 @@ async def link_parent_to_student(
             linked_student_ids=[str(student.id)],
         )
         await parent.insert()
-        return await serialize_student_entry(student, allowed_course_ids)
-
-    if str(student.id) not in parent.linked_student_ids:
-        parent.linked_student_ids.append(str(student.id))
-        parent.touch()
-        await parent.save()
+        prime_document(parent)
 
+    await discard_dashboard_sections()
     return await serialize_student_entry(student, allowed_course_ids)
 
 
@@ -489,6 +627,7 @@ async def unlink_parent_from_student(
     parent.touch()
     await parent.save()
 
+    await discard_dashboard_sections()
     return await serialize_student_entry(student, allowed_course_ids)
 
 
@@ -6,6 +6,7 @@ from pydantic import field_validator
 from models.achievement import AchievementTrigger
 from models.event import EventTag, ScheduleType
 from models.group import GroupScheduleSlot
+from models.output_check_mode import DEFAULT_FLOAT_TOLERANCE, OutputCheckMode
 from models.programming_language import ProgrammingLanguage, normalize_programming_language
 from models.student_course_enrollment import PaymentMode
 from models.user import UserType
@@ -149,6 +150,8 @@ class CreateTaskRequest(BaseModel):
     language: Optional[str] = Field(default=None, max_length=20)
     requires_manual_review: bool = Field(default=False)
     tests: List[TaskTestCaseRequest] = Field(default_factory=list)
+    check_mode: OutputCheckMode = Field(default=OutputCheckMode.EXACT)
+    float_tolerance: float = Field(default=DEFAULT_FLOAT_TOLERANCE, ge=0, le=1)
     order: int = Field(default=0, ge=0)
 
     @field_validator("language")
@@ -168,6 +171,8 @@ class UpdateTaskRequest(BaseModel):
     language: Optional[str] = Field(default=None, max_length=20)
     requires_manual_review: Optional[bool] = None
     tests: Optional[List[TaskTestCaseRequest]] = None
+    check_mode: Optional[OutputCheckMode] = None
+    float_tolerance: Optional[float] = Field(default=None, ge=0, le=1)
     order: Optional[int] = Field(default=None, ge=0)
 
     @field_validator("language")
@@ -267,6 +272,7 @@ class CreateCourseGroupRequest(BaseModel):
     schedule_slots: List[GroupScheduleSlot] = Field(default_factory=list)
     start_date: Optional[str] = Field(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$")
     current_topic_id: Optional[str] = None
+    runner_weight: float = Field(default=1.0, gt=0, le=10)
 
 
 class UpdateCourseGroupRequest(BaseModel):
@@ -275,6 +281,7 @@ class UpdateCourseGroupRequest(BaseModel):
     schedule_slots: Optional[List[GroupScheduleSlot]] = None
     start_date: Optional[str] = Field(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$")
     current_topic_id: Optional[str] = None
+    runner_weight: Optional[float] = Field(default=None, gt=0, le=10)
 
 
 class CreateCourseRequestLeadRequest(BaseModel):
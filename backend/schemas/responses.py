@@ -1,12 +1,14 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
 from models.achievement import AchievementTrigger
 from models.event import EventTag, ScheduleType
 from models.group import GroupScheduleSlot
+from models.output_check_mode import DEFAULT_FLOAT_TOLERANCE, OutputCheckMode
 from models.student_course_enrollment import PaymentMode
+from models.submission_job import SubmissionJobStatus
 from models.task import TaskStatus
 from models.user import SubscriptionStatus, UserStatus, UserType
 
@@ -71,6 +73,15 @@ class LeaderboardEntryResponse(BaseModel):
     tg_username: str
     points: int
     progress_percent: float
+    rank: int = 0
+
+
+class LeaderboardPageResponse(BaseModel):
+    items: List[LeaderboardEntryResponse]
+    total: int
+    offset: int
+    limit: int
+    my_rank: Optional[int] = None
 
 
 class CourseResponse(BaseModel):
@@ -95,6 +106,7 @@ class CourseResponse(BaseModel):
     total_tasks: int = 0
     total_students: int = 0
     total_points: int = 0
+    has_manual_review_tasks: bool = False
     progress_percent: float = 0.0
     earned_points: int = 0
     can_edit: bool = False
@@ -112,6 +124,7 @@ class GroupResponse(BaseModel):
     start_date: Optional[str] = None
     current_topic_id: Optional[str] = None
     current_topic_name: Optional[str] = None
+    runner_weight: float = 1.0
     leaderboard: List[LeaderboardEntryResponse] = Field(default_factory=list)
     total_students: int = 0
 
@@ -165,6 +178,8 @@ class TaskTestRunResultResponse(BaseModel):
     stderr: str = ""
     passed: bool = False
     is_public: bool = True
+    cpu_time_ms: Optional[int] = None
+    peak_memory_kb: Optional[int] = None
 
 
 class TaskSubmissionResponse(BaseModel):
@@ -199,7 +214,13 @@ class TaskResultResponse(BaseModel):
     review_comment: Optional[str] = None
     last_submission: Optional[TaskSubmissionResponse] = None
     best_submission: Optional[TaskSubmissionResponse] = None
-    submission_history: List[TaskSubmissionResponse] = Field(default_factory=list)
+
+
+class TaskSubmissionPageResponse(BaseModel):
+    items: List[TaskSubmissionResponse]
+    total: int
+    offset: int
+    limit: int
 
 
 class PendingTaskReviewResponse(BaseModel):
@@ -228,6 +249,13 @@ class DashboardPendingReviewResponse(BaseModel):
     last_submission: Optional[TaskSubmissionResponse] = None
 
 
+class PendingReviewPageResponse(BaseModel):
+    items: List[DashboardPendingReviewResponse]
+    total: int
+    offset: int
+    limit: int
+
+
 class TaskResponse(BaseModel):
     id: str
     topic_id: str
@@ -240,12 +268,44 @@ class TaskResponse(BaseModel):
     requires_manual_review: bool = False
     public_examples: List[TaskTestCaseResponse] = Field(default_factory=list)
     tests: Optional[List[TaskTestCaseResponse]] = None
+    check_mode: OutputCheckMode = OutputCheckMode.EXACT
+    float_tolerance: float = DEFAULT_FLOAT_TOLERANCE
     order: int = 0
     result: Optional[TaskResultResponse] = None
     pending_reviews: List[PendingTaskReviewResponse] = Field(default_factory=list)
     newly_unlocked_achievements: List["AchievementNoticeResponse"] = Field(default_factory=list)
 
 
+class SubmissionJobResponse(BaseModel):
+    id: str
+    task_id: str
+    status: SubmissionJobStatus
+    queue_position: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    task: Optional[TaskResponse] = None
+
+
+class RunnerSchedulerStatsResponse(BaseModel):
+    limit: int = 0
+    active: Dict[str, int] = Field(default_factory=dict)
+    waiting: Dict[str, int] = Field(default_factory=dict)
+    waiting_owners: int = 0
+    latency_seconds: float = 0.0
+    host_load: float = 0.0
+
+
+class SubmissionQueueStatsResponse(BaseModel):
+    queued: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
+    oldest_queued_seconds: float = 0.0
+    runner: Optional[RunnerSchedulerStatsResponse] = None
+
+
 class LessonDetailResponse(BaseModel):
     course: CourseResponse
     lesson: TopicResponse
@@ -405,6 +465,14 @@ class DashboardResponse(BaseModel):
     course_requests: List["CourseRequestResponse"] = Field(default_factory=list)
 
 
+class DashboardSectionResponse(BaseModel):
+    section: str
+    items: List[Any] = Field(default_factory=list)
+    total: int
+    offset: int
+    limit: Optional[int] = None
+
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
@@ -495,6 +563,7 @@ class AchievementOverviewResponse(BaseModel):
 TokenResponse.model_rebuild()
 RegisterResponse.model_rebuild()
 TaskResponse.model_rebuild()
+SubmissionJobResponse.model_rebuild()
 DashboardResponse.model_rebuild()
 CourseResponse.model_rebuild()
 StudentCourseProgressResponse.model_rebuild()
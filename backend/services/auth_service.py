@@ -13,6 +13,8 @@ from passlib.context import CryptContext
 from models.achievement import AchievementTrigger
 from models.user import User, UserType
 from services.achievement_service import unlock_achievements_for_trigger
+from services.document_loader import clear_document, prime_document
+from services.leaderboard_service import remove_leaderboard_member
 
 
 SECRET_KEY = os.getenv("SECRET_KEY", "secret")
@@ -81,6 +83,7 @@ class AuthService:
             password_hash=self.get_password_hash(register_data.password),
         )
         await user.insert()
+        prime_document(user)
         return user
 
     async def register(self, register_data) -> User:
@@ -135,6 +138,7 @@ class AuthService:
         user = await User.find_one(User.tg_username == tg_username)
         if not user:
             raise credentials_exception
+        prime_document(user)
         return user
 
     async def get_user_info(self, access_token: str) -> User:
@@ -153,6 +157,8 @@ class AuthService:
     async def delete_account(self, access_token: str):
         user = await self.get_current_user(access_token)
         await user.delete()
+        clear_document(User, user.id)
+        await remove_leaderboard_member(str(user.id))
         return True
 
     async def get_current_user_from_bearer(
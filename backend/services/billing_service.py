@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timedelta
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Tuple
 
 from models.attendance import AttendanceEntry, AttendanceSession
 from models.course import Course
@@ -13,6 +13,7 @@ from models.student_course_enrollment import (
     StudentCourseEnrollment,
 )
 from models.user import User
+from services.document_loader import load_document
 
 
 MONTH_LABELS = [
@@ -82,7 +83,7 @@ def get_group_start_date(group: Group) -> date | None:
 async def get_group_start_date_for_id(group_id: str | None) -> date | None:
     if not group_id:
         return None
-    group = await Group.get(group_id)
+    group = await load_document(Group, group_id)
     if not group:
         return None
     return get_group_start_date(group)
@@ -124,7 +125,7 @@ async def get_or_create_enrollment(
     if group_start:
         enrolled_on = format_date(group_start)
     elif not enrolled_on:
-        student = await User.get(student_id)
+        student = await load_document(User, student_id)
         enrolled_on = format_date((student.created_at if student else datetime.utcnow()).date())
 
     enrollment = StudentCourseEnrollment(
@@ -145,33 +146,44 @@ async def get_enrollment(student_id: str, course_id: str) -> StudentCourseEnroll
 
 
 async def get_group_enrollments(course_id: str, group_id: str, student_ids: Iterable[str]) -> Dict[str, StudentCourseEnrollment]:
-    student_id_list = [str(item) for item in student_ids]
-    if not student_id_list:
-        return {}
-
-    existing = await StudentCourseEnrollment.find(
-        {
-            "course_id": course_id,
-            "student_id": {"$in": student_id_list},
-        }
-    ).to_list()
-    enrollment_map = {item.student_id: item for item in existing}
-
-    for student_id in student_id_list:
-        enrollment = enrollment_map.get(student_id)
-        if enrollment is None:
-            enrollment = await get_or_create_enrollment(
-                student_id,
-                course_id,
-                group_id=group_id,
-            )
+    return (await get_groups_enrollments([(course_id, group_id, student_ids)])).get(group_id, {})
+
+
+async def get_groups_enrollments(
+    groups: Iterable[Tuple[str, str, Iterable[str]]],
+) -> Dict[str, Dict[str, StudentCourseEnrollment]]:
+    """Enrollments of the students of several ``(course_id, group_id, student_ids)`` groups.
+
+    Existing enrollments are read with one query; missing ones are created and
+    ones pointing at another group are moved, as for a single group.
+    """
+    groups = [(course_id, group_id, [str(item) for item in student_ids]) for course_id, group_id, student_ids in groups]
+    clauses = [
+        {"course_id": course_id, "student_id": {"$in": student_ids}}
+        for course_id, _group_id, student_ids in groups
+        if student_ids
+    ]
+    existing = await StudentCourseEnrollment.find({"$or": clauses}).to_list() if clauses else []
+    existing_map = {(item.course_id, item.student_id): item for item in existing}
+
+    group_enrollments: Dict[str, Dict[str, StudentCourseEnrollment]] = {}
+    for course_id, group_id, student_ids in groups:
+        enrollment_map: Dict[str, StudentCourseEnrollment] = {}
+        for student_id in student_ids:
+            enrollment = existing_map.get((course_id, student_id))
+            if enrollment is None:
+                enrollment = await get_or_create_enrollment(
+                    student_id,
+                    course_id,
+                    group_id=group_id,
+                )
+            elif enrollment.group_id != group_id:
+                enrollment.group_id = group_id
+                enrollment.touch()
+                await enrollment.save()
             enrollment_map[student_id] = enrollment
-        elif enrollment.group_id != group_id:
-            enrollment.group_id = group_id
-            enrollment.touch()
-            await enrollment.save()
-
-    return enrollment_map
+        group_enrollments[group_id] = enrollment_map
+    return group_enrollments
 
 
 def iter_group_occurrences(
@@ -203,8 +215,22 @@ async def list_group_sessions(
     date_from: str | None = None,
     date_to: str | None = None,
 ) -> List[AttendanceSession]:
-    today = utc_today()
     enrollments = await get_group_enrollments(str(course.id), str(group.id), group.students)
+    persisted = await AttendanceSession.find(AttendanceSession.group_id == str(group.id)).to_list()
+    return compose_group_sessions(course, group, enrollments, persisted, date_from=date_from, date_to=date_to)
+
+
+def compose_group_sessions(
+    course: Course,
+    group: Group,
+    enrollments: Dict[str, StudentCourseEnrollment],
+    persisted: List[AttendanceSession],
+    *,
+    date_from: str | None = None,
+    date_to: str | None = None,
+) -> List[AttendanceSession]:
+    """Saved sessions of a group in the range plus the scheduled ones nobody has saved yet."""
+    today = utc_today()
     enrollment_dates = [
         parsed_date
         for item in enrollments.values()
@@ -219,7 +245,6 @@ async def list_group_sessions(
     if range_start > range_end:
         return []
 
-    persisted = await AttendanceSession.find(AttendanceSession.group_id == str(group.id)).to_list()
     persisted = [
         session for session in persisted
         for session_date in [try_parse_date(session.date)]
@@ -440,12 +465,68 @@ async def build_course_finance_snapshot(
     course: Course,
     group: Group | None,
 ) -> dict | None:
-    enrollment = await get_or_create_enrollment(
-        student_id,
-        str(course.id),
-        group_id=str(group.id) if group else None,
+    return (await build_course_finance_snapshots(student_id, [(course, group)]))[str(course.id)]
+
+
+def enrollment_is_current(enrollment: StudentCourseEnrollment, group: Group | None) -> bool:
+    """Whether ``get_or_create_enrollment`` would leave ``enrollment`` unchanged."""
+    if enrollment.group_id != (str(group.id) if group else None):
+        return False
+    group_start = get_group_start_date(group) if group else None
+    if group_start is None:
+        return True
+    current_start = try_parse_date(enrollment.enrolled_on)
+    return current_start is not None and current_start <= group_start
+
+
+async def build_course_finance_snapshots(
+    student_id: str,
+    course_groups: List[Tuple[Course, Group | None]],
+) -> Dict[str, dict]:
+    """Finance snapshots of one student in several courses, keyed by course id.
+
+    Enrollments, the groups' enrollments and their attendance sessions are
+    read with one query each, whatever the number of courses.
+    """
+    if not course_groups:
+        return {}
+    course_ids = [str(course.id) for course, _group in course_groups]
+    enrollments = {
+        item.course_id: item
+        for item in await StudentCourseEnrollment.find(
+            {"student_id": student_id, "course_id": {"$in": course_ids}}
+        ).to_list()
+    }
+    for course, group in course_groups:
+        enrollment = enrollments.get(str(course.id))
+        if enrollment is None or not enrollment_is_current(enrollment, group):
+            enrollments[str(course.id)] = await get_or_create_enrollment(
+                student_id,
+                str(course.id),
+                group_id=str(group.id) if group else None,
+            )
+
+    grouped = [(course, group) for course, group in course_groups if group]
+    group_enrollments = await get_groups_enrollments(
+        (str(course.id), str(group.id), group.students) for course, group in grouped
     )
-    sessions = await list_group_sessions(course, group) if group else []
-    snapshot = build_payment_snapshot(enrollment, sessions)
-    snapshot["enrolled_on"] = enrollment.enrolled_on
-    return snapshot
+    persisted: Dict[str, List[AttendanceSession]] = {str(group.id): [] for _course, group in grouped}
+    if grouped:
+        for session in await AttendanceSession.find({"group_id": {"$in": list(persisted)}}).to_list():
+            persisted[session.group_id].append(session)
+
+    snapshots: Dict[str, dict] = {}
+    for course, group in course_groups:
+        enrollment = enrollments[str(course.id)]
+        sessions = []
+        if group:
+            sessions = compose_group_sessions(
+                course,
+                group,
+                group_enrollments[str(group.id)],
+                persisted[str(group.id)],
+            )
+        snapshot = build_payment_snapshot(enrollment, sessions)
+        snapshot["enrolled_on"] = enrollment.enrolled_on
+        snapshots[str(course.id)] = snapshot
+    return snapshots
@@ -1,13 +1,27 @@
+import base64
+import codecs
 import json
 import os
+import py_compile
 import shutil
 import signal
+import struct
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import uuid
 from pathlib import Path
+from typing import Collection, Iterator
 
 from models.programming_language import ProgrammingLanguage, normalize_programming_language
+from services.output_checker import OutputChecker, build_output_checker
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
 
 
 PYTHON_FLAGS = ["-I", "-B", "-S"]
@@ -21,10 +35,26 @@ RUNNER_ENV_KEYS = [
     "TMPDIR",
 ]
 MAX_OUTPUT_CHARS = int(os.getenv("CODE_RUNNER_MAX_OUTPUT_CHARS", "12000"))
+# UTF-8 needs at most four bytes per character, so this cap never cuts off
+# output that still fits into MAX_OUTPUT_CHARS.
+MAX_OUTPUT_BYTES = MAX_OUTPUT_CHARS * 4
+OUTPUT_CHUNK_BYTES = 64 * 1024
+FRAME_HEADER = struct.Struct(">I")
+MEMORY_LIMIT_MB = int(os.getenv("CODE_RUNNER_MEMORY_LIMIT_MB", "256"))
+MAX_FILE_SIZE_KB = int(os.getenv("CODE_RUNNER_MAX_FILE_SIZE_KB", "1024"))
+# RLIMIT_NPROC counts every process of the user, so it is only safe when the
+# runner has a dedicated account; prefer the cgroup pids limit otherwise.
+MAX_PROCESSES = int(os.getenv("CODE_RUNNER_MAX_PROCESSES", "0"))
+CGROUP_ROOT = os.getenv("CODE_RUNNER_CGROUP_ROOT", "")
+CGROUP_PIDS_MAX = int(os.getenv("CODE_RUNNER_CGROUP_PIDS_MAX", "64"))
+PRECOMPILE_PYTHON = os.getenv("CODE_RUNNER_PRECOMPILE", "true").lower() in {"1", "true", "yes"}
+LIMITS_WRAPPER_PATH = Path(__file__).resolve().with_name("code_runner_limits.py")
 
 
 def normalize_output(value: str) -> str:
-    return value.replace("\r\n", "\n").strip()
+    if "\r" in value:
+        value = value.replace("\r\n", "\n")
+    return value.strip()
 
 
 def truncate_output(value: str) -> str:
@@ -33,6 +63,111 @@ def truncate_output(value: str) -> str:
     return f"{value[:MAX_OUTPUT_CHARS]}\n...[output truncated]..."
 
 
+def decode_output(data: bytes | bytearray) -> str:
+    return bytes(data).decode("utf-8", errors="replace")
+
+
+class BoundedOutputCapture:
+    """Feed stdin and read stdout/stderr incrementally, up to ``limit`` bytes each.
+
+    Reading stops as soon as either stream goes over the limit, so a
+    solution printing in a loop never makes the harness buffer more than
+    ``limit`` bytes; the caller is expected to kill the process then.
+
+    With a ``checker`` stdout is also compared with the expected answer as
+    it arrives and reading stops at the first mismatch. Only the first
+    ``limit`` bytes are kept for the report, while the checker may consume
+    up to ``stdout_limit`` bytes, so long correct answers still pass.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        input_data: str,
+        limit: int = MAX_OUTPUT_BYTES,
+        checker: OutputChecker | None = None,
+        stdout_limit: int | None = None,
+    ) -> None:
+        self.limit = limit
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self.exceeded = False
+        self.mismatch = False
+        self._open_streams = 2
+        self._condition = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._feed, args=(process.stdin, input_data.encode("utf-8")), daemon=True),
+            threading.Thread(
+                target=self._drain,
+                args=(process.stdout, self.stdout, max(stdout_limit or 0, limit), checker),
+                daemon=True,
+            ),
+            threading.Thread(target=self._drain, args=(process.stderr, self.stderr, limit), daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def _feed(stream, data: bytes) -> None:
+        try:
+            if data:
+                stream.write(data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def _drain(
+        self,
+        stream,
+        buffer: bytearray,
+        limit: int,
+        checker: OutputChecker | None = None,
+    ) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace") if checker else None
+        total = 0
+        try:
+            while True:
+                chunk = stream.read1(OUTPUT_CHUNK_BYTES)
+                if not chunk:
+                    if decoder is not None:
+                        checker.feed(decoder.decode(b"", final=True))
+                    break
+                total += len(chunk)
+                room = self.limit - len(buffer)
+                if room > 0:
+                    buffer += chunk[:room]
+                if total > limit:
+                    with self._condition:
+                        self.exceeded = True
+                    break
+                if decoder is not None and not checker.feed(decoder.decode(chunk)):
+                    with self._condition:
+                        self.mismatch = True
+                    break
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._condition:
+                self._open_streams -= 1
+                self._condition.notify_all()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait until both streams are closed or reading stopped early."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.exceeded or self.mismatch or self._open_streams == 0,
+                timeout=max(timeout, 0),
+            )
+
+    def close(self) -> None:
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+
 def build_runner_env() -> dict[str, str]:
     env = {
         key: value
@@ -104,96 +239,524 @@ def kill_process_tree(process: subprocess.Popen) -> None:
         process.kill()
 
 
+def reap_process(process: subprocess.Popen, timeout: float | None = None):
+    """Wait for ``process`` with ``wait4`` and return its resource usage.
+
+    Raises :class:`subprocess.TimeoutExpired` like ``Popen.wait``. Without
+    ``wait4`` the process is waited for normally and no usage is returned.
+    """
+    if not hasattr(os, "wait4"):
+        process.wait(timeout=timeout)
+        return None
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        try:
+            pid, status, rusage = os.wait4(process.pid, 0 if deadline is None else os.WNOHANG)
+        except ChildProcessError:
+            process.poll()
+            return None
+        if pid == process.pid:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return rusage
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+class RunCgroup:
+    """Per-run cgroup v2 leaf under a delegated ``CODE_RUNNER_CGROUP_ROOT``."""
+
+    def __init__(self, root: Path) -> None:
+        self.path = root / f"run-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    @classmethod
+    def create(cls, memory_limit_bytes: int | None) -> "RunCgroup | None":
+        if not CGROUP_ROOT or os.name == "nt":
+            return None
+        root = Path(CGROUP_ROOT)
+        if not (root / "cgroup.procs").exists():
+            return None
+        cgroup = cls(root)
+        try:
+            cgroup.path.mkdir()
+            cgroup.write("pids.max", str(CGROUP_PIDS_MAX))
+            if memory_limit_bytes:
+                cgroup.write("memory.max", str(memory_limit_bytes))
+                cgroup.write("memory.swap.max", "0")
+        except OSError:
+            cgroup.remove()
+            return None
+        return cgroup
+
+    def write(self, name: str, value: str) -> None:
+        (self.path / name).write_text(value, encoding="utf-8")
+
+    def read_stat(self, name: str, key: str | None = None) -> int | None:
+        try:
+            content = (self.path / name).read_text(encoding="utf-8")
+        except OSError:
+            return None
+        if key is None:
+            return int(content.strip()) if content.strip().isdigit() else None
+        for line in content.splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[0] == key:
+                return int(parts[1])
+        return None
+
+    def remove(self) -> None:
+        try:
+            if (self.path / "cgroup.kill").exists():
+                self.write("cgroup.kill", "1")
+            self.path.rmdir()
+        except OSError:
+            return
+
+
+def build_resource_limits(
+    language: ProgrammingLanguage,
+    timeout_seconds: int,
+    cgroup: RunCgroup | None,
+) -> dict[str, tuple[int, int]]:
+    limits = {
+        "RLIMIT_CPU": (timeout_seconds + 1, timeout_seconds + 2),
+        "RLIMIT_CORE": (0, 0),
+    }
+    if MAX_FILE_SIZE_KB > 0:
+        limits["RLIMIT_FSIZE"] = (MAX_FILE_SIZE_KB * 1024,) * 2
+    if MAX_PROCESSES > 0:
+        limits["RLIMIT_NPROC"] = (MAX_PROCESSES, MAX_PROCESSES)
+    # V8 reserves far more address space than it uses, so Node relies on
+    # --max-old-space-size or the cgroup memory limit instead.
+    if cgroup is None and MEMORY_LIMIT_MB > 0 and language == ProgrammingLanguage.PYTHON:
+        limits["RLIMIT_AS"] = (MEMORY_LIMIT_MB * 1024 * 1024,) * 2
+    return limits
+
+
+def build_limited_command(
+    language: ProgrammingLanguage,
+    script_path: Path,
+    timeout_seconds: int,
+    cgroup: RunCgroup | None,
+) -> list[str]:
+    """Wrap the runner command so limits are set in the child before exec.
+
+    The limits are applied by :mod:`services.code_runner_limits` rather than
+    a ``preexec_fn``, which is not safe to run in a threaded process.
+    """
+    command = build_runner_command(language, script_path)
+    if resource is None:
+        return command
+
+    limits = build_resource_limits(language, timeout_seconds, cgroup)
+    return [
+        sys.executable,
+        *PYTHON_FLAGS,
+        str(LIMITS_WRAPPER_PATH),
+        json.dumps(limits),
+        str(cgroup.path / "cgroup.procs") if cgroup is not None else "",
+        "--",
+        *command,
+    ]
+
+
+def collect_usage(rusage, cgroup: RunCgroup | None) -> dict:
+    cpu_time_ms = None
+    peak_memory_kb = None
+    if rusage is not None:
+        cpu_time_ms = round((rusage.ru_utime + rusage.ru_stime) * 1000)
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        peak_memory_kb = rusage.ru_maxrss
+        if sys.platform == "darwin":
+            peak_memory_kb //= 1024
+    if cgroup is not None:
+        usage_usec = cgroup.read_stat("cpu.stat", "usage_usec")
+        if usage_usec is not None:
+            cpu_time_ms = usage_usec // 1000
+        memory_peak = cgroup.read_stat("memory.peak")
+        if memory_peak is not None:
+            peak_memory_kb = memory_peak // 1024
+    return {"cpu_time_ms": cpu_time_ms, "peak_memory_kb": peak_memory_kb}
+
+
 def build_script_path(temp_dir: Path, language: ProgrammingLanguage) -> Path:
     extension = ".js" if language == ProgrammingLanguage.JAVASCRIPT else ".py"
     return temp_dir / f"solution{extension}"
 
 
-def execute_program(payload: dict) -> dict:
+def build_error_result(message: str) -> dict:
+    return {
+        "success": False,
+        "exit_code": 0,
+        "stdout": "",
+        "stderr": "",
+        "timed_out": False,
+        "runner_error": message,
+    }
+
+
+def build_compile_error_result(message: str) -> dict:
+    return {
+        "success": False,
+        "exit_code": 1,
+        "stdout": "",
+        "stderr": normalize_output(truncate_output(message)),
+        "timed_out": False,
+        "runner_error": "",
+    }
+
+
+def reset_sandbox(sandbox_dir: Path, keep: Collection[Path] = ()) -> None:
+    for entry in sandbox_dir.iterdir():
+        if entry in keep:
+            continue
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+
+
+def write_script(payload: dict, sandbox_dir: Path) -> tuple[ProgrammingLanguage, Path]:
     language = normalize_programming_language(payload.get("language"))
-    code = str(payload.get("code", ""))
-    input_data = str(payload.get("input_data", ""))
-    timeout_seconds = int(payload.get("timeout_seconds", 2))
+    script_path = build_script_path(sandbox_dir, language)
+    script_path.write_text(str(payload.get("code", "")), encoding="utf-8")
+    return language, script_path
 
+
+def compile_script(language: ProgrammingLanguage, script_path: Path) -> tuple[Path, str | None]:
+    """Compile a Python solution to bytecode once for all of its test runs.
+
+    Returns the file to execute and the compile error, if any. Other
+    languages, and Python with ``CODE_RUNNER_PRECOMPILE`` off, run the
+    source as is.
+    """
+    if language != ProgrammingLanguage.PYTHON or not PRECOMPILE_PYTHON:
+        return script_path, None
+    compiled_path = script_path.with_suffix(".pyc")
+    try:
+        py_compile.compile(
+            str(script_path),
+            cfile=str(compiled_path),
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+    except py_compile.PyCompileError as exc:
+        return script_path, exc.msg
+    except (OSError, ValueError):
+        return script_path, None
+    return compiled_path, None
+
+
+def precompile_code(language: str | ProgrammingLanguage, code: str) -> tuple[str | None, str | None]:
+    """Compile a Python solution once for jobs spread over several workers.
+
+    Returns the base64 ``.pyc`` contents to pass as the ``compiled`` field of
+    each payload, and the compile error, if any. Nothing is compiled when
+    :func:`compile_script` would run the source as is.
+    """
+    language = normalize_programming_language(language)
     with tempfile.TemporaryDirectory() as temp_dir_name:
-        temp_dir = Path(temp_dir_name)
-        script_path = build_script_path(temp_dir, language)
+        script_path = build_script_path(Path(temp_dir_name), language)
         script_path.write_text(code, encoding="utf-8")
+        run_path, compile_error = compile_script(language, script_path)
+        if compile_error is not None or run_path == script_path:
+            return None, compile_error
+        return base64.b64encode(run_path.read_bytes()).decode("ascii"), None
 
-        try:
-            process = subprocess.Popen(
-                build_runner_command(language, script_path),
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=str(temp_dir),
-                env=build_runner_env(),
-                close_fds=True,
-                **get_process_spawn_options(),
-            )
-        except OSError as exc:
-            return {
-                "success": False,
-                "exit_code": 0,
-                "stdout": "",
-                "stderr": "",
-                "timed_out": False,
-                "runner_error": f"Runner error: {exc}",
-            }
-        except RuntimeError as exc:
-            return {
-                "success": False,
-                "exit_code": 0,
-                "stdout": "",
-                "stderr": "",
-                "timed_out": False,
-                "runner_error": str(exc),
-            }
 
+def write_compiled(payload: dict, script_path: Path) -> Path:
+    """The file to run: the ``.pyc`` sent in the payload, or the source itself."""
+    compiled = payload.get("compiled")
+    if not compiled:
+        return script_path
+    compiled_path = script_path.with_suffix(".pyc")
+    compiled_path.write_bytes(base64.b64decode(compiled))
+    return compiled_path
+
+
+def snapshot_files(paths: Collection[Path]) -> dict[Path, tuple[int, int] | None]:
+    snapshot = {}
+    for path in paths:
         try:
-            stdout, stderr = process.communicate(input=input_data, timeout=timeout_seconds)
+            stat = path.stat()
+        except OSError:
+            snapshot[path] = None
+        else:
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def run_script(
+    language: ProgrammingLanguage,
+    script_path: Path,
+    input_data: str,
+    timeout_seconds: int,
+    expected_output: str | None = None,
+    check_options: dict | None = None,
+) -> dict:
+    """Run the script once; with ``expected_output`` also judge its stdout.
+
+    ``check_options`` carries ``check_mode`` and ``float_tolerance`` for
+    :func:`build_output_checker`. The verdict is returned as
+    ``checker_passed``, and a wrong answer stops the program early.
+    """
+    sandbox_dir = script_path.parent
+    checker = None
+    stdout_limit = None
+    if expected_output is not None:
+        options = check_options or {}
+        checker = build_output_checker(
+            expected_output,
+            options.get("check_mode"),
+            options.get("float_tolerance"),
+        )
+        # Leave room for whitespace differences the checker tolerates.
+        stdout_limit = len(expected_output.encode("utf-8")) * 2 + OUTPUT_CHUNK_BYTES
+    cgroup = RunCgroup.create(MEMORY_LIMIT_MB * 1024 * 1024 if MEMORY_LIMIT_MB > 0 else None)
+    try:
+        return run_limited_script(
+            language,
+            script_path,
+            sandbox_dir,
+            input_data,
+            timeout_seconds,
+            cgroup,
+            checker,
+            stdout_limit,
+        )
+    finally:
+        if cgroup is not None:
+            cgroup.remove()
+
+
+def run_limited_script(
+    language: ProgrammingLanguage,
+    script_path: Path,
+    sandbox_dir: Path,
+    input_data: str,
+    timeout_seconds: int,
+    cgroup: RunCgroup | None,
+    checker: OutputChecker | None = None,
+    stdout_limit: int | None = None,
+) -> dict:
+    try:
+        process = subprocess.Popen(
+            build_limited_command(language, script_path, timeout_seconds, cgroup),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(sandbox_dir),
+            env=build_runner_env(),
+            close_fds=True,
+            **get_process_spawn_options(),
+        )
+    except OSError as exc:
+        return build_error_result(f"Runner error: {exc}")
+    except RuntimeError as exc:
+        return build_error_result(str(exc))
+
+    deadline = time.monotonic() + timeout_seconds
+    capture = BoundedOutputCapture(process, input_data, checker=checker, stdout_limit=stdout_limit)
+    timed_out = not capture.wait(deadline - time.monotonic())
+    stopped_early = capture.exceeded or capture.mismatch
+    rusage = None
+    if not timed_out and not stopped_early:
+        try:
+            rusage = reap_process(process, timeout=max(deadline - time.monotonic(), 0))
         except subprocess.TimeoutExpired:
-            kill_process_tree(process)
-            try:
-                stdout, stderr = process.communicate(timeout=1)
-            except Exception:
-                stdout, stderr = "", ""
-            return {
-                "success": False,
-                "exit_code": 0,
-                "stdout": normalize_output(truncate_output(stdout)),
-                "stderr": f"Time limit exceeded ({timeout_seconds}s)",
-                "timed_out": True,
-                "runner_error": "",
-            }
+            timed_out = True
+    if timed_out or stopped_early:
+        kill_process_tree(process)
+        rusage = reap_process(process)
+    capture.close()
+
+    stdout = decode_output(capture.stdout)
+    stderr = decode_output(capture.stderr)
+    usage = collect_usage(rusage, cgroup)
+    if timed_out or (hasattr(signal, "SIGXCPU") and process.returncode == -signal.SIGXCPU):
+        return {
+            "success": False,
+            "exit_code": 0,
+            "stdout": normalize_output(truncate_output(stdout)),
+            "stderr": f"Time limit exceeded ({timeout_seconds}s)",
+            "timed_out": True,
+            "runner_error": "",
+            **usage,
+        }
 
+    if capture.exceeded or len(stderr) > MAX_OUTPUT_CHARS or (checker is None and len(stdout) > MAX_OUTPUT_CHARS):
         return {
-            "success": process.returncode == 0,
-            "exit_code": process.returncode,
+            "success": False,
+            "exit_code": 0,
+            "stdout": normalize_output(truncate_output(stdout)),
+            "stderr": f"Output limit exceeded ({MAX_OUTPUT_CHARS} chars)",
+            "timed_out": False,
+            "runner_error": "",
+            "output_limit_exceeded": True,
+            **usage,
+        }
+
+    if capture.mismatch:
+        return {
+            "success": False,
+            "exit_code": 0,
             "stdout": normalize_output(truncate_output(stdout)),
             "stderr": normalize_output(truncate_output(stderr)),
             "timed_out": False,
             "runner_error": "",
+            "checker_passed": False,
+            **usage,
         }
 
+    if cgroup is not None and (cgroup.read_stat("memory.events", "oom_kill") or 0) > 0:
+        stderr = f"Memory limit exceeded ({MEMORY_LIMIT_MB} MB)"
+
+    result = {
+        "success": process.returncode == 0,
+        "exit_code": process.returncode,
+        "stdout": normalize_output(truncate_output(stdout)),
+        "stderr": normalize_output(stderr),
+        "timed_out": False,
+        "runner_error": "",
+        **usage,
+    }
+    if checker is not None:
+        result["checker_passed"] = checker.finish()
+    return result
+
+
+def execute_in_sandbox(payload: dict, sandbox_dir: Path) -> dict:
+    language, script_path = write_script(payload, sandbox_dir)
+    expected_output = payload.get("expected_output")
+    return run_script(
+        language,
+        write_compiled(payload, script_path),
+        str(payload.get("input_data", "")),
+        int(payload.get("timeout_seconds", 2)),
+        expected_output=None if expected_output is None else str(expected_output),
+        check_options=payload,
+    )
+
+
+def case_passed(result: dict) -> bool:
+    return result["success"] and not result["timed_out"] and bool(result.get("checker_passed"))
+
+
+def prepare_script(payload: dict, sandbox_dir: Path) -> tuple[ProgrammingLanguage, Path, str | None, dict]:
+    language, script_path = write_script(payload, sandbox_dir)
+    run_path, compile_error = compile_script(language, script_path)
+    return language, run_path, compile_error, snapshot_files({script_path, run_path})
+
+
+def execute_batch_in_sandbox(payload: dict, sandbox_dir: Path) -> Iterator[dict]:
+    """Write and compile the solution once and run it against every case in order.
+
+    Stops after the first failing case, matching ``run_solution``, unless the
+    payload sets ``fail_fast`` to false. A solution that does not compile
+    fails every case without being started. Files left by a case are removed
+    before the next one, and the script is rewritten only if the solution
+    modified it.
+    """
+    language, run_path, compile_error, snapshot = prepare_script(payload, sandbox_dir)
+    timeout_seconds = int(payload.get("timeout_seconds", 2))
+    fail_fast = bool(payload.get("fail_fast", True))
+    for index, case in enumerate(payload.get("cases") or []):
+        if compile_error is not None:
+            result = build_compile_error_result(compile_error)
+            yield result
+            if fail_fast:
+                return
+            continue
+        if index:
+            reset_sandbox(sandbox_dir, keep=snapshot.keys())
+            if snapshot_files(snapshot.keys()) != snapshot:
+                language, run_path, compile_error, snapshot = prepare_script(payload, sandbox_dir)
+        result = run_script(
+            language,
+            run_path,
+            str(case.get("input_data", "")),
+            timeout_seconds,
+            expected_output=str(case.get("expected_output", "")),
+            check_options=payload,
+        )
+        yield result
+        if fail_fast and not case_passed(result):
+            return
+
+
+def execute_program(payload: dict) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir_name:
+        if "cases" in payload:
+            return {"results": list(execute_batch_in_sandbox(payload, Path(temp_dir_name)))}
+        return execute_in_sandbox(payload, Path(temp_dir_name))
+
+
+def read_frame(stream) -> dict | None:
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return json.loads(body.decode("utf-8"))
+
+
+def write_frame(stream, message: dict) -> None:
+    body = json.dumps(message).encode("utf-8")
+    stream.write(FRAME_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def serve_worker() -> int:
+    """Serve framed jobs from stdin until the parent closes the pipe.
+
+    The sandbox directory lives as long as the worker and is wiped between
+    jobs, so each job only pays for spawning the solution interpreter.
+    """
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    with tempfile.TemporaryDirectory() as sandbox_name:
+        sandbox_dir = Path(sandbox_name)
+        while True:
+            try:
+                message = read_frame(stdin)
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                write_frame(stdout, build_error_result(f"Invalid harness payload: {exc}"))
+                continue
+            if message is None:
+                return 0
+
+            if message.get("type") == "ping":
+                write_frame(stdout, {"type": "pong"})
+                continue
+
+            reset_sandbox(sandbox_dir)
+            payload = message.get("payload") or {}
+            if message.get("type") == "batch":
+                for result in execute_batch_in_sandbox(payload, sandbox_dir):
+                    write_frame(stdout, {"type": "case", "result": result})
+                write_frame(stdout, {"type": "done"})
+                continue
+
+            write_frame(stdout, execute_in_sandbox(payload, sandbox_dir))
+
 
 def main() -> int:
+    if "--worker" in sys.argv[1:]:
+        return serve_worker()
+
     try:
         payload = json.loads(sys.stdin.read() or "{}")
     except json.JSONDecodeError as exc:
-        print(
-            json.dumps(
-                {
-                    "success": False,
-                    "exit_code": 0,
-                    "stdout": "",
-                    "stderr": "",
-                    "timed_out": False,
-                    "runner_error": f"Invalid harness payload: {exc}",
-                }
-            )
-        )
+        print(json.dumps(build_error_result(f"Invalid harness payload: {exc}")))
         return 0
 
     print(json.dumps(execute_program(payload)))
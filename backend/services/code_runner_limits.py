@@ -0,0 +1,34 @@
+"""Exec wrapper that applies resource limits before starting a solution.
+
+Usage: ``python -I -S code_runner_limits.py LIMITS CGROUP_PROCS -- COMMAND...``
+
+``LIMITS`` is a JSON object mapping ``RLIMIT_*`` names to ``[soft, hard]``
+and ``CGROUP_PROCS`` is the ``cgroup.procs`` file to join, or an empty
+string. The wrapper replaces itself with ``COMMAND``, so the solution keeps
+its pid and the harness reaps it directly. It runs in isolated mode and
+must only import the standard library.
+"""
+
+import json
+import os
+import resource
+import sys
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) < 4 or argv[2] != "--":
+        print("usage: code_runner_limits.py LIMITS CGROUP_PROCS -- COMMAND...", file=sys.stderr)
+        return 2
+
+    limits, cgroup_procs, command = json.loads(argv[0]), argv[1], argv[3:]
+    if cgroup_procs:
+        with open(cgroup_procs, "w", encoding="utf-8") as handle:
+            handle.write("0")
+    for name, (soft, hard) in limits.items():
+        resource.setrlimit(getattr(resource, name), (soft, hard))
+    os.execv(command[0], command)
+    return 127
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,18 +1,48 @@
 import json
+import logging
 import os
+import queue
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Iterator, List, Tuple
 
+from models.output_check_mode import DEFAULT_FLOAT_TOLERANCE, OutputCheckMode
 from models.programming_language import ProgrammingLanguage, normalize_programming_language
 from models.task import TaskTestCase, TaskTestRunResult
+from services.code_runner_harness import build_compile_error_result, precompile_code, read_frame, write_frame
+from services.output_checker import outputs_match
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_TIMEOUT_SECONDS = int(os.getenv("CODE_RUNNER_TIMEOUT_SECONDS", "2"))
 HARNESS_TIMEOUT_GRACE_SECONDS = int(os.getenv("CODE_RUNNER_HARNESS_GRACE_SECONDS", "1"))
 MAX_CODE_SIZE = int(os.getenv("CODE_RUNNER_MAX_CODE_SIZE", "20000"))
+CPU_COUNT = os.cpu_count() or 1
+# One warm worker per CPU, so the adaptive run limit can grow with the hardware.
+POOL_SIZE = int(os.getenv("CODE_RUNNER_POOL_SIZE", str(CPU_COUNT)))
+WORKER_MAX_JOBS = int(os.getenv("CODE_RUNNER_WORKER_MAX_JOBS", "200"))
+WORKER_HEALTHCHECK_SECONDS = int(os.getenv("CODE_RUNNER_WORKER_HEALTHCHECK_SECONDS", "30"))
+WORKER_PING_TIMEOUT_SECONDS = 1
+PARALLEL_TESTS = os.getenv("CODE_RUNNER_PARALLEL_TESTS", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+PARALLEL_WIDTH = int(os.getenv("CODE_RUNNER_PARALLEL_WIDTH", str(CPU_COUNT)))
+# Workers beyond the pool that submissions may borrow to fan their tests out.
+PARALLEL_SLOTS = int(
+    os.getenv(
+        "CODE_RUNNER_PARALLEL_SLOTS",
+        str(max(1, CPU_COUNT // 2)) if PARALLEL_TESTS else "0",
+    )
+)
+REPORT_FIRST_FAILURE = "first_failure"
+REPORT_ALL = "all"
+SOLUTION_REPORT_MODE = os.getenv("CODE_RUNNER_REPORT_MODE", REPORT_FIRST_FAILURE)
 RUNNER_ENV_KEYS = [
     "SYSTEMROOT",
     "WINDIR",
@@ -23,6 +53,8 @@ RUNNER_ENV_KEYS = [
     "TMPDIR",
 ]
 
+logger = logging.getLogger("code_runner")
+
 
 def normalize_output(value: str) -> str:
     return value.replace("\r\n", "\n").strip()
@@ -52,17 +84,251 @@ def build_harness_env() -> dict[str, str]:
             "PYTHONUNBUFFERED": "1",
             "PYTHONNOUSERSITE": "1",
             "PYTHONSAFEPATH": "1",
+            "PYTHONPATH": str(BASE_DIR),
         }
     )
     return env
 
 
+class HarnessWorker:
+    """Long-lived harness process that accepts framed jobs over its pipes."""
+
+    def __init__(self) -> None:
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "services.code_runner_harness", "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=str(BASE_DIR),
+            env=build_harness_env(),
+            close_fds=True,
+        )
+        self.jobs_done = 0
+        self.last_used_at = time.monotonic()
+        self._responses: queue.Queue[dict | None] = queue.Queue()
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def _read_responses(self) -> None:
+        while True:
+            try:
+                frame = read_frame(self.process.stdout)
+            except Exception:
+                frame = None
+            self._responses.put(frame)
+            if frame is None:
+                return
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, message: dict) -> None:
+        try:
+            write_frame(self.process.stdin, message)
+        except (BrokenPipeError, ValueError) as exc:
+            raise OSError(f"Runner worker is not accepting jobs: {exc}") from exc
+
+    def receive(self, timeout_seconds: float) -> dict:
+        try:
+            response = self._responses.get(timeout=timeout_seconds)
+        except queue.Empty as exc:
+            raise TimeoutError from exc
+        if response is None:
+            raise OSError(f"Runner worker exited with code {self.process.poll()}")
+        self.last_used_at = time.monotonic()
+        return response
+
+    def request(self, message: dict, timeout_seconds: float) -> dict:
+        self.send(message)
+        return self.receive(timeout_seconds)
+
+    def ping(self) -> bool:
+        if not self.is_alive():
+            return False
+        try:
+            response = self.request({"type": "ping"}, WORKER_PING_TIMEOUT_SECONDS)
+        except (OSError, TimeoutError):
+            return False
+        return response.get("type") == "pong"
+
+    def run(self, payload: dict, timeout_seconds: float) -> dict:
+        response = self.request({"type": "run", "payload": payload}, timeout_seconds)
+        self.jobs_done += 1
+        return response
+
+    def run_batch(self, payload: dict, case_timeout_seconds: float) -> Iterator[dict]:
+        self.send({"type": "batch", "payload": payload})
+        while True:
+            response = self.receive(case_timeout_seconds)
+            if response.get("type") == "done":
+                break
+            yield response.get("result") or {}
+        self.jobs_done += 1
+
+    def drain(self, timeout_seconds: float) -> bool:
+        try:
+            while self.receive(timeout_seconds).get("type") != "done":
+                continue
+        except (OSError, TimeoutError):
+            return False
+        self.jobs_done += 1
+        return True
+
+    def close(self) -> None:
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=WORKER_PING_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class RunnerPool:
+    """Bounded pool of pre-forked harness workers.
+
+    Workers are health-checked when they have been idle for a while, replaced
+    when they die or time out and recycled after ``max_jobs`` runs.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE + PARALLEL_SLOTS,
+        max_jobs: int = WORKER_MAX_JOBS,
+        healthcheck_seconds: int = WORKER_HEALTHCHECK_SECONDS,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self.healthcheck_seconds = healthcheck_seconds
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: list[HarnessWorker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> None:
+        with self._lock:
+            while len(self._idle) < self.size:
+                self._idle.append(HarnessWorker())
+
+    def _checkout(self) -> HarnessWorker:
+        with self._lock:
+            if self._closed:
+                raise OSError("Runner pool is shut down")
+            worker = self._idle.pop() if self._idle else None
+
+        if worker is not None:
+            needs_ping = time.monotonic() - worker.last_used_at >= self.healthcheck_seconds
+            if worker.is_alive() and (not needs_ping or worker.ping()):
+                return worker
+            logger.warning("Replacing unhealthy runner worker pid=%s", worker.process.pid)
+            worker.close()
+        return HarnessWorker()
+
+    def _checkin(self, worker: HarnessWorker) -> None:
+        if worker.jobs_done >= self.max_jobs or not worker.is_alive():
+            worker.close()
+            return
+        with self._lock:
+            if not self._closed:
+                self._idle.append(worker)
+                return
+        worker.close()
+
+    def run(self, payload: dict, timeout_seconds: float) -> dict:
+        with self._slots:
+            worker = self._checkout()
+            try:
+                result = worker.run(payload, timeout_seconds)
+            except (OSError, TimeoutError):
+                worker.process.kill()
+                worker.close()
+                raise
+            self._checkin(worker)
+            return result
+
+    def run_batch(self, payload: dict, case_timeout_seconds: float) -> Iterator[dict]:
+        with self._slots:
+            worker = self._checkout()
+            finished = False
+            try:
+                yield from worker.run_batch(payload, case_timeout_seconds)
+                finished = True
+            except GeneratorExit:
+                finished = worker.drain(case_timeout_seconds)
+                raise
+            finally:
+                if finished:
+                    self._checkin(worker)
+                else:
+                    worker.process.kill()
+                    worker.close()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.close()
+
+
+_runner_pool: RunnerPool | None = None
+_runner_pool_lock = threading.Lock()
+# Extra workers a submission may borrow to fan its tests out. The pool holds
+# POOL_SIZE + PARALLEL_SLOTS workers, so borrowed workers never come out of
+# the share that requests admitted by the task execution queue rely on.
+_parallel_slots = threading.BoundedSemaphore(PARALLEL_SLOTS) if PARALLEL_SLOTS > 0 else None
+
+
+def get_runner_pool() -> RunnerPool:
+    global _runner_pool
+
+    with _runner_pool_lock:
+        if _runner_pool is None:
+            _runner_pool = RunnerPool()
+        return _runner_pool
+
+
+def start_runner_pool() -> None:
+    if POOL_SIZE > 0:
+        get_runner_pool().start()
+
+
+def shutdown_runner_pool() -> None:
+    global _runner_pool
+
+    with _runner_pool_lock:
+        pool, _runner_pool = _runner_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
 def execute_program(
     language: str | ProgrammingLanguage,
     code: str,
     input_data: str,
     timeout_seconds: int,
 ) -> Tuple[bool, int, str, str, bool]:
+    return execute_program_with_details(language, code, input_data, timeout_seconds)[0]
+
+
+def execute_program_with_details(
+    language: str | ProgrammingLanguage,
+    code: str,
+    input_data: str,
+    timeout_seconds: int,
+    expected_output: str | None = None,
+    check_options: dict | None = None,
+    compiled: str | None = None,
+) -> Tuple[Tuple[bool, int, str, str, bool], dict]:
+    """Like :func:`execute_program`, also returning usage and checker verdict.
+
+    With ``expected_output`` the harness judges stdout itself and stops the
+    program at the first mismatch. ``compiled`` is bytecode from
+    :func:`precompile_code`, run instead of compiling the source again.
+    """
     normalized_language = normalize_programming_language(language)
     payload = {
         "language": normalized_language.value,
@@ -70,7 +336,28 @@ def execute_program(
         "input_data": input_data,
         "timeout_seconds": timeout_seconds,
     }
+    if compiled:
+        payload["compiled"] = compiled
+    if expected_output is not None:
+        payload.update(check_options or {}, expected_output=expected_output)
+
+    if POOL_SIZE <= 0:
+        return execute_program_once(payload, timeout_seconds)
+
+    try:
+        result = get_runner_pool().run(
+            payload,
+            timeout_seconds + HARNESS_TIMEOUT_GRACE_SECONDS,
+        )
+    except TimeoutError:
+        return (False, 0, "", f"Time limit exceeded ({timeout_seconds}s)", True), empty_details()
+    except OSError as exc:
+        return (False, 0, "", f"Runner harness error: {exc}", False), empty_details()
+
+    return parse_harness_result(result), parse_harness_details(result)
+
 
+def execute_program_once(payload: dict, timeout_seconds: int) -> Tuple[Tuple[bool, int, str, str, bool], dict]:
     try:
         process = subprocess.run(
             [sys.executable, "-m", "services.code_runner_harness"],
@@ -83,13 +370,13 @@ def execute_program(
             close_fds=True,
         )
     except subprocess.TimeoutExpired:
-        return False, 0, "", f"Time limit exceeded ({timeout_seconds}s)", True
+        return (False, 0, "", f"Time limit exceeded ({timeout_seconds}s)", True), empty_details()
     except OSError as exc:
-        return False, 0, "", f"Runner harness error: {exc}", False
+        return (False, 0, "", f"Runner harness error: {exc}", False), empty_details()
 
     if process.returncode != 0:
         stderr = normalize_output(process.stderr) or f"Runner harness exited with code {process.returncode}"
-        return False, 0, "", stderr, False
+        return (False, 0, "", stderr, False), empty_details()
 
     try:
         result = json.loads(process.stdout or "{}")
@@ -98,8 +385,12 @@ def execute_program(
         message = "Runner harness returned invalid JSON"
         if stderr:
             message = f"{message}: {stderr}"
-        return False, 0, "", message, False
+        return (False, 0, "", message, False), empty_details()
 
+    return parse_harness_result(result), parse_harness_details(result)
+
+
+def parse_harness_result(result: dict) -> Tuple[bool, int, str, str, bool]:
     stdout = normalize_output(str(result.get("stdout", "")))
     stderr = normalize_output(str(result.get("stderr", "")))
     runner_error = normalize_output(str(result.get("runner_error", "")))
@@ -113,6 +404,215 @@ def execute_program(
     return success, exit_code, stdout, stderr, timed_out
 
 
+def empty_details() -> dict:
+    return {"cpu_time_ms": None, "peak_memory_kb": None, "checker_passed": None}
+
+
+def parse_harness_details(result: dict) -> dict:
+    details = empty_details()
+    for key in ["cpu_time_ms", "peak_memory_kb"]:
+        value = result.get(key)
+        if isinstance(value, (int, float)) and value >= 0:
+            details[key] = int(value)
+    if isinstance(result.get("checker_passed"), bool):
+        details["checker_passed"] = result["checker_passed"]
+    return details
+
+
+def build_check_options(
+    check_mode: str | OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
+) -> dict:
+    return {
+        "check_mode": OutputCheckMode(check_mode or OutputCheckMode.EXACT).value,
+        "float_tolerance": DEFAULT_FLOAT_TOLERANCE if float_tolerance is None else float_tolerance,
+    }
+
+
+def case_output_passed(stdout: str, details: dict, case: TaskTestCase, check_options: dict) -> bool:
+    if details.get("checker_passed") is not None:
+        return details["checker_passed"]
+    return outputs_match(
+        stdout,
+        case.expected_output,
+        check_options["check_mode"],
+        check_options["float_tolerance"],
+    )
+
+
+def case_result_passed(
+    result: Tuple[bool, int, str, str, bool],
+    details: dict,
+    case: TaskTestCase,
+    check_options: dict,
+) -> bool:
+    success, exit_code, stdout, _stderr, timed_out = result
+    return (
+        success
+        and not timed_out
+        and exit_code == 0
+        and case_output_passed(stdout, details, case, check_options)
+    )
+
+
+def iter_batch_results(
+    language: str | ProgrammingLanguage,
+    code: str,
+    tests: List[TaskTestCase],
+    timeout_seconds: int,
+    fail_fast: bool = True,
+    check_options: dict | None = None,
+) -> Iterator[Tuple[Tuple[bool, int, str, str, bool], dict]]:
+    """Run every test case in one harness job and yield results as they finish.
+
+    Each item is the parsed result with its usage and checker verdict. With
+    ``fail_fast`` the harness stops after the first failing case, so fewer
+    results than tests may be yielded.
+    """
+    normalized_language = normalize_programming_language(language)
+    payload = {
+        "language": normalized_language.value,
+        "code": code,
+        "cases": [
+            {"input_data": case.input_data, "expected_output": case.expected_output}
+            for case in tests
+        ],
+        "timeout_seconds": timeout_seconds,
+        "fail_fast": fail_fast,
+        **(check_options or build_check_options()),
+    }
+
+    if POOL_SIZE <= 0:
+        yield from execute_batch_once(payload, timeout_seconds)
+        return
+
+    try:
+        for result in get_runner_pool().run_batch(
+            payload,
+            timeout_seconds + HARNESS_TIMEOUT_GRACE_SECONDS,
+        ):
+            yield parse_harness_result(result), parse_harness_details(result)
+    except TimeoutError:
+        yield (False, 0, "", f"Time limit exceeded ({timeout_seconds}s)", True), empty_details()
+    except OSError as exc:
+        yield (False, 0, "", f"Runner harness error: {exc}", False), empty_details()
+
+
+def iter_parallel_results(
+    language: str | ProgrammingLanguage,
+    code: str,
+    tests: List[TaskTestCase],
+    timeout_seconds: int,
+    fail_fast: bool = True,
+    check_options: dict | None = None,
+) -> Iterator[Tuple[Tuple[bool, int, str, str, bool], dict]]:
+    """Fan test cases out over several pool workers and yield results in order.
+
+    Only spare parallel slots are borrowed, without waiting; when none are
+    free the submission falls back to a single sequential batch. The solution
+    is compiled once up front, and after the first failure with ``fail_fast``
+    the cases not started yet are dropped.
+    """
+    borrowed = 0
+    if _parallel_slots is not None:
+        while borrowed < min(PARALLEL_WIDTH, len(tests)) - 1 and _parallel_slots.acquire(blocking=False):
+            borrowed += 1
+    if not borrowed:
+        yield from iter_batch_results(
+            language,
+            code,
+            tests,
+            timeout_seconds,
+            fail_fast=fail_fast,
+            check_options=check_options,
+        )
+        return
+
+    compiled, compile_error = precompile_code(language, code)
+    if compile_error is not None:
+        release_parallel_slots([], borrowed)
+        failed = parse_harness_result(build_compile_error_result(compile_error)), empty_details()
+        for _case in (tests[:1] if fail_fast else tests):
+            yield failed
+        return
+
+    check_options = check_options or build_check_options()
+    executor = ThreadPoolExecutor(max_workers=borrowed + 1)
+    futures = []
+    try:
+        futures = [
+            executor.submit(
+                execute_program_with_details,
+                language,
+                code,
+                case.input_data,
+                timeout_seconds,
+                case.expected_output,
+                check_options,
+                compiled,
+            )
+            for case in tests
+        ]
+        for case, future in zip(tests, futures):
+            result, details = future.result()
+            yield result, details
+            if fail_fast and not case_result_passed(result, details, case, check_options):
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        release_parallel_slots(futures, borrowed)
+
+
+def release_parallel_slots(futures: List[Future], count: int) -> None:
+    """Give ``count`` borrowed slots back once the cases still running have finished."""
+    running = [future for future in futures if not future.done()]
+    if not running:
+        for _ in range(count):
+            _parallel_slots.release()
+        return
+
+    lock = threading.Lock()
+    remaining = [len(running)]
+
+    def on_done(_future: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            for _ in range(count):
+                _parallel_slots.release()
+
+    for future in running:
+        future.add_done_callback(on_done)
+
+
+def execute_batch_once(
+    payload: dict,
+    timeout_seconds: int,
+) -> Iterator[Tuple[Tuple[bool, int, str, str, bool], dict]]:
+    """Run a batch in a throwaway worker, yielding each case as it finishes.
+
+    Every case gets its own ``timeout_seconds`` deadline, so a time limit is
+    reported for the case that was actually running when it expired.
+    """
+    try:
+        worker = HarnessWorker()
+    except OSError as exc:
+        yield (False, 0, "", f"Runner harness error: {exc}", False), empty_details()
+        return
+
+    try:
+        for result in worker.run_batch(payload, timeout_seconds + HARNESS_TIMEOUT_GRACE_SECONDS):
+            yield parse_harness_result(result), parse_harness_details(result)
+    except TimeoutError:
+        yield (False, 0, "", f"Time limit exceeded ({timeout_seconds}s)", True), empty_details()
+    except OSError as exc:
+        yield (False, 0, "", f"Runner harness error: {exc}", False), empty_details()
+    finally:
+        worker.process.kill()
+        worker.close()
+
+
 def run_program(
     language: str | ProgrammingLanguage,
     code: str,
@@ -127,12 +627,45 @@ def run_program(
     return execute_program(language, code, input_data=input_data, timeout_seconds=timeout_seconds)
 
 
+def build_test_run_result(
+    case: TaskTestCase,
+    actual_output: str,
+    stderr: str,
+    passed: bool = False,
+    details: dict | None = None,
+) -> TaskTestRunResult:
+    details = details or {}
+    return TaskTestRunResult(
+        input_data=case.input_data,
+        expected_output=case.expected_output,
+        actual_output=actual_output,
+        stderr=stderr,
+        passed=passed,
+        is_public=getattr(case, "is_public", True),
+        cpu_time_ms=details.get("cpu_time_ms"),
+        peak_memory_kb=details.get("peak_memory_kb"),
+    )
+
+
 def run_solution(
     language: str | ProgrammingLanguage,
     code: str,
     tests: List[TaskTestCase],
     timeout_seconds: int | None = None,
+    report_mode: str | None = None,
+    parallel: bool | None = None,
+    on_test_result: Callable[[TaskTestRunResult], None] | None = None,
+    check_mode: str | OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
 ) -> Tuple[bool, int, str, str, List[TaskTestRunResult]]:
+    """Run the solution against ``tests``.
+
+    ``report_mode`` is ``"first_failure"`` (stop at the first failing test) or
+    ``"all"`` (run every test and report each result). The returned stdout and
+    stderr describe the first failure, if any. ``on_test_result`` is called
+    with each test result as soon as that test finishes. ``check_mode`` and
+    ``float_tolerance`` select how stdout is compared with the expected output.
+    """
     validation_error = validate_code_payload(code)
     if validation_error:
         return False, 0, "", validation_error, []
@@ -141,62 +674,56 @@ def run_solution(
         return True, 0, "", "", []
 
     timeout_seconds = timeout_seconds or DEFAULT_TIMEOUT_SECONDS
+    fail_fast = (report_mode or SOLUTION_REPORT_MODE) != REPORT_ALL
+    parallel = PARALLEL_TESTS if parallel is None else parallel
+    check_options = build_check_options(check_mode, float_tolerance)
     passed = 0
     stdout_parts: List[str] = []
     stderr_parts: List[str] = []
     test_results: List[TaskTestRunResult] = []
+    failure: Tuple[str, str] | None = None
 
-    for case in tests:
-        success, exit_code, stdout, stderr, timed_out = execute_program(
-            language,
-            code,
-            input_data=case.input_data,
-            timeout_seconds=timeout_seconds,
-        )
-        expected = normalize_output(case.expected_output)
+    iter_results = iter_parallel_results if parallel and len(tests) > 1 else iter_batch_results
+    case_results = iter_results(
+        language,
+        code,
+        tests,
+        timeout_seconds,
+        fail_fast=fail_fast,
+        check_options=check_options,
+    )
+
+    for case, ((success, exit_code, stdout, stderr, timed_out), details) in zip(tests, case_results):
         stdout_parts.append(stdout)
         stderr_parts.append(stderr)
 
         if timed_out:
-            test_results.append(
-                TaskTestRunResult(
-                    input_data=case.input_data,
-                    expected_output=case.expected_output,
-                    actual_output="",
-                    stderr=stderr,
-                    passed=False,
-                    is_public=getattr(case, "is_public", True),
-                )
-            )
-            return False, passed, "", stderr, test_results
-
-        if exit_code != 0:
-            test_results.append(
-                TaskTestRunResult(
-                    input_data=case.input_data,
-                    expected_output=case.expected_output,
-                    actual_output=stdout,
-                    stderr=stderr,
-                    passed=False,
-                    is_public=getattr(case, "is_public", True),
-                )
-            )
-            return False, passed, stdout, stderr or f"Exit code {exit_code}", test_results
-
-        test_passed = success and stdout == expected
-        test_results.append(
-            TaskTestRunResult(
-                input_data=case.input_data,
-                expected_output=case.expected_output,
-                actual_output=stdout,
-                stderr=stderr,
-                passed=test_passed,
-                is_public=getattr(case, "is_public", True),
-            )
-        )
-        if not test_passed:
-            return False, passed, stdout, "", test_results
-        passed += 1
+            test_result = build_test_run_result(case, "", stderr, details=details)
+            case_failure = ("", stderr)
+        elif exit_code != 0:
+            test_result = build_test_run_result(case, stdout, stderr, details=details)
+            case_failure = (stdout, stderr or f"Exit code {exit_code}")
+        elif not success and stderr and details["checker_passed"] is not False:
+            test_result = build_test_run_result(case, stdout, stderr, details=details)
+            case_failure = (stdout, stderr)
+        else:
+            test_passed = success and case_output_passed(stdout, details, case, check_options)
+            test_result = build_test_run_result(case, stdout, stderr, passed=test_passed, details=details)
+            case_failure = None if test_passed else (stdout, "")
+
+        test_results.append(test_result)
+        if on_test_result is not None:
+            on_test_result(test_result)
+        if case_failure is None:
+            passed += 1
+            continue
+
+        failure = failure or case_failure
+        if fail_fast:
+            break
+
+    if failure:
+        return False, passed, failure[0], failure[1], test_results
 
     return (
         True,
@@ -224,12 +751,18 @@ def run_python_solution(
     code: str,
     tests: List[TaskTestCase],
     timeout_seconds: int | None = None,
+    on_test_result: Callable[[TaskTestRunResult], None] | None = None,
+    check_mode: str | OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
 ) -> Tuple[bool, int, str, str, List[TaskTestRunResult]]:
     return run_solution(
         ProgrammingLanguage.PYTHON,
         code,
         tests,
         timeout_seconds=timeout_seconds,
+        on_test_result=on_test_result,
+        check_mode=check_mode,
+        float_tolerance=float_tolerance,
     )
 
 
@@ -250,10 +783,16 @@ def run_javascript_solution(
     code: str,
     tests: List[TaskTestCase],
     timeout_seconds: int | None = None,
+    on_test_result: Callable[[TaskTestRunResult], None] | None = None,
+    check_mode: str | OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
 ) -> Tuple[bool, int, str, str, List[TaskTestRunResult]]:
     return run_solution(
         ProgrammingLanguage.JAVASCRIPT,
         code,
         tests,
         timeout_seconds=timeout_seconds,
+        on_test_result=on_test_result,
+        check_mode=check_mode,
+        float_tolerance=float_tolerance,
     )
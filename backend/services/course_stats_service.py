@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime
+
+from beanie import Document, PydanticObjectId
+
+from models.course import Course
+from models.task import Task
+from models.topic import Topic
+from services.document_loader import prime_document
+
+
+logger = logging.getLogger("course_stats")
+
+
+async def add_child_id(document: Document, field: str, child_id: str) -> None:
+    """Add ``child_id`` to a list of ids on a course or lesson, such as ``task_ids``.
+
+    Only that list and ``updated_at`` are written, never the stored totals, so
+    a concurrent :func:`shift_totals` is not overwritten.
+    """
+    await document.update({"$addToSet": {field: child_id}, "$set": {"updated_at": datetime.utcnow()}})
+    prime_document(document)
+
+
+async def remove_child_id(document: Document, field: str, child_id: str) -> None:
+    await document.update({"$pull": {field: child_id}, "$set": {"updated_at": datetime.utcnow()}})
+    prime_document(document)
+
+
+async def shift_totals(
+    course: Course,
+    topic: Topic | None = None,
+    points: int = 0,
+    tasks: int = 0,
+) -> None:
+    """Move the stored ``total_points``/``total_tasks`` of a course and one of its lessons."""
+    if not points and not tasks:
+        return
+    for model, document in ((Topic, topic), (Course, course)):
+        if document is None:
+            continue
+        await model.get_motor_collection().update_one(
+            {"_id": document.id},
+            {"$inc": {"total_points": points, "total_tasks": tasks}},
+        )
+        document.total_points += points
+        document.total_tasks += tasks
+        if document.total_points < 0 or document.total_tasks < 0:
+            logger.warning(
+                "Totals of %s %s drifted below zero, run maintenance.py rebuild-aggregates",
+                model.__name__,
+                document.id,
+            )
+
+
+async def refresh_manual_review_flags(course: Course, topic: Topic | None = None) -> None:
+    if topic is not None:
+        topic.has_manual_review_tasks = (
+            await Task.find_one({"topic_id": str(topic.id), "requires_manual_review": True}) is not None
+        )
+        await Topic.get_motor_collection().update_one(
+            {"_id": topic.id},
+            {"$set": {"has_manual_review_tasks": topic.has_manual_review_tasks}},
+        )
+    course.has_manual_review_tasks = (
+        await Topic.find_one({"course_id": str(course.id), "has_manual_review_tasks": True}) is not None
+    )
+    await Course.get_motor_collection().update_one(
+        {"_id": course.id},
+        {"$set": {"has_manual_review_tasks": course.has_manual_review_tasks}},
+    )
+
+
+async def apply_task_change(
+    course: Course,
+    topic: Topic,
+    points: int = 0,
+    tasks: int = 0,
+    manual_review_changed: bool = False,
+) -> None:
+    """Keep lesson and course aggregates in step with an added, edited or removed task."""
+    await shift_totals(course, topic, points=points, tasks=tasks)
+    if manual_review_changed:
+        await refresh_manual_review_flags(course, topic)
+
+
+async def rebuild_course_aggregates(course: Course) -> None:
+    """Recompute the aggregates of a course and its lessons from the tasks themselves."""
+    topics = await Topic.find({"_id": {"$in": [PydanticObjectId(item) for item in course.topic_ids]}}).to_list()
+    task_ids = [PydanticObjectId(task_id) for topic in topics for task_id in topic.task_ids]
+    tasks = {
+        str(task.id): task
+        for task in await Task.find({"_id": {"$in": task_ids}}).to_list()
+    }
+    course.total_points = course.total_tasks = 0
+    course.has_manual_review_tasks = False
+    for topic in topics:
+        topic_tasks = [tasks[task_id] for task_id in topic.task_ids if task_id in tasks]
+        topic.total_points = sum(task.points for task in topic_tasks)
+        topic.total_tasks = len(topic.task_ids)
+        topic.has_manual_review_tasks = any(task.requires_manual_review for task in topic_tasks)
+        await Topic.get_motor_collection().update_one(
+            {"_id": topic.id},
+            {
+                "$set": {
+                    "total_points": topic.total_points,
+                    "total_tasks": topic.total_tasks,
+                    "has_manual_review_tasks": topic.has_manual_review_tasks,
+                }
+            },
+        )
+        course.total_points += topic.total_points
+        course.total_tasks += topic.total_tasks
+        course.has_manual_review_tasks = course.has_manual_review_tasks or topic.has_manual_review_tasks
+    await Course.get_motor_collection().update_one(
+        {"_id": course.id},
+        {
+            "$set": {
+                "total_points": course.total_points,
+                "total_tasks": course.total_tasks,
+                "has_manual_review_tasks": course.has_manual_review_tasks,
+            }
+        },
+    )
+
+
+async def rebuild_all_course_aggregates() -> int:
+    rebuilt = 0
+    async for course in Course.find_all():
+        await rebuild_course_aggregates(course)
+        rebuilt += 1
+        logger.info("Rebuilt aggregates of course %s", course.id)
+    return rebuilt
@@ -0,0 +1,145 @@
+import asyncio
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar
+
+from beanie import Document, PydanticObjectId
+from bson.errors import InvalidId
+
+
+D = TypeVar("D", bound=Document)
+
+
+class DocumentLoader:
+    """Identity map of the documents read while serving one request.
+
+    Ids asked for in the same event loop turn are fetched together with a
+    single ``$in`` query per model; every id is fetched at most once, and
+    missing documents are remembered as missing. Writes made during the
+    request go through :meth:`prime` and :meth:`clear` so later reads see them.
+    """
+
+    def __init__(self):
+        self._documents: Dict[Tuple[type, str], asyncio.Future] = {}
+        self._pending: Dict[type, List[Tuple[str, asyncio.Future]]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load_many(self, model: Type[D], document_ids: Iterable[Any]) -> List[Optional[D]]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for document_id in document_ids:
+            key = (model, str(document_id))
+            future = self._documents.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._documents[key] = future
+                pending = self._pending.setdefault(model, [])
+                if not pending:
+                    # The task starts on the next loop turn, after the other ids of this one.
+                    task = loop.create_task(self._dispatch(model))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                pending.append((str(document_id), future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures)) if futures else []
+
+    async def _dispatch(self, model: Type[D]) -> None:
+        pending = self._pending.pop(model, [])
+        try:
+            documents = await fetch_documents(model, [document_id for document_id, _future in pending])
+        except Exception as exc:
+            for document_id, future in pending:
+                if self._documents.get((model, document_id)) is future:
+                    del self._documents[(model, document_id)]
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_document_id, future), document in zip(pending, documents):
+            if not future.done():
+                future.set_result(document)
+
+    def prime(self, document: Document) -> None:
+        """Serve ``document`` for its id from now on, e.g. after it was inserted or saved."""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(document)
+        self._documents[(type(document), str(document.id))] = future
+
+    def clear(self, model: Type[Document], document_id: Any) -> None:
+        """Forget ``document_id`` so the next load reads it again, e.g. after a delete."""
+        self._documents.pop((model, str(document_id)), None)
+
+    async def close(self) -> None:
+        """Cancel the lookups still running when the request ends."""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for future in self._documents.values():
+            future.cancel()
+        self._documents.clear()
+        self._pending.clear()
+
+
+_current_loader: ContextVar[Optional[DocumentLoader]] = ContextVar("document_loader", default=None)
+
+
+def open_document_loader() -> Token:
+    return _current_loader.set(DocumentLoader())
+
+
+async def close_document_loader(token: Token) -> None:
+    loader = _current_loader.get()
+    _current_loader.reset(token)
+    if loader is not None:
+        await loader.close()
+
+
+async def fetch_documents(model: Type[D], document_ids: List[str]) -> List[Optional[D]]:
+    """Read ``document_ids`` with one query, in input order, None where missing."""
+    if len(document_ids) == 1:
+        try:
+            return [await model.get(document_ids[0])]
+        except (InvalidId, ValueError):
+            return [None]
+    object_ids = []
+    for document_id in dict.fromkeys(document_ids):
+        try:
+            object_ids.append(PydanticObjectId(document_id))
+        except (InvalidId, TypeError):
+            continue
+    found = {}
+    if object_ids:
+        found = {str(document.id): document for document in await model.find({"_id": {"$in": object_ids}}).to_list()}
+    return [found.get(document_id) for document_id in document_ids]
+
+
+async def load_document(model: Type[D], document_id: Any) -> Optional[D]:
+    if not document_id:
+        return None
+    return (await load_documents(model, [document_id], keep_missing=True))[0]
+
+
+async def load_documents(model: Type[D], document_ids: Iterable[Any], keep_missing: bool = False) -> List[D]:
+    """Documents for ``document_ids`` in input order, cached for the current request.
+
+    Missing documents are dropped unless ``keep_missing`` is set, in which
+    case they stay in place as None.
+    """
+    document_ids = [str(document_id) for document_id in document_ids if document_id]
+    loader = _current_loader.get()
+    if loader is None:
+        documents = await fetch_documents(model, document_ids) if document_ids else []
+    else:
+        documents = await loader.load_many(model, document_ids)
+    return documents if keep_missing else [document for document in documents if document is not None]
+
+
+def prime_document(document: Document) -> None:
+    loader = _current_loader.get()
+    if loader is not None and document.id is not None:
+        loader.prime(document)
+
+
+def clear_document(model: Type[Document], document_id: Any) -> None:
+    loader = _current_loader.get()
+    if loader is not None:
+        loader.clear(model, document_id)
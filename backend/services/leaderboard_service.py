@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from models.course import Course
+from models.leaderboard_entry import LeaderboardEntry
+from models.task_result_record import TaskResultRecord
+from models.user import User
+from services.document_loader import fetch_documents, load_documents
+from services.learning_service import get_course_students
+
+
+logger = logging.getLogger("leaderboard")
+LEADERBOARD_PAGE_SIZE = 20
+# Highest score first, ties by surname and name; the user id keeps pages stable.
+LEADERBOARD_ORDER = ("-points", "+surname", "+name", "+user_id")
+
+
+def _member_fields(user: User) -> dict:
+    return {"surname": user.surname or "", "name": user.name or "", "tg_username": user.tg_username or ""}
+
+
+async def add_leaderboard_members(course_id: str, user_ids: Iterable[str]) -> None:
+    """Put students on a course board with zero points, e.g. when they join the course or a group.
+
+    Students already on the board keep their standing.
+    """
+    users = await load_documents(User, user_ids)
+    operations = [
+        UpdateOne(
+            {"course_id": course_id, "user_id": str(user.id)},
+            {"$setOnInsert": {"points": 0, "solved": 0, **_member_fields(user)}},
+            upsert=True,
+        )
+        for user in users
+    ]
+    if not operations:
+        return
+    try:
+        await LeaderboardEntry.get_motor_collection().bulk_write(operations, ordered=False)
+    except BulkWriteError as exc:
+        # Entries created concurrently exist now; anything else is a real failure.
+        if any(error.get("code") != 11000 for error in exc.details.get("writeErrors", [])):
+            raise
+
+
+async def record_score_change(course_id: str, user_id: str, points: int = 0, solved: int = 0) -> None:
+    """Shift a student's standing after one of their results changed.
+
+    Students are normally put on the board when they join; one missing
+    from it (e.g. enrolled before boards were stored) is added here.
+    """
+    query = {"course_id": course_id, "user_id": user_id}
+    collection = LeaderboardEntry.get_motor_collection()
+    if points or solved:
+        updated = await collection.update_one(query, {"$inc": {"points": points, "solved": solved}})
+        if updated.matched_count:
+            return
+    elif await collection.count_documents(query, limit=1):
+        return
+    await add_leaderboard_members(course_id, [user_id])
+    if points or solved:
+        await collection.update_one(query, {"$inc": {"points": points, "solved": solved}})
+
+
+async def rename_leaderboard_member(user: User) -> None:
+    """Copy a student's current name onto their entries in every course board."""
+    await LeaderboardEntry.get_motor_collection().update_many(
+        {"user_id": str(user.id)},
+        {"$set": _member_fields(user)},
+    )
+
+
+async def remove_leaderboard_member(user_id: str) -> None:
+    """Take a deleted user off every course board."""
+    await LeaderboardEntry.get_motor_collection().delete_many({"user_id": str(user_id)})
+
+
+def _members_query(course_id: str, member_ids: Iterable[str]) -> dict:
+    return {"course_id": course_id, "user_id": {"$in": list(dict.fromkeys(member_ids))}}
+
+
+async def get_leaderboard_page(
+    course_id: str,
+    member_ids: Iterable[str],
+    offset: int = 0,
+    limit: Optional[int] = LEADERBOARD_PAGE_SIZE,
+) -> Tuple[List[LeaderboardEntry], int]:
+    """One page of the board of ``member_ids`` (a group or the whole course) and its size.
+
+    ``limit=None`` reads the whole board.
+    """
+    query = _members_query(course_id, member_ids)
+    page = LeaderboardEntry.find(query).sort(*LEADERBOARD_ORDER).skip(offset)
+    if limit is not None:
+        page = page.limit(limit)
+    entries, total = await asyncio.gather(page.to_list(), LeaderboardEntry.find(query).count())
+    return entries, total
+
+
+async def get_leaderboard_rank(course_id: str, member_ids: Iterable[str], user_id: str) -> Optional[int]:
+    """1-based place of ``user_id`` among ``member_ids``, or None when they are not on the board."""
+    member_ids = list(member_ids)
+    if user_id not in member_ids:
+        return None
+    entry = await LeaderboardEntry.find_one({"course_id": course_id, "user_id": user_id})
+    if not entry:
+        return None
+    query = _members_query(course_id, member_ids)
+    query["$or"] = [
+        {"points": {"$gt": entry.points}},
+        {"points": entry.points, "surname": {"$lt": entry.surname}},
+        {"points": entry.points, "surname": entry.surname, "name": {"$lt": entry.name}},
+        {"points": entry.points, "surname": entry.surname, "name": entry.name, "user_id": {"$lt": user_id}},
+    ]
+    return await LeaderboardEntry.find(query).count() + 1
+
+
+async def rebuild_course_leaderboard(course_id: str) -> int:
+    """Recompute a course board from ``task_results``, e.g. after tasks were deleted.
+
+    Every current student of the course is on the rebuilt board, with zero
+    points when they have no results.
+    """
+    totals = await TaskResultRecord.summarize_by({"course_id": course_id}, "user_id")
+    course = await Course.get(course_id)
+    member_ids = list(dict.fromkeys([*(await get_course_students(course) if course else []), *totals]))
+    users = await fetch_documents(User, member_ids) if member_ids else []
+    collection = LeaderboardEntry.get_motor_collection()
+    operations = [
+        UpdateOne(
+            {"course_id": course_id, "user_id": str(user.id)},
+            {
+                "$set": {
+                    "points": totals.get(str(user.id), (0, 0))[0],
+                    "solved": totals.get(str(user.id), (0, 0))[1],
+                    **_member_fields(user),
+                }
+            },
+            upsert=True,
+        )
+        for user in users
+        if user is not None
+    ]
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    kept = [str(user.id) for user in users if user is not None]
+    await collection.delete_many({"course_id": course_id, "user_id": {"$nin": kept}})
+    return len(kept)
+
+
+async def rebuild_all_leaderboards() -> int:
+    rebuilt = 0
+    async for course in Course.find_all():
+        entries = await rebuild_course_leaderboard(str(course.id))
+        rebuilt += 1
+        logger.info("Rebuilt leaderboard of course %s with %s students", course.id, entries)
+    return rebuilt
@@ -5,35 +5,69 @@ from models.group import Group
 from models.student_course_enrollment import StudentCourseEnrollment
 from models.user import User, UserType
 from services.billing_service import get_or_create_enrollment
+from services.course_stats_service import add_child_id, remove_child_id
+from services.document_loader import load_documents
 
 
 async def get_groups_for_course(course: Course) -> List[Group]:
     if course.group_ids:
-        groups: List[Group] = []
-        for group_id in course.group_ids:
-            group = await Group.get(group_id)
-            if group:
-                groups.append(group)
+        groups = await load_documents(Group, course.group_ids)
     else:
         groups = await Group.find(Group.course_id == str(course.id)).to_list()
     groups.sort(key=lambda item: (item.name or "").lower())
     return groups
 
 
-async def get_course_students(course: Course) -> List[str]:
+async def get_groups_for_courses(courses: List[Course]) -> Dict[str, List[Group]]:
+    """Groups of every course in ``courses`` with at most two queries, keyed by course id."""
+    listed_ids = [group_id for course in courses for group_id in course.group_ids]
+    listed = {str(group.id): group for group in await load_documents(Group, listed_ids)}
+    unlisted_course_ids = [str(course.id) for course in courses if not course.group_ids]
+    unlisted: List[Group] = []
+    if unlisted_course_ids:
+        unlisted = await Group.find({"course_id": {"$in": unlisted_course_ids}}).to_list()
+
+    course_groups: Dict[str, List[Group]] = {}
+    for course in courses:
+        if course.group_ids:
+            groups = [listed[group_id] for group_id in course.group_ids if group_id in listed]
+        else:
+            groups = [group for group in unlisted if group.course_id == str(course.id)]
+        groups.sort(key=lambda item: (item.name or "").lower())
+        course_groups[str(course.id)] = groups
+    return course_groups
+
+
+def collect_course_students(course: Course, groups: List[Group]) -> List[str]:
     student_ids: Set[str] = set(course.student_ids)
-    for group in await get_groups_for_course(course):
+    for group in groups:
         student_ids.update(group.students)
     return list(student_ids)
 
 
-async def get_course_teachers(course: Course) -> List[str]:
+def collect_course_teachers(course: Course, groups: List[Group]) -> List[str]:
     teacher_ids: Set[str] = set(course.teacher_ids)
-    for group in await get_groups_for_course(course):
+    for group in groups:
         teacher_ids.update(group.teachers)
     return list(teacher_ids)
 
 
+def user_can_edit_course(user: User, course: Course, teacher_ids: List[str]) -> bool:
+    if user.user_type == UserType.ADMIN:
+        return True
+    if user.user_type != UserType.TEACHER:
+        return False
+    return str(user.id) in teacher_ids or str(user.id) in course.teacher_ids
+
+
+async def get_course_students(course: Course) -> List[str]:
+    return collect_course_students(course, await get_groups_for_course(course))
+
+
+async def get_course_teachers(course: Course) -> List[str]:
+    return collect_course_teachers(course, await get_groups_for_course(course))
+
+
 async def get_courses_for_user(user: User) -> List[Course]:
     if user.user_type == UserType.ADMIN:
         return await Course.find_all().to_list()
@@ -43,21 +77,17 @@ async def get_courses_for_user(user: User) -> List[Course]:
     group_courses = await Group.find({"$or": [{"students": str(user.id)}, {"teachers": str(user.id)}]}).to_list()
     group_course_ids = {group.course_id for group in group_courses}
     merged = {str(course.id): course for course in direct_courses}
-    if group_course_ids:
-        for course_id in group_course_ids:
-            course = await Course.get(course_id)
-            if course:
-                merged[str(course.id)] = course
+    missing_course_ids = [course_id for course_id in group_course_ids if course_id not in merged]
+    for course in await load_documents(Course, missing_course_ids):
+        merged[str(course.id)] = course
     return list(merged.values())
 
 
 async def can_edit_course(user: User, course: Course) -> bool:
-    if user.user_type == UserType.ADMIN:
-        return True
-    if user.user_type != UserType.TEACHER:
+    if user.user_type not in {UserType.ADMIN, UserType.TEACHER}:
         return False
-    teacher_ids = await get_course_teachers(course)
-    return str(user.id) in teacher_ids or str(user.id) in course.teacher_ids
+    teacher_ids = [] if user.user_type == UserType.ADMIN else await get_course_teachers(course)
+    return user_can_edit_course(user, course, teacher_ids)
 
 
 async def get_student_group_assignments(student_id: str) -> Dict[str, Group]:
@@ -103,13 +133,9 @@ async def sync_student_course_memberships(
         has_member = student_id in course.student_ids
         should_have = course_id in target_ids
         if should_have and not has_member:
-            course.student_ids.append(student_id)
-            course.touch()
-            await course.save()
+            await add_child_id(course, "student_ids", student_id)
         if not should_have and has_member:
-            course.student_ids = [item for item in course.student_ids if item != student_id]
-            course.touch()
-            await course.save()
+            await remove_child_id(course, "student_ids", student_id)
 
         course_groups = await get_groups_for_course(course)
         target_group_id = normalized_group_ids.get(course_id)
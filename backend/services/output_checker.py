@@ -0,0 +1,185 @@
+import math
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from models.output_check_mode import DEFAULT_FLOAT_TOLERANCE, OutputCheckMode
+
+
+class OutputChecker(ABC):
+    """Compare program output with the expected answer while it is produced.
+
+    ``feed`` receives decoded stdout chunks and returns ``False`` as soon as
+    the output can no longer match, so the runner can stop the program
+    early. ``finish`` gives the verdict once the output is complete.
+    """
+
+    failed = False
+
+    @abstractmethod
+    def feed(self, text: str) -> bool:
+        """Take the next stdout chunk; False once the output cannot match."""
+
+    @abstractmethod
+    def finish(self) -> bool:
+        """Verdict on the complete output."""
+
+    def fail(self) -> bool:
+        self.failed = True
+        return False
+
+
+class ExactOutputChecker(OutputChecker):
+    """Same verdict as comparing the normalized outputs as whole strings."""
+
+    def __init__(self, expected_output: str) -> None:
+        self.expected = expected_output.replace("\r\n", "\n").strip()
+        self.position = 0
+        self.started = False
+        self.pending_cr = False
+
+    def feed(self, text: str) -> bool:
+        if self.failed:
+            return False
+        if self.pending_cr:
+            text = f"\r{text}"
+        self.pending_cr = text.endswith("\r")
+        if self.pending_cr:
+            text = text[:-1]
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        if not self.started:
+            text = text.lstrip()
+            if not text:
+                return True
+            self.started = True
+
+        remaining = len(self.expected) - self.position
+        if len(text) <= remaining:
+            if not self.expected.startswith(text, self.position):
+                return self.fail()
+            self.position += len(text)
+            return True
+
+        # Past the end of the answer only trailing whitespace may follow.
+        if not self.expected.startswith(text[:remaining], self.position) or text[remaining:].strip():
+            return self.fail()
+        self.position = len(self.expected)
+        return True
+
+    def finish(self) -> bool:
+        return not self.failed and self.position == len(self.expected)
+
+
+class TokenOutputChecker(OutputChecker):
+    """Compare whitespace-separated tokens, numbers optionally with a tolerance."""
+
+    def __init__(self, expected_output: str, tolerance: float | None = None) -> None:
+        self.expected_tokens = expected_output.split()
+        self.tolerance = tolerance
+        self.index = 0
+        self.partial = ""
+
+    def feed(self, text: str) -> bool:
+        if self.failed:
+            return False
+        tokens = (self.partial + text).split()
+        self.partial = ""
+        if tokens and text and not text[-1].isspace():
+            self.partial = tokens.pop()
+        for token in tokens:
+            if not self.accept(token):
+                return self.fail()
+        if self.partial and self.tolerance is None:
+            if self.index >= len(self.expected_tokens) or not self.expected_tokens[self.index].startswith(self.partial):
+                return self.fail()
+        return True
+
+    def accept(self, token: str) -> bool:
+        if self.index >= len(self.expected_tokens):
+            return False
+        expected = self.expected_tokens[self.index]
+        self.index += 1
+        return token == expected or self.numbers_match(token, expected)
+
+    def numbers_match(self, token: str, expected: str) -> bool:
+        if self.tolerance is None:
+            return False
+        try:
+            actual_value = float(token)
+            expected_value = float(expected)
+        except ValueError:
+            return False
+        if math.isnan(actual_value) or math.isnan(expected_value):
+            return False
+        if math.isinf(actual_value) or math.isinf(expected_value):
+            return actual_value == expected_value
+        return abs(actual_value - expected_value) <= self.tolerance * max(1.0, abs(expected_value))
+
+    def finish(self) -> bool:
+        if self.failed:
+            return False
+        if self.partial and not self.accept(self.partial):
+            return False
+        self.partial = ""
+        return self.index == len(self.expected_tokens)
+
+
+class UnorderedLinesOutputChecker(OutputChecker):
+    """Compare the multiset of non-empty lines, ignoring their order."""
+
+    def __init__(self, expected_output: str) -> None:
+        self.remaining = Counter(
+            line.strip() for line in expected_output.splitlines() if line.strip()
+        )
+        self.partial = ""
+
+    def feed(self, text: str) -> bool:
+        if self.failed:
+            return False
+        lines = (self.partial + text).split("\n")
+        self.partial = lines.pop()
+        for line in lines:
+            if not self.accept(line):
+                return self.fail()
+        return True
+
+    def accept(self, line: str) -> bool:
+        key = line.strip()
+        if not key:
+            return True
+        if self.remaining[key] <= 0:
+            return False
+        self.remaining[key] -= 1
+        return True
+
+    def finish(self) -> bool:
+        if self.failed or not self.accept(self.partial):
+            return False
+        self.partial = ""
+        return not +self.remaining
+
+
+def build_output_checker(
+    expected_output: str,
+    check_mode: str | OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
+) -> OutputChecker:
+    mode = OutputCheckMode(check_mode or OutputCheckMode.EXACT)
+    if mode == OutputCheckMode.TOKENS:
+        return TokenOutputChecker(expected_output)
+    if mode == OutputCheckMode.FLOAT:
+        tolerance = DEFAULT_FLOAT_TOLERANCE if float_tolerance is None else float_tolerance
+        return TokenOutputChecker(expected_output, tolerance=tolerance)
+    if mode == OutputCheckMode.UNORDERED_LINES:
+        return UnorderedLinesOutputChecker(expected_output)
+    return ExactOutputChecker(expected_output)
+
+
+def outputs_match(
+    actual_output: str,
+    expected_output: str,
+    check_mode: str | OutputCheckMode | None = None,
+    float_tolerance: float | None = None,
+) -> bool:
+    checker = build_output_checker(expected_output, check_mode, float_tolerance)
+    return checker.feed(actual_output) and checker.finish()
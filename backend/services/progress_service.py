@@ -0,0 +1,49 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from models.course import Course
+from models.task_result_record import TaskResultRecord
+from models.topic import Topic
+
+
+class StudentProgress(BaseModel):
+    points: int = 0
+    solved: int = 0
+    progress_percent: float = 0.0
+
+
+def build_progress(points: int, solved: int, total_points: int) -> StudentProgress:
+    return StudentProgress(
+        points=points,
+        solved=solved,
+        progress_percent=round(points / total_points * 100, 2) if total_points > 0 else 0.0,
+    )
+
+
+async def get_courses_progress(courses: List[Course], user_id: str) -> Dict[str, StudentProgress]:
+    """Progress of one student in each of ``courses``, keyed by course id."""
+    if not courses:
+        return {}
+    totals = await TaskResultRecord.summarize_by(
+        {"user_id": user_id, "course_id": {"$in": [str(course.id) for course in courses]}},
+        "course_id",
+    )
+    return {
+        str(course.id): build_progress(*totals.get(str(course.id), (0, 0)), course.total_points)
+        for course in courses
+    }
+
+
+async def get_topics_progress(topics: List[Topic], user_id: str) -> Dict[str, StudentProgress]:
+    """Progress of one student in each of ``topics``, keyed by lesson id."""
+    if not topics:
+        return {}
+    totals = await TaskResultRecord.summarize_by(
+        {"user_id": user_id, "topic_id": {"$in": [str(topic.id) for topic in topics]}},
+        "topic_id",
+    )
+    return {
+        str(topic.id): build_progress(*totals.get(str(topic.id), (0, 0)), topic.total_points)
+        for topic in topics
+    }
@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from models.rate_limit_counter import RateLimitCounter
+
+
+logger = logging.getLogger("rate_limit")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+
+
+class TokenBucketLimiter:
+    """Per-process token buckets, bounded in the number of keys they keep.
+
+    A bucket holds up to ``limit`` tokens and refills at ``limit`` per
+    ``window_seconds``. A bucket left alone for a whole window is full again,
+    so it is indistinguishable from a missing one and is dropped; the least
+    recently used buckets also go once ``max_keys`` is reached.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max(1, max_keys)
+        self.clock = clock
+        # key -> (tokens, updated_at, window_seconds), oldest update first.
+        self._buckets: OrderedDict[str, tuple[float, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(self, key: str, limit: int, window_seconds: int) -> bool:
+        return self.consume_now(key, limit, window_seconds)
+
+    def consume_now(self, key: str, limit: int, window_seconds: int) -> bool:
+        with self._lock:
+            now = self.clock()
+            self._evict_idle(now)
+            tokens = float(limit)
+            bucket = self._buckets.pop(key, None)
+            if bucket is not None:
+                stored, updated_at, _window = bucket
+                tokens = min(tokens, stored + (now - updated_at) * limit / window_seconds)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, window_seconds)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            _tokens, updated_at, window_seconds = next(iter(self._buckets.values()))
+            if now - updated_at < window_seconds:
+                return
+            self._buckets.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class MongoRateLimiter:
+    """Cluster-wide limiter on MongoDB counters, shared by every worker process.
+
+    Each key counts hits per fixed window with an atomic upsert, and the
+    previous window's count is weighted by how much of it still overlaps the
+    sliding window. Counters expire through a TTL index. If MongoDB is not
+    reachable the limit falls back to per-process token buckets.
+    """
+
+    def __init__(self, fallback: TokenBucketLimiter | None = None, clock: Callable[[], float] = time.time):
+        self.fallback = fallback or TokenBucketLimiter()
+        self.clock = clock
+
+    async def consume(self, key: str, limit: int, window_seconds: int) -> bool:
+        try:
+            return await self._consume(key, limit, window_seconds)
+        except Exception as exc:
+            logger.warning("Rate limit check failed, using local buckets: %s", exc)
+            return self.fallback.consume_now(key, limit, window_seconds)
+
+    async def _consume(self, key: str, limit: int, window_seconds: int) -> bool:
+        collection = RateLimitCounter.get_motor_collection()
+        now = self.clock()
+        window_start = int(now // window_seconds)
+        current = await self._increment(collection, key, window_start, window_seconds, 1)
+        previous = await collection.find_one({"key": key, "window_start": window_start - 1}, {"hits": 1})
+        overlap = 1 - (now % window_seconds) / window_seconds
+        estimate = current["hits"] + (previous["hits"] if previous else 0) * overlap
+        if estimate <= limit:
+            return True
+        # Rejected attempts do not use up the allowance.
+        await self._increment(collection, key, window_start, window_seconds, -1)
+        return False
+
+    @staticmethod
+    async def _increment(collection, key: str, window_start: int, window_seconds: int, amount: int) -> dict:
+        expires_at = datetime.utcnow() + timedelta(seconds=2 * window_seconds)
+        query = {"key": key, "window_start": window_start}
+        update = {"$inc": {"hits": amount}, "$setOnInsert": {"expires_at": expires_at}}
+        try:
+            return await collection.find_one_and_update(
+                query, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another worker inserted the same counter first; it exists now.
+            return await collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+
+    def clear(self) -> None:
+        self.fallback.clear()
+
+
+def build_rate_limiter(backend: str = RATE_LIMIT_BACKEND) -> TokenBucketLimiter | MongoRateLimiter:
+    if backend == "mongo":
+        return MongoRateLimiter()
+    if backend != "memory":
+        logger.warning("Unknown RATE_LIMIT_BACKEND %r, using memory", backend)
+    return TokenBucketLimiter()
+
+
+rate_limiter = build_rate_limiter()
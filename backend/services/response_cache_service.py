@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from models.cache_version import CacheVersion
+
+
+DASHBOARD_CACHE_SECONDS = int(os.getenv("DASHBOARD_CACHE_SECONDS", "15"))
+DASHBOARD_CACHE_MAX_KEYS = int(os.getenv("DASHBOARD_CACHE_MAX_KEYS", "5000"))
+
+
+def build_etag(payload: Any) -> str:
+    """Strong ETag of a JSON-compatible payload."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return '"%s"' % hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """Per-process cache of rendered payloads with their ETags.
+
+    Entries live for ``ttl_seconds`` and the least recently stored ones go
+    once ``max_keys`` is reached. A zero TTL turns caching off, the ETags are
+    still computed.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = DASHBOARD_CACHE_SECONDS,
+        max_keys: int = DASHBOARD_CACHE_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max(1, max_keys)
+        self.clock = clock
+        # key -> (stored_at, etag, payload), oldest first.
+        self._entries: OrderedDict[Hashable, Tuple[float, str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, etag, payload = entry
+            if self.clock() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            return etag, payload
+
+    def put(self, key: Hashable, payload: Any) -> str:
+        etag = build_etag(payload)
+        if self.ttl_seconds <= 0:
+            return etag
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock(), etag, payload)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        return etag
+
+    def discard(self, match: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if match(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Dashboard sections, keyed by (user_id, section, offset, limit, versions).
+dashboard_cache = ResponseCache()
+DASHBOARD_VERSION_KEY = "dashboard"
+
+
+def _dashboard_version_keys(user_ids: Iterable[str]) -> List[str]:
+    return [f"{DASHBOARD_VERSION_KEY}:{user_id}" for user_id in dict.fromkeys(str(item) for item in user_ids)]
+
+
+async def get_dashboard_versions(user_id: str) -> Tuple[int, int]:
+    """Versions of every dashboard and of ``user_id``'s own, read with one query.
+
+    They are part of the cache key, so a bump from any process makes the
+    sections cached before it unreachable here.
+    """
+    keys = [DASHBOARD_VERSION_KEY, *_dashboard_version_keys([user_id])]
+    cursor = CacheVersion.get_motor_collection().find({"key": {"$in": keys}}, {"key": 1, "version": 1})
+    versions = {item["key"]: item["version"] for item in await cursor.to_list(length=len(keys))}
+    return versions.get(keys[0], 0), versions.get(keys[1], 0)
+
+
+async def discard_dashboard_sections(*user_ids: str) -> None:
+    """Make cached dashboard sections stale in every process.
+
+    With ``user_ids`` only their dashboards change, e.g. after a submission;
+    without them every dashboard does, e.g. after a course, lesson, task,
+    group or enrollment was edited.
+    """
+    keys = _dashboard_version_keys(user_ids) or [DASHBOARD_VERSION_KEY]
+    collection = CacheVersion.get_motor_collection()
+    for key in keys:
+        try:
+            await collection.update_one({"key": key}, {"$inc": {"version": 1}}, upsert=True)
+        except DuplicateKeyError:
+            # Another request created the counter first; it exists now.
+            await collection.update_one({"key": key}, {"$inc": {"version": 1}})
+    # Entries of this process are unreachable now; drop them instead of waiting for the TTL.
+    if user_ids:
+        user_ids = {str(user_id) for user_id in user_ids}
+        dashboard_cache.discard(lambda key: key[0] in user_ids)
+    else:
+        dashboard_cache.clear()
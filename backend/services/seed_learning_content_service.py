@@ -8,6 +8,7 @@ from models.programming_language import normalize_programming_language
 from models.task import Task, TaskTestCase
 from models.topic import Topic
 from models.user import User
+from services.course_stats_service import rebuild_course_aggregates
 
 
 SEED_DEMO_LEARNING_CONTENT = os.getenv(
@@ -193,3 +194,4 @@ async def ensure_demo_learning_content() -> None:
             topic = await _ensure_topic(course, topic_payload)
             for task_payload in topic_payload.get("tasks", []):
                 await _ensure_task(topic, task_payload)
+        await rebuild_course_aggregates(course)
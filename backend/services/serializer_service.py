@@ -1,5 +1,6 @@
+import asyncio
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from models.achievement import Achievement
 from models.attendance import AttendanceSession
@@ -7,8 +8,10 @@ from models.course import Course
 from models.course_request import CourseRequest
 from models.group import Group
 from models.news_article import NewsArticle
+from models.output_check_mode import DEFAULT_FLOAT_TOLERANCE, OutputCheckMode
 from models.programming_language import normalize_programming_language
-from models.task import Task, TaskStatus, TaskSubmission, TaskTestRunResult
+from models.submission_job import SubmissionJob, SubmissionJobStatus
+from models.task import Task, TaskSubmission, TaskSubmissionRef, TaskTestRunResult
 from models.topic import Topic
 from models.user import User, UserType
 from schemas.responses import (
@@ -22,12 +25,14 @@ from schemas.responses import (
     GroupResponse,
     LinkedParentResponse,
     LeaderboardEntryResponse,
+    LeaderboardPageResponse,
     NewsArticleResponse,
     PendingTaskReviewResponse,
     CourseRequestResponse,
     StudentAdminResponse,
     StudentCourseAttendanceResponse,
     StudentCourseProgressResponse,
+    SubmissionJobResponse,
     TaskResponse,
     TaskResultResponse,
     TaskSubmissionResponse,
@@ -36,15 +41,32 @@ from schemas.responses import (
     TopicResponse,
     UserResponse,
 )
+from services.document_loader import load_document, load_documents
 from services.learning_service import (
-    can_edit_course,
+    collect_course_students,
+    collect_course_teachers,
     get_course_students,
-    get_course_teachers,
     get_groups_for_course,
+    get_groups_for_courses,
     get_student_group_assignments,
+    user_can_edit_course,
 )
-from services.billing_service import build_course_finance_snapshot
-from services.user_service import get_parents_for_student
+from services.billing_service import build_course_finance_snapshots
+from services.leaderboard_service import LEADERBOARD_PAGE_SIZE, get_leaderboard_page, get_leaderboard_rank
+from services.progress_service import (
+    StudentProgress,
+    build_progress,
+    get_courses_progress,
+    get_topics_progress,
+)
+from services.submission_history_service import load_submissions
+from services.submission_queue_service import get_queue_position
+from services.task_result_service import (
+    get_pending_review_results,
+    get_pending_review_page,
+    get_task_result,
+)
+from services.user_service import get_parents_for_student, get_users_by_ids
 
 
 WEEKDAY_LABELS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
@@ -102,30 +124,51 @@ def build_group_schedule_summary(group: Group) -> str:
     return " · ".join(parts)
 
 
-async def build_group_leaderboard(course: Course, group: Group) -> List[LeaderboardEntryResponse]:
-    leaderboard: List[LeaderboardEntryResponse] = []
-    for student_id in group.students:
-        user = await User.get(student_id)
-        if not user:
-            continue
-        leaderboard.append(
-            LeaderboardEntryResponse(
-                user_id=str(user.id),
-                name=user.name,
-                surname=user.surname,
-                tg_username=user.tg_username,
-                points=await course.get_user_points(str(user.id)),
-                progress_percent=await course.get_user_success_percent(str(user.id)),
-            )
+async def build_leaderboard_page(
+    course: Course,
+    member_ids: List[str],
+    offset: int = 0,
+    limit: Optional[int] = LEADERBOARD_PAGE_SIZE,
+    user: Optional[User] = None,
+) -> LeaderboardPageResponse:
+    """One page of the board of ``member_ids``; ``limit=None`` returns the whole board."""
+    page = get_leaderboard_page(str(course.id), member_ids, offset, limit)
+    if user:
+        (entries, total), my_rank = await asyncio.gather(
+            page,
+            get_leaderboard_rank(str(course.id), member_ids, str(user.id)),
+        )
+    else:
+        (entries, total), my_rank = await page, None
+    items = [
+        LeaderboardEntryResponse(
+            user_id=entry.user_id,
+            name=entry.name,
+            surname=entry.surname,
+            tg_username=entry.tg_username,
+            points=entry.points,
+            progress_percent=build_progress(entry.points, entry.solved, course.total_points).progress_percent,
+            rank=rank,
         )
-    leaderboard.sort(key=lambda item: (-item.points, item.surname, item.name))
-    return leaderboard
+        for rank, entry in enumerate(entries, start=offset + 1)
+    ]
+    return LeaderboardPageResponse(
+        items=items,
+        total=total,
+        offset=offset,
+        limit=total if limit is None else limit,
+        my_rank=my_rank,
+    )
+
+
+async def build_group_leaderboard(course: Course, group: Group) -> List[LeaderboardEntryResponse]:
+    return (await build_leaderboard_page(course, group.students, limit=None)).items
 
 
 async def serialize_group(group: Group, course: Optional[Course] = None) -> GroupResponse:
     current_topic_name = None
     if group.current_topic_id:
-        topic = await Topic.get(group.current_topic_id)
+        topic = await load_document(Topic, group.current_topic_id)
         if topic:
             current_topic_name = topic.name
     return GroupResponse(
@@ -139,37 +182,23 @@ async def serialize_group(group: Group, course: Optional[Course] = None) -> Grou
         start_date=group.start_date,
         current_topic_id=group.current_topic_id,
         current_topic_name=current_topic_name,
+        runner_weight=getattr(group, "runner_weight", 1.0),
         leaderboard=await build_group_leaderboard(course, group) if course else [],
         total_students=len(group.students),
     )
 
 
-async def serialize_course(course: Course, user: Optional[User] = None) -> CourseResponse:
-    total_tasks = await course.get_total_tasks()
-    total_students = len(await get_course_students(course))
-    total_points = await course.get_total_points()
-    earned_points = 0
-    progress_percent = 0.0
-    editable = False
-    teacher_ids = await get_course_teachers(course)
-    student_ids = await get_course_students(course)
-    active_group_id = None
-    active_group_name = None
-    active_group_schedule_summary = ""
-    finance = None
-    if user and user.user_type == UserType.STUDENT:
-        earned_points = await course.get_user_points(str(user.id))
-        progress_percent = await course.get_user_success_percent(str(user.id))
-    if user:
-        editable = await can_edit_course(user, course)
-        if user.user_type == UserType.STUDENT:
-            assignments = await get_student_group_assignments(str(user.id))
-            active_group = assignments.get(str(course.id))
-            if active_group:
-                active_group_id = str(active_group.id)
-                active_group_name = active_group.name
-                active_group_schedule_summary = build_group_schedule_summary(active_group)
-                finance = await build_course_finance_snapshot(str(user.id), course, active_group)
+def build_course_response(
+    course: Course,
+    user: Optional[User],
+    groups: List[Group],
+    progress: Optional[StudentProgress] = None,
+    active_group: Optional[Group] = None,
+    finance: Optional[dict] = None,
+) -> CourseResponse:
+    teacher_ids = collect_course_teachers(course, groups)
+    student_ids = collect_course_students(course, groups)
+    active_group_schedule_summary = build_group_schedule_summary(active_group) if active_group else ""
     return CourseResponse(
         id=str(course.id),
         name=course.name,
@@ -188,33 +217,66 @@ async def serialize_course(course: Course, user: Optional[User] = None) -> Cours
         schedule_start_time=course.schedule_start_time,
         schedule_end_time=course.schedule_end_time,
         schedule_summary=active_group_schedule_summary or build_schedule_summary(course),
-        active_group_id=active_group_id,
-        active_group_name=active_group_name,
+        active_group_id=str(active_group.id) if active_group else None,
+        active_group_name=active_group.name if active_group else None,
         active_group_schedule_summary=active_group_schedule_summary,
-        total_tasks=total_tasks,
-        total_students=total_students,
-        total_points=total_points,
-        progress_percent=progress_percent,
-        earned_points=earned_points,
-        can_edit=editable,
+        total_tasks=course.total_tasks,
+        total_students=len(student_ids),
+        total_points=course.total_points,
+        has_manual_review_tasks=course.has_manual_review_tasks,
+        progress_percent=progress.progress_percent if progress else 0.0,
+        earned_points=progress.points if progress else 0,
+        can_edit=user_can_edit_course(user, course, teacher_ids) if user else False,
         finance=finance,
     )
 
 
+async def serialize_course(course: Course, user: Optional[User] = None) -> CourseResponse:
+    return (await serialize_courses([course], user))[0]
+
+
+async def serialize_courses(courses: List[Course], user: Optional[User] = None) -> List[CourseResponse]:
+    """Serialize ``courses`` for ``user`` with a fixed number of queries, however many there are."""
+    course_groups = await get_groups_for_courses(courses)
+    progress = {}
+    assignments = {}
+    finances = {}
+    if user and user.user_type == UserType.STUDENT:
+        progress = await get_courses_progress(courses, str(user.id))
+        assignments = await get_student_group_assignments(str(user.id))
+        finances = await build_course_finance_snapshots(
+            str(user.id),
+            [(course, assignments[str(course.id)]) for course in courses if str(course.id) in assignments],
+        )
+    return [
+        build_course_response(
+            course,
+            user,
+            course_groups[str(course.id)],
+            progress=progress.get(str(course.id)),
+            active_group=assignments.get(str(course.id)),
+            finance=finances.get(str(course.id)),
+        )
+        for course in courses
+    ]
+
+
 async def serialize_topic(
     topic: Topic,
     user: Optional[User] = None,
     can_edit: bool = False,
     can_access: Optional[bool] = None,
+    progress: Optional[StudentProgress] = None,
 ) -> TopicResponse:
     total_tasks = await topic.get_total_tasks()
     total_points = await topic.get_total_points()
-    tasks = await Task.find(Task.topic_id == str(topic.id)).to_list()
     earned_points = 0
     progress_percent = 0.0
     if user:
-        earned_points = await topic.get_user_points(str(user.id))
-        progress_percent = await topic.get_user_success_percent(str(user.id))
+        if progress is None:
+            progress = (await get_topics_progress([topic], str(user.id)))[str(topic.id)]
+        earned_points = progress.points
+        progress_percent = progress.progress_percent
     access_allowed = can_edit if can_access is None else can_access
     return TopicResponse(
         id=str(topic.id),
@@ -230,7 +292,7 @@ async def serialize_topic(
         earned_points=earned_points,
         order=topic.order,
         is_open=topic.is_open,
-        has_manual_review_tasks=any(task.requires_manual_review for task in tasks),
+        has_manual_review_tasks=topic.has_manual_review_tasks,
         can_access=access_allowed,
         can_edit=can_edit,
     )
@@ -249,6 +311,8 @@ def serialize_test_run_result(
             stderr=item.stderr,
             passed=item.passed,
             is_public=is_public,
+            cpu_time_ms=getattr(item, "cpu_time_ms", None),
+            peak_memory_kb=getattr(item, "peak_memory_kb", None),
         )
 
     return TaskTestRunResultResponse(
@@ -258,29 +322,16 @@ def serialize_test_run_result(
         stderr=item.stderr,
         passed=item.passed,
         is_public=False,
+        cpu_time_ms=getattr(item, "cpu_time_ms", None),
+        peak_memory_kb=getattr(item, "peak_memory_kb", None),
     )
 
 
-def get_best_submission_from_history(result: object) -> Optional[TaskSubmission]:
-    best_submission = getattr(result, "best_submission", None)
-    if best_submission is not None:
-        return best_submission
-
-    history = list(getattr(result, "submission_history", []) or [])
-    if getattr(result, "last_submission", None) is not None:
-        history.append(result.last_submission)
-    if not history:
-        return None
-
-    def sort_key(item: TaskSubmission) -> tuple[int, int, int, datetime]:
-        return (
-            1 if item.passed else 0,
-            item.passed_tests,
-            item.total_tests,
-            item.created_at,
-        )
-
-    return max(history, key=sort_key)
+def get_ref_submission(
+    ref: Optional[TaskSubmissionRef],
+    submissions: Dict[str, TaskSubmission],
+) -> Optional[TaskSubmission]:
+    return submissions.get(ref.submission_id) if ref and ref.submission_id else None
 
 
 def serialize_submission(
@@ -309,11 +360,16 @@ def serialize_submission(
 
 async def build_pending_task_reviews(task: Task) -> List[PendingTaskReviewResponse]:
     pending_reviews: List[PendingTaskReviewResponse] = []
-    for result in task.results:
-        if result.status != TaskStatus.PENDING_REVIEW or not result.last_submission:
-            continue
-        student = await User.get(result.user_id)
-        if not student:
+    results = [result for result in await get_pending_review_results(str(task.id)) if result.last_submission]
+    student_list, submissions = await asyncio.gather(
+        get_users_by_ids(result.user_id for result in results),
+        load_submissions(result.last_submission for result in results),
+    )
+    students = {str(student.id): student for student in student_list}
+    for result in results:
+        student = students.get(result.user_id)
+        last_submission = get_ref_submission(result.last_submission, submissions)
+        if not student or not last_submission:
             continue
         pending_reviews.append(
             PendingTaskReviewResponse(
@@ -323,7 +379,7 @@ async def build_pending_task_reviews(task: Task) -> List[PendingTaskReviewRespon
                 tg_username=student.tg_username,
                 attempts=result.attempts,
                 review_comment=result.review_comment,
-                last_submission=serialize_submission(result.last_submission),
+                last_submission=serialize_submission(last_submission),
             )
         )
     pending_reviews.sort(
@@ -336,13 +392,9 @@ async def build_pending_task_reviews(task: Task) -> List[PendingTaskReviewRespon
 async def serialize_task(task: Task, user: Optional[User] = None, can_edit: bool = False) -> TaskResponse:
     result = None
     if user:
-        model_result = task.get_result_for_student(str(user.id))
+        model_result = await get_task_result(str(task.id), str(user.id))
         if model_result:
-            submission_history = []
-            for item in reversed(model_result.submission_history):
-                serialized_submission = serialize_submission(item, include_hidden_details=can_edit)
-                if serialized_submission is not None:
-                    submission_history.append(serialized_submission)
+            submissions = await load_submissions([model_result.last_submission, model_result.best_submission])
             result = TaskResultResponse(
                 user_id=model_result.user_id,
                 score=model_result.score,
@@ -352,14 +404,13 @@ async def serialize_task(task: Task, user: Optional[User] = None, can_edit: bool
                 reviewed_at=model_result.reviewed_at,
                 review_comment=model_result.review_comment,
                 last_submission=serialize_submission(
-                    model_result.last_submission,
+                    get_ref_submission(model_result.last_submission, submissions),
                     include_hidden_details=can_edit,
                 ),
                 best_submission=serialize_submission(
-                    get_best_submission_from_history(model_result),
+                    get_ref_submission(model_result.best_submission, submissions),
                     include_hidden_details=can_edit,
                 ),
-                submission_history=submission_history,
             )
 
     tests = None
@@ -396,12 +447,37 @@ async def serialize_task(task: Task, user: Optional[User] = None, can_edit: bool
         requires_manual_review=task.requires_manual_review,
         public_examples=public_examples,
         tests=tests,
+        check_mode=getattr(task, "check_mode", OutputCheckMode.EXACT),
+        float_tolerance=getattr(task, "float_tolerance", DEFAULT_FLOAT_TOLERANCE),
         order=task.order,
         result=result,
         pending_reviews=pending_reviews,
     )
 
 
+async def serialize_submission_job(job: SubmissionJob, user: User) -> SubmissionJobResponse:
+    task_response = None
+    if job.status == SubmissionJobStatus.DONE:
+        task = await load_document(Task, job.task_id)
+        if task:
+            task_response = await serialize_task(task, user, can_edit=False)
+            achievements = await load_documents(Achievement, job.newly_unlocked_achievement_ids)
+            task_response.newly_unlocked_achievements = [
+                serialize_achievement_notice(item) for item in achievements
+            ]
+    return SubmissionJobResponse(
+        id=str(job.id),
+        task_id=job.task_id,
+        status=job.status,
+        queue_position=await get_queue_position(job),
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        task=task_response,
+    )
+
+
 def serialize_achievement(
     achievement: Achievement,
     user: User,
@@ -445,71 +521,63 @@ def serialize_achievement_notice(achievement: Achievement) -> AchievementNoticeR
 
 
 async def build_leaderboard(course: Course) -> List[LeaderboardEntryResponse]:
-    leaderboard: List[LeaderboardEntryResponse] = []
-    student_ids = await get_course_students(course)
-    for student_id in student_ids:
-        user = await User.get(student_id)
-        if not user:
-            continue
-        leaderboard.append(
-            LeaderboardEntryResponse(
-                user_id=str(user.id),
-                name=user.name,
-                surname=user.surname,
-                tg_username=user.tg_username,
-                points=await course.get_user_points(str(user.id)),
-                progress_percent=await course.get_user_success_percent(str(user.id)),
-            )
-        )
-    leaderboard.sort(key=lambda item: (-item.points, item.surname, item.name))
-    return leaderboard
+    return (await build_leaderboard_page(course, await get_course_students(course), limit=None)).items
 
 
 async def build_dashboard_pending_reviews(
     user: User,
     courses: List[Course],
-) -> List[DashboardPendingReviewResponse]:
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[DashboardPendingReviewResponse], int]:
+    """Newest-first page of the submissions awaiting review in the courses ``user`` edits, and their total."""
     if user.user_type not in {UserType.TEACHER, UserType.ADMIN}:
-        return []
+        return [], 0
+
+    course_groups = await get_groups_for_courses(courses)
+    editable_courses = {
+        str(course.id): course
+        for course in courses
+        if user_can_edit_course(user, course, collect_course_teachers(course, course_groups[str(course.id)]))
+    }
+    results, total = await get_pending_review_page(editable_courses, offset, limit)
+    topic_list, task_list, student_list, submissions = await asyncio.gather(
+        load_documents(Topic, [result.topic_id for result in results]),
+        load_documents(Task, [result.task_id for result in results]),
+        get_users_by_ids(result.user_id for result in results),
+        load_submissions(result.last_submission for result in results),
+    )
+    topics = {str(topic.id): topic for topic in topic_list}
+    tasks = {str(task.id): task for task in task_list}
+    students = {str(student.id): student for student in student_list}
 
     pending_reviews: List[DashboardPendingReviewResponse] = []
-    for course in courses:
-        if not await can_edit_course(user, course):
+    for result in results:
+        course = editable_courses.get(result.course_id)
+        topic = topics.get(result.topic_id)
+        task = tasks.get(result.task_id)
+        student = students.get(result.user_id)
+        last_submission = get_ref_submission(result.last_submission, submissions)
+        if not course or not topic or not task or not student or not last_submission:
             continue
-
-        topics = await Topic.find(Topic.course_id == str(course.id)).to_list()
-        for topic in topics:
-            tasks = await Task.find(Task.topic_id == str(topic.id)).to_list()
-            for task in tasks:
-                for result in task.results:
-                    if result.status != TaskStatus.PENDING_REVIEW or not result.last_submission:
-                        continue
-                    student = await User.get(result.user_id)
-                    if not student:
-                        continue
-                    pending_reviews.append(
-                        DashboardPendingReviewResponse(
-                            course_id=str(course.id),
-                            course_name=course.name,
-                            lesson_id=str(topic.id),
-                            lesson_name=topic.name,
-                            task_id=str(task.id),
-                            task_title=task.title,
-                            student_user_id=str(student.id),
-                            student_name=student.name,
-                            student_surname=student.surname,
-                            student_tg_username=student.tg_username,
-                            attempts=result.attempts,
-                            review_comment=result.review_comment,
-                            last_submission=serialize_submission(result.last_submission),
-                        )
-                    )
-
-    pending_reviews.sort(
-        key=lambda item: item.last_submission.created_at if item.last_submission else datetime.min,
-        reverse=True,
-    )
-    return pending_reviews
+        pending_reviews.append(
+            DashboardPendingReviewResponse(
+                course_id=str(course.id),
+                course_name=course.name,
+                lesson_id=str(topic.id),
+                lesson_name=topic.name,
+                task_id=str(task.id),
+                task_title=task.title,
+                student_user_id=str(student.id),
+                student_name=student.name,
+                student_surname=student.surname,
+                student_tg_username=student.tg_username,
+                attempts=result.attempts,
+                review_comment=result.review_comment,
+                last_submission=serialize_submission(last_submission),
+            )
+        )
+    return pending_reviews, total
 
 
 async def serialize_course_option(course: Course) -> CourseOptionResponse:
@@ -592,11 +660,16 @@ async def serialize_student_admin(student: User, courses: List[Course]) -> Stude
     course_group_ids = {course_id: str(group.id) for course_id, group in assignments.items()}
     course_group_names = {course_id: group.name for course_id, group in assignments.items()}
     parents = await get_parents_for_student(str(student.id))
+    progress = await get_courses_progress(courses, str(student.id))
+    finances = await build_course_finance_snapshots(
+        str(student.id),
+        [(course, assignments.get(str(course.id))) for course in courses],
+    )
 
     for course in courses:
         course_id = str(course.id)
         course_total_points = await course.get_total_points()
-        course_earned_points = await course.get_user_points(str(student.id))
+        course_earned_points = progress[course_id].points
         total_points += course_total_points
         earned_points += course_earned_points
         course_progress.append(
@@ -610,11 +683,7 @@ async def serialize_student_admin(student: User, courses: List[Course]) -> Stude
                 progress_percent=round(course_earned_points / course_total_points * 100, 2)
                 if course_total_points
                 else 0.0,
-                finance=await build_course_finance_snapshot(
-                    str(student.id),
-                    course,
-                    assignments.get(course_id),
-                ),
+                finance=finances[course_id],
                 attendance=await build_student_course_attendance_snapshot(
                     str(student.id),
                     course_id,
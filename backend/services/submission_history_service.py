@@ -0,0 +1,90 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import ReplaceOne
+
+from models.submission_record import SubmissionRecord
+from models.task import Task, TaskSubmission, TaskSubmissionRef
+from services.document_loader import load_documents
+
+
+logger = logging.getLogger("submission_history")
+SUBMISSION_PAGE_SIZE = 20
+MIGRATION_BATCH_SIZE = 50
+
+
+async def store_submission(task_id: str, user_id: str, submission: TaskSubmission) -> str:
+    """Insert ``submission`` into the history and return its id."""
+    record = await SubmissionRecord(task_id=task_id, user_id=user_id, **submission.model_dump()).insert()
+    return str(record.id)
+
+
+async def mark_submission_reviewed(submission_id: Optional[str], comment: Optional[str]) -> None:
+    """Copy a manual review onto the stored submission it was made for."""
+    if not submission_id:
+        return
+    await SubmissionRecord.get_motor_collection().update_one(
+        {"_id": PydanticObjectId(submission_id)},
+        {"$set": {"waiting_manual_review": False, "review_comment": comment}},
+    )
+
+
+async def load_submissions(refs: Iterable[Optional[TaskSubmissionRef]]) -> Dict[str, TaskSubmission]:
+    """Stored submissions behind ``refs`` by id, read with one query."""
+    submission_ids = [ref.submission_id for ref in refs if ref is not None and ref.submission_id]
+    records = await load_documents(SubmissionRecord, submission_ids)
+    return {str(record.id): record.to_submission() for record in records}
+
+
+async def get_submission_page(
+    task_id: str,
+    user_id: str,
+    offset: int = 0,
+    limit: int = SUBMISSION_PAGE_SIZE,
+) -> Tuple[List[TaskSubmission], int]:
+    """Newest-first page of a student's submissions and their total count."""
+    query = SubmissionRecord.find(
+        SubmissionRecord.task_id == task_id,
+        SubmissionRecord.user_id == user_id,
+    )
+    total = await query.count()
+    records = await query.sort(-SubmissionRecord.created_at).skip(offset).limit(limit).to_list()
+    return [record.to_submission() for record in records], total
+
+
+async def migrate_embedded_submission_history(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Move ``results[*].submission_history`` of every task into ``submissions``.
+
+    Records are upserted by (task_id, user_id, created_at), so a migration that
+    stopped halfway can simply be run again. Returns the number of moved
+    submissions.
+    """
+    tasks = Task.get_motor_collection()
+    records = SubmissionRecord.get_motor_collection()
+    moved = 0
+    cursor = tasks.find(
+        {"results.submission_history.0": {"$exists": True}},
+        {"results.user_id": 1, "results.submission_history": 1},
+        batch_size=batch_size,
+    )
+    async for raw_task in cursor:
+        task_id = str(raw_task["_id"])
+        operations = []
+        for raw_result in raw_task.get("results", []):
+            for raw_submission in raw_result.get("submission_history", []):
+                record = TaskSubmission.model_validate(raw_submission).model_dump()
+                record.update(task_id=task_id, user_id=raw_result["user_id"])
+                operations.append(
+                    ReplaceOne(
+                        {"task_id": task_id, "user_id": record["user_id"], "created_at": record["created_at"]},
+                        record,
+                        upsert=True,
+                    )
+                )
+        if operations:
+            await records.bulk_write(operations, ordered=False)
+        await tasks.update_one({"_id": raw_task["_id"]}, {"$set": {"results.$[].submission_history": []}})
+        moved += len(operations)
+        logger.info("Moved %s submissions of task %s", len(operations), task_id)
+    return moved
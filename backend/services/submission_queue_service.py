@@ -0,0 +1,130 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from models.submission_job import SubmissionJob, SubmissionJobStatus
+
+
+SUBMISSION_QUEUE_ENABLED = os.getenv("TASK_SUBMIT_QUEUE_ENABLED", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+QUEUE_LEASE_SECONDS = int(os.getenv("SUBMISSION_QUEUE_LEASE_SECONDS", "60"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("SUBMISSION_QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_HEARTBEAT_SECONDS = max(1, QUEUE_LEASE_SECONDS // 3)
+
+
+async def enqueue_submission(task_id: str, user_id: str, code: str) -> SubmissionJob:
+    job = SubmissionJob(task_id=task_id, user_id=user_id, code=code)
+    await job.insert()
+    return job
+
+
+async def claim_next_submission(worker_id: str) -> Optional[SubmissionJob]:
+    """Atomically lease the oldest runnable job to ``worker_id``.
+
+    Jobs whose lease expired (the worker died mid-run) are picked up again
+    until they reach ``QUEUE_MAX_ATTEMPTS``.
+    """
+    collection = SubmissionJob.get_motor_collection()
+    while True:
+        now = datetime.utcnow()
+        raw = await collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": SubmissionJobStatus.QUEUED.value},
+                    {
+                        "status": SubmissionJobStatus.RUNNING.value,
+                        "lease_expires_at": {"$lt": now},
+                    },
+                ]
+            },
+            {
+                "$set": {
+                    "status": SubmissionJobStatus.RUNNING.value,
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "lease_expires_at": now + timedelta(seconds=QUEUE_LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if raw is None:
+            return None
+
+        job = SubmissionJob.model_validate(raw)
+        if job.attempts <= QUEUE_MAX_ATTEMPTS:
+            return job
+        await fail_submission(job, "Проверка решения не завершилась, попробуйте отправить его снова")
+
+
+async def renew_submission_lease(job: SubmissionJob) -> bool:
+    """Extend the lease of a running job; False once another worker has taken it over."""
+    lease_expires_at = datetime.utcnow() + timedelta(seconds=QUEUE_LEASE_SECONDS)
+    update = await SubmissionJob.get_motor_collection().update_one(
+        {"_id": job.id, "worker_id": job.worker_id, "status": SubmissionJobStatus.RUNNING.value},
+        {"$set": {"lease_expires_at": lease_expires_at}},
+    )
+    if update.matched_count == 0:
+        return False
+    job.lease_expires_at = lease_expires_at
+    return True
+
+
+async def complete_submission(job: SubmissionJob, newly_unlocked_achievement_ids: List[str]) -> bool:
+    update = await SubmissionJob.get_motor_collection().update_one(
+        {"_id": job.id, "worker_id": job.worker_id},
+        {
+            "$set": {
+                "status": SubmissionJobStatus.DONE.value,
+                "newly_unlocked_achievement_ids": newly_unlocked_achievement_ids,
+                "lease_expires_at": None,
+                "finished_at": datetime.utcnow(),
+            }
+        },
+    )
+    return update.matched_count == 1
+
+
+async def fail_submission(job: SubmissionJob, error: str) -> None:
+    await SubmissionJob.get_motor_collection().update_one(
+        {"_id": job.id, "worker_id": job.worker_id},
+        {
+            "$set": {
+                "status": SubmissionJobStatus.FAILED.value,
+                "error": error,
+                "lease_expires_at": None,
+                "finished_at": datetime.utcnow(),
+            }
+        },
+    )
+
+
+async def get_queue_position(job: SubmissionJob) -> int:
+    if job.status != SubmissionJobStatus.QUEUED:
+        return 0
+    ahead = await SubmissionJob.find(
+        SubmissionJob.status == SubmissionJobStatus.QUEUED,
+        SubmissionJob.created_at < job.created_at,
+    ).count()
+    return ahead + 1
+
+
+async def get_queue_stats() -> Dict[str, object]:
+    counts = {status.value: 0 for status in SubmissionJobStatus}
+    pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    async for row in SubmissionJob.get_motor_collection().aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+
+    oldest = await SubmissionJob.find(
+        SubmissionJob.status == SubmissionJobStatus.QUEUED,
+    ).sort("+created_at").first_or_none()
+    oldest_wait_seconds = (
+        round((datetime.utcnow() - oldest.created_at).total_seconds(), 2) if oldest else 0.0
+    )
+    return {**counts, "oldest_queued_seconds": oldest_wait_seconds}
@@ -1,70 +1,374 @@
 import asyncio
 import os
 import time
-from collections import defaultdict, deque
-from typing import Awaitable, Callable, TypeVar
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, TypeVar
 
 from fastapi import HTTPException
 
+from services.code_runner_service import CPU_COUNT, POOL_SIZE
+from services.rate_limit_service import rate_limiter
+
 
 RUN_CONCURRENCY = int(os.getenv("TASK_RUN_CONCURRENCY", "2"))
+RUN_CONCURRENCY_ADAPTIVE = os.getenv("TASK_RUN_CONCURRENCY_ADAPTIVE", "true").lower() in {"1", "true", "yes"}
+RUN_CONCURRENCY_MIN = int(os.getenv("TASK_RUN_CONCURRENCY_MIN", "1"))
+# Runs beyond the warm pool would only wait for a worker inside the thread.
+# The pool is sized from CPU_COUNT; its parallel slots stay free for fan-out.
+RUN_CONCURRENCY_MAX = int(
+    os.getenv(
+        "TASK_RUN_CONCURRENCY_MAX",
+        str(max(RUN_CONCURRENCY, POOL_SIZE if POOL_SIZE > 0 else CPU_COUNT)),
+    )
+)
+SUBMIT_RESERVED_SLOTS = int(os.getenv("TASK_SUBMIT_RESERVED_SLOTS", "1"))
+RUN_LOAD_THRESHOLD = float(os.getenv("TASK_RUN_LOAD_THRESHOLD", "1.0"))
+RUN_LATENCY_TOLERANCE = float(os.getenv("TASK_RUN_LATENCY_TOLERANCE", "2.0"))
+RUN_ROLE_WEIGHTS = {
+    role.strip(): float(weight)
+    for role, weight in (
+        item.split(":", 1)
+        for item in os.getenv("TASK_RUN_ROLE_WEIGHTS", "student:1,teacher:2,admin:2").split(",")
+        if ":" in item
+    )
+}
+QUEUE_POSITION_POLL_SECONDS = float(os.getenv("TASK_QUEUE_POSITION_POLL_SECONDS", "0.5"))
+RUN_DECREASE_FACTOR = 0.75
+LATENCY_SMOOTHING = 0.2
+BASELINE_DRIFT = 1.01
 RUN_WINDOW_SECONDS = int(os.getenv("TASK_RUN_RATE_WINDOW_SECONDS", "30"))
 RUN_WINDOW_LIMIT = int(os.getenv("TASK_RUN_RATE_LIMIT", "12"))
 SUBMIT_WINDOW_SECONDS = int(os.getenv("TASK_SUBMIT_RATE_WINDOW_SECONDS", "30"))
 SUBMIT_WINDOW_LIMIT = int(os.getenv("TASK_SUBMIT_RATE_LIMIT", "6"))
 
-_runner_semaphore = asyncio.Semaphore(RUN_CONCURRENCY)
-_run_timestamps: dict[str, deque[float]] = defaultdict(deque)
-_submit_timestamps: dict[str, deque[float]] = defaultdict(deque)
-_rate_lock = asyncio.Lock()
+SUBMIT_LANE = "submit"
+RUN_LANE = "run"
+LANES = (SUBMIT_LANE, RUN_LANE)
 
 T = TypeVar("T")
+P = TypeVar("P")
+
+
+def get_host_load() -> float:
+    """One-minute load average per CPU, or 0 where it is unavailable."""
+    if not hasattr(os, "getloadavg"):
+        return 0.0
+    try:
+        return os.getloadavg()[0] / CPU_COUNT
+    except OSError:
+        return 0.0
+
+
+class RunnerTicket:
+    """A place in a lane; ``future`` resolves once the run is admitted."""
+
+    __slots__ = ("lane", "owner", "start", "tag", "sequence", "future")
+
+    def __init__(
+        self,
+        lane: str,
+        owner: str,
+        start: float,
+        tag: float,
+        sequence: int,
+        future: asyncio.Future,
+    ) -> None:
+        self.lane = lane
+        self.owner = owner
+        self.start = start
+        self.tag = tag
+        self.sequence = sequence
+        self.future = future
+
+    @property
+    def admitted(self) -> bool:
+        return self.future.done() and not self.future.cancelled()
+
+
+class RunnerScheduler:
+    """Admit code runs into an adaptive number of slots with two priority lanes.
+
+    Graded submissions (``SUBMIT_LANE``) are always admitted before scratch
+    runs (``RUN_LANE``), and scratch runs never take the last
+    ``reserved_for_submit`` slots, so a class pressing "run" cannot starve
+    submissions. The slot count follows AIMD: it grows by ``1 / limit`` per
+    finished run and shrinks by ``RUN_DECREASE_FACTOR`` when the host load
+    per CPU or the smoothed run latency (against the best one seen) is too
+    high.
+
+    Within a lane, waiting runs are ordered by weighted fair queuing over
+    their owners: each run is tagged with its owner's previous tag (or the
+    lane's virtual time, if later) plus ``1 / weight``, and the smallest tag
+    goes first. A student queueing ten runs therefore waits behind one run
+    of every other student instead of in front of them.
+    """
+
+    def __init__(
+        self,
+        initial: int = RUN_CONCURRENCY,
+        minimum: int = RUN_CONCURRENCY_MIN,
+        maximum: int = RUN_CONCURRENCY_MAX,
+        reserved_for_submit: int = SUBMIT_RESERVED_SLOTS,
+        adaptive: bool = RUN_CONCURRENCY_ADAPTIVE,
+        load_probe: Callable[[], float] = get_host_load,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.reserved_for_submit = max(0, reserved_for_submit)
+        self.adaptive = adaptive
+        self.load_probe = load_probe
+        self.active: Dict[str, int] = {lane: 0 for lane in LANES}
+        self.waiters: Dict[str, List[RunnerTicket]] = {lane: [] for lane in LANES}
+        self.virtual_time: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self.owner_tags: Dict[str, Dict[str, float]] = {lane: {} for lane in LANES}
+        self.sequence = 0
+        self.latency_ewma: float | None = None
+        self.latency_baseline: float | None = None
+        self.last_decrease_at = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return int(self.limit)
+
+    def can_start(self, lane: str) -> bool:
+        running = sum(self.active.values())
+        if running >= self.capacity:
+            return False
+        if lane == RUN_LANE:
+            if self.waiters[SUBMIT_LANE]:
+                return False
+            return self.active[RUN_LANE] < max(1, self.capacity - self.reserved_for_submit)
+        return True
+
+    def enqueue(self, lane: str, owner: str = "", weight: float = 1.0) -> RunnerTicket:
+        """Take a place in ``lane``; the ticket is admitted at once if a slot is free."""
+        owner_tags = self.owner_tags[lane]
+        start = max(self.virtual_time[lane], owner_tags.get(owner, 0.0))
+        tag = start + 1 / max(weight, 0.01)
+        owner_tags[owner] = tag
+        self.sequence += 1
+        ticket = RunnerTicket(lane, owner, start, tag, self.sequence, asyncio.get_running_loop().create_future())
+        if not self.waiters[lane] and self.can_start(lane):
+            self.admit(ticket)
+        else:
+            self.waiters[lane].append(ticket)
+        return ticket
+
+    def admit(self, ticket: RunnerTicket) -> None:
+        lane = ticket.lane
+        self.active[lane] += 1
+        self.virtual_time[lane] = max(self.virtual_time[lane], ticket.start)
+        # Owners whose tags the virtual time has passed start from it again anyway.
+        owner_tags = self.owner_tags[lane]
+        for owner in [key for key, tag in owner_tags.items() if tag <= self.virtual_time[lane]]:
+            del owner_tags[owner]
+        ticket.future.set_result(None)
+
+    async def wait_turn(self, ticket: RunnerTicket) -> None:
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            self.withdraw(ticket)
+            raise
+
+    def withdraw(self, ticket: RunnerTicket) -> None:
+        """Give up a ticket, releasing its slot if it was already admitted."""
+        if ticket.admitted:
+            self.release(ticket.lane)
+            return
+        ticket.future.cancel()
+        if ticket in self.waiters[ticket.lane]:
+            self.waiters[ticket.lane].remove(ticket)
+            self.wake_waiters()
+
+    async def acquire(self, lane: str, owner: str = "", weight: float = 1.0) -> RunnerTicket:
+        ticket = self.enqueue(lane, owner, weight)
+        await self.wait_turn(ticket)
+        return ticket
+
+    def release(self, lane: str, latency: float | None = None) -> None:
+        self.active[lane] -= 1
+        if latency is not None:
+            self.observe(latency)
+        self.wake_waiters()
+
+    def next_ticket(self, lane: str) -> RunnerTicket | None:
+        queue = self.waiters[lane]
+        if not queue:
+            return None
+        return min(queue, key=lambda item: (item.tag, item.sequence))
+
+    def wake_waiters(self) -> None:
+        woken = True
+        while woken:
+            woken = False
+            for lane in LANES:
+                ticket = self.next_ticket(lane)
+                if ticket is not None and self.can_start(lane):
+                    self.waiters[lane].remove(ticket)
+                    self.admit(ticket)
+                    woken = True
+                    break
+
+    def position(self, ticket: RunnerTicket) -> int:
+        """1-based place of a waiting ticket among all runs it waits behind, 0 once admitted."""
+        if ticket not in self.waiters[ticket.lane]:
+            return 0
+        ahead = sum(
+            (item.tag, item.sequence) < (ticket.tag, ticket.sequence)
+            for item in self.waiters[ticket.lane]
+        )
+        if ticket.lane == RUN_LANE:
+            ahead += len(self.waiters[SUBMIT_LANE])
+        return ahead + 1
+
+    def observe(self, latency: float) -> None:
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += (latency - self.latency_ewma) * LATENCY_SMOOTHING
+        # The baseline creeps up so a slower mix of tasks is not read as overload forever.
+        self.latency_baseline = min(
+            self.latency_ewma,
+            (self.latency_baseline or self.latency_ewma) * BASELINE_DRIFT,
+        )
+        if not self.adaptive:
+            return
+
+        now = time.monotonic()
+        overloaded = (
+            self.load_probe() > RUN_LOAD_THRESHOLD
+            or self.latency_ewma > self.latency_baseline * RUN_LATENCY_TOLERANCE
+        )
+        if overloaded:
+            # One decrease per smoothed run, so a burst of slow runs counts once.
+            if now - self.last_decrease_at >= self.latency_ewma:
+                self.limit = max(float(self.minimum), self.limit * RUN_DECREASE_FACTOR)
+                self.last_decrease_at = now
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+    @asynccontextmanager
+    async def slot(self, lane: str, owner: str = "", weight: float = 1.0) -> AsyncIterator[None]:
+        await self.acquire(lane, owner, weight)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(lane, time.monotonic() - started_at)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.capacity,
+            "active": dict(self.active),
+            "waiting": {lane: len(queue) for lane, queue in self.waiters.items()},
+            "waiting_owners": len({item.owner for queue in self.waiters.values() for item in queue}),
+            "latency_seconds": round(self.latency_ewma or 0.0, 3),
+            "host_load": round(self.load_probe(), 2),
+        }
+
+
+runner_scheduler = RunnerScheduler()
+
+
+def get_runner_stats() -> dict:
+    return runner_scheduler.stats()
+
+
+def get_runner_weight(role: str, group_weight: float = 1.0) -> float:
+    """Fair-share weight of a run: the owner's role weight times their group weight."""
+    return RUN_ROLE_WEIGHTS.get(role, 1.0) * group_weight
+
+
+async def run_in_runner_slot(
+    action: Callable[[], T],
+    lane: str = SUBMIT_LANE,
+    owner: str = "",
+    weight: float = 1.0,
+) -> T:
+    async with runner_scheduler.slot(lane, owner, weight):
+        return await asyncio.to_thread(action)
 
 
 async def _consume_rate_limit(
-    bucket: dict[str, deque[float]],
+    scope: str,
     key: str,
     limit: int,
     window_seconds: int,
     error_detail: str,
 ) -> None:
-    now = time.monotonic()
-    async with _rate_lock:
-        history = bucket[key]
-        while history and now - history[0] > window_seconds:
-            history.popleft()
-        if len(history) >= limit:
-            raise HTTPException(status_code=429, detail=error_detail)
-        history.append(now)
-
-
-async def run_code_with_queue(
-    user_id: str,
-    task_id: str,
-    action: Callable[[], T],
-) -> T:
+    if not await rate_limiter.consume(f"{scope}:{key}", limit, window_seconds):
+        raise HTTPException(status_code=429, detail=error_detail)
+
+
+async def consume_run_rate_limit(user_id: str, task_id: str) -> None:
     await _consume_rate_limit(
-        _run_timestamps,
+        RUN_LANE,
         f"{user_id}:{task_id}",
         RUN_WINDOW_LIMIT,
         RUN_WINDOW_SECONDS,
         "Слишком много запусков подряд. Подождите немного и попробуйте снова.",
     )
-    async with _runner_semaphore:
-        return await asyncio.to_thread(action)
 
 
-async def submit_code_with_queue(
-    user_id: str,
-    task_id: str,
-    action: Callable[[], T],
-) -> T:
+async def consume_submit_rate_limit(user_id: str, task_id: str) -> None:
     await _consume_rate_limit(
-        _submit_timestamps,
+        SUBMIT_LANE,
         f"{user_id}:{task_id}",
         SUBMIT_WINDOW_LIMIT,
         SUBMIT_WINDOW_SECONDS,
         "Слишком много отправок подряд. Подождите немного и отправьте решение еще раз.",
     )
-    async with _runner_semaphore:
-        return await asyncio.to_thread(action)
+
+
+async def stream_code_with_queue(
+    action: Callable[[Callable[[P], None]], T],
+    owner: str = "",
+    weight: float = 1.0,
+) -> AsyncIterator[tuple[str, P | T | int]]:
+    """Run ``action`` in a runner slot and yield its progress while it runs.
+
+    While the run waits for a slot, its queue position is yielded as
+    ``("queue", position)`` whenever it changes. ``action`` gets a callback
+    it may call from the worker thread. Every call is yielded as
+    ``("progress", item)``, then ``("result", value)`` follows. The caller is
+    expected to have consumed the rate limit already.
+    """
+    loop = asyncio.get_running_loop()
+    progress: asyncio.Queue = asyncio.Queue()
+
+    def report(item: P) -> None:
+        loop.call_soon_threadsafe(progress.put_nowait, item)
+
+    ticket = runner_scheduler.enqueue(SUBMIT_LANE, owner, weight)
+    try:
+        last_position = 0
+        while not ticket.future.done():
+            position = runner_scheduler.position(ticket)
+            if position != last_position:
+                last_position = position
+                yield "queue", position
+            await asyncio.wait({ticket.future}, timeout=QUEUE_POSITION_POLL_SECONDS)
+        await runner_scheduler.wait_turn(ticket)
+    except BaseException:
+        runner_scheduler.withdraw(ticket)
+        raise
+
+    started_at = time.monotonic()
+    run = asyncio.ensure_future(asyncio.to_thread(action, report))
+    try:
+        while not run.done():
+            next_item = asyncio.ensure_future(progress.get())
+            await asyncio.wait({next_item, run}, return_when=asyncio.FIRST_COMPLETED)
+            if next_item.done():
+                yield "progress", next_item.result()
+            else:
+                next_item.cancel()
+        while not progress.empty():
+            yield "progress", progress.get_nowait()
+        yield "result", run.result()
+    finally:
+        if not run.done():
+            await asyncio.shield(run)
+        runner_scheduler.release(SUBMIT_LANE, time.monotonic() - started_at)
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from models.submission_record import SubmissionRecord
+from models.task import EmbeddedTaskResult, Task, TaskStatus, TaskSubmission, TaskSubmissionRef
+from models.task_result_record import TaskResultRecord
+from models.topic import Topic
+from models.user import User
+from services.document_loader import load_document
+from services.leaderboard_service import rebuild_course_leaderboard, record_score_change
+from services.submission_history_service import migrate_embedded_submission_history
+
+
+logger = logging.getLogger("task_results")
+MIGRATION_BATCH_SIZE = 50
+RESULT_WRITE_ATTEMPTS = int(os.getenv("TASK_RESULT_WRITE_ATTEMPTS", "5"))
+REVIEW_PAGE_SIZE = 20
+RESULT_STATE_FIELDS = {
+    "score",
+    "status",
+    "attempts",
+    "solved_at",
+    "reviewed_at",
+    "review_comment",
+    "last_submission",
+    "best_submission",
+}
+
+T = TypeVar("T")
+
+
+async def get_task_result(task_id: str, user_id: str) -> Optional[TaskResultRecord]:
+    return await TaskResultRecord.find_one(
+        TaskResultRecord.task_id == task_id,
+        TaskResultRecord.user_id == user_id,
+    )
+
+
+async def get_or_create_task_result(task: Task, course_id: str, user_id: str) -> TaskResultRecord:
+    existing = await get_task_result(str(task.id), user_id)
+    if existing:
+        return existing
+    return TaskResultRecord(
+        user_id=user_id,
+        task_id=str(task.id),
+        course_id=course_id,
+        topic_id=task.topic_id,
+    )
+
+
+async def save_task_result(result: TaskResultRecord) -> bool:
+    """Write ``result`` unless someone else changed it since it was read.
+
+    Only the result state is ``$set``, guarded by ``version``. Returns False
+    on a conflict, leaving ``result`` stale.
+    """
+    if result.id is None:
+        result.version = 1
+        try:
+            await result.insert()
+        except DuplicateKeyError:
+            result.id = None
+            return False
+        return True
+
+    # Records migrated before versioning have no version field yet.
+    version_filter = result.version if result.version else {"$in": [0, None]}
+    update = await TaskResultRecord.get_motor_collection().update_one(
+        {"_id": result.id, "version": version_filter},
+        {
+            "$set": result.model_dump(include=RESULT_STATE_FIELDS),
+            "$inc": {"version": 1},
+        },
+    )
+    if update.matched_count == 0:
+        return False
+    result.version += 1
+    return True
+
+
+async def update_task_result(
+    task: Task,
+    course_id: str,
+    user_id: str,
+    change: Callable[[TaskResultRecord], T],
+) -> Tuple[TaskResultRecord, T]:
+    """Apply ``change`` to a fresh copy of the result until it is saved without a conflict.
+
+    ``change`` may run more than once, so it must only touch the result. The
+    course leaderboard follows the saved score.
+    """
+    for _attempt in range(RESULT_WRITE_ATTEMPTS):
+        result = await get_or_create_task_result(task, course_id, user_id)
+        points_before, solved_before = result.score, result.status == TaskStatus.CORRECT
+        outcome = change(result)
+        if await save_task_result(result):
+            await record_score_change(
+                course_id,
+                user_id,
+                points=result.score - points_before,
+                solved=int(result.status == TaskStatus.CORRECT) - int(solved_before),
+            )
+            return result, outcome
+    logger.warning("Gave up updating result of %s for task %s", user_id, task.id)
+    raise HTTPException(status_code=409, detail="Результат уже изменился, повторите действие")
+
+
+async def get_results_for_user(user_id: str, task_ids: List[str]) -> Dict[str, TaskResultRecord]:
+    records = await TaskResultRecord.find(
+        TaskResultRecord.user_id == user_id,
+        {"task_id": {"$in": task_ids}},
+    ).to_list()
+    return {record.task_id: record for record in records}
+
+
+async def get_pending_review_results(task_id: str) -> List[TaskResultRecord]:
+    return await TaskResultRecord.find(
+        TaskResultRecord.task_id == task_id,
+        TaskResultRecord.status == TaskStatus.PENDING_REVIEW,
+    ).to_list()
+
+
+def drop_dangling(field: str, collection: str) -> List[dict]:
+    """Aggregation stages dropping documents whose ``field`` id names nothing in ``collection``."""
+    found = f"_{field.replace('.', '_')}_found"
+    return [
+        {
+            "$lookup": {
+                "from": collection,
+                "let": {"ref": {"$convert": {"input": f"${field}", "to": "objectId", "onError": None, "onNull": None}}},
+                "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$ref"]}}}, {"$project": {"_id": 1}}],
+                "as": found,
+            }
+        },
+        {"$match": {f"{found}.0": {"$exists": True}}},
+        {"$project": {found: 0}},
+    ]
+
+
+async def get_pending_review_page(
+    course_ids: Iterable[str],
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[TaskResultRecord], int]:
+    """Newest-first page of the results awaiting review in ``course_ids`` and their total count.
+
+    Reads only the partial ``pending_review_queue`` index, so the cost follows
+    the number of pending results rather than the size of the courses.
+    Results whose task, lesson, student or submission is gone are left out
+    before counting, so every page is full and the total matches the pages.
+    """
+    course_ids = list(dict.fromkeys(course_ids))
+    if not course_ids:
+        return [], 0
+    stages = [
+        {
+            "$match": {
+                "course_id": {"$in": course_ids},
+                "status": TaskStatus.PENDING_REVIEW.value,
+                "last_submission": {"$ne": None},
+            }
+        },
+        {"$sort": {"last_submission.created_at": -1}},
+        *drop_dangling("task_id", Task.get_motor_collection().name),
+        *drop_dangling("topic_id", Topic.get_motor_collection().name),
+        *drop_dangling("user_id", User.get_motor_collection().name),
+        *drop_dangling("last_submission.submission_id", SubmissionRecord.get_motor_collection().name),
+    ]
+    page = [{"$skip": offset}, *([{"$limit": limit}] if limit is not None else [])]
+    collection = TaskResultRecord.get_motor_collection()
+    rows, counts = await asyncio.gather(
+        collection.aggregate([*stages, *page]).to_list(length=None),
+        collection.aggregate([*stages, {"$count": "total"}]).to_list(length=None),
+    )
+    total = counts[0]["total"] if counts else 0
+    return [TaskResultRecord.model_validate(row) for row in rows], total
+
+
+async def delete_task_results(
+    course_id: str,
+    task_id: Optional[str] = None,
+    topic_id: Optional[str] = None,
+) -> None:
+    query = {"task_id": task_id} if task_id else {"topic_id": topic_id}
+    await TaskResultRecord.get_motor_collection().delete_many(query)
+    await rebuild_course_leaderboard(course_id)
+
+
+async def migrate_embedded_task_results(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Move ``Task.results`` into ``task_results`` and return the number of moved results.
+
+    Submission histories go first, since they are nested inside the results.
+    Results a student already has in the collection are newer and are kept.
+    """
+    await migrate_embedded_submission_history(batch_size)
+    tasks = Task.get_motor_collection()
+    records = TaskResultRecord.get_motor_collection()
+    topic_courses: Dict[str, Optional[str]] = {}
+    moved = 0
+    cursor = tasks.find(
+        {"results.0": {"$exists": True}},
+        {"topic_id": 1, "results": 1},
+        batch_size=batch_size,
+    )
+    async for raw_task in cursor:
+        task_id = str(raw_task["_id"])
+        topic_id = raw_task.get("topic_id")
+        if topic_id not in topic_courses:
+            topic = await load_document(Topic, topic_id)
+            topic_courses[topic_id] = topic.course_id if topic else None
+        course_id = topic_courses[topic_id]
+        if course_id is None:
+            logger.warning("Task %s has no lesson, its results are left in place", task_id)
+            continue
+
+        operations = []
+        for raw_result in raw_task.get("results", []):
+            # Submissions stay embedded here; migrate_result_submissions points them at the history.
+            result = EmbeddedTaskResult.model_validate(raw_result).model_dump(exclude={"submission_history"})
+            result.update(task_id=task_id, course_id=course_id, topic_id=topic_id, version=0)
+            operations.append(
+                UpdateOne(
+                    {"user_id": result["user_id"], "task_id": task_id},
+                    {"$setOnInsert": result},
+                    upsert=True,
+                )
+            )
+        if operations:
+            await records.bulk_write(operations, ordered=False)
+        await tasks.update_one({"_id": raw_task["_id"]}, {"$set": {"results": []}})
+        moved += len(operations)
+        logger.info("Moved %s results of task %s", len(operations), task_id)
+    return moved
+
+
+async def migrate_result_submissions(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Replace submissions embedded in ``task_results`` with refs and return the number of changed results.
+
+    Each embedded submission is upserted into ``submissions`` by (task_id,
+    user_id, created_at), like the history migration, so the pass can simply
+    be run again.
+    """
+    records = TaskResultRecord.get_motor_collection()
+    submissions = SubmissionRecord.get_motor_collection()
+    fields = ["last_submission", "best_submission"]
+    changed = 0
+    cursor = records.find(
+        {"$or": [{f"{field}.code": {"$exists": True}} for field in fields]},
+        {"task_id": 1, "user_id": 1, **{field: 1 for field in fields}},
+        batch_size=batch_size,
+    )
+    async for raw_result in cursor:
+        refs = {}
+        for field in fields:
+            raw_submission = raw_result.get(field)
+            if not raw_submission or "code" not in raw_submission:
+                continue
+            submission = TaskSubmission.model_validate(raw_submission)
+            stored = await submissions.find_one_and_update(
+                {"task_id": raw_result["task_id"], "user_id": raw_result["user_id"], "created_at": submission.created_at},
+                {"$setOnInsert": {**submission.model_dump(), "task_id": raw_result["task_id"], "user_id": raw_result["user_id"]}},
+                projection={"_id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            refs[field] = TaskSubmissionRef.of(str(stored["_id"]), submission).model_dump()
+        await records.update_one({"_id": raw_result["_id"]}, {"$set": refs})
+        changed += 1
+    return changed
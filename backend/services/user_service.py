@@ -1,9 +1,11 @@
 import logging
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from fastapi import HTTPException
 
 from models.user import User, UserType
+from services.document_loader import clear_document, load_document, load_documents
+from services.leaderboard_service import remove_leaderboard_member
 
 
 logger = logging.getLogger("user_service")
@@ -19,7 +21,7 @@ async def get_by_tg_username(tg_username: str) -> Optional[User]:
 
 async def get_by_id(user_id: str) -> User:
     try:
-        user = await User.get(user_id)
+        user = await load_document(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="Пользователь не найден")
         return user
@@ -45,29 +47,34 @@ async def get_user_id_by_tg_username(tg_username: str) -> Optional[str]:
 
 async def get_tg_username_by_user_id(user_id: str) -> Optional[str]:
     try:
-        user = await User.get(user_id)
+        user = await load_document(User, user_id)
         return user.tg_username if user else None
     except Exception as exc:
         logger.error("Error getting tg_username by user_id %s: %s", user_id, exc)
         return None
 
 
+async def get_users_by_ids(user_ids: Iterable[str]) -> List[User]:
+    """Users for ``user_ids`` in input order, read with one query; unknown ids are skipped."""
+    return await load_documents(User, user_ids)
+
+
+async def get_users_by_tg_usernames(tg_usernames: Iterable[str]) -> List[User]:
+    """Users for ``tg_usernames`` in input order, read with one query; unknown names are skipped."""
+    tg_usernames = [item for item in tg_usernames if item]
+    if not tg_usernames:
+        return []
+    users = await User.find({"tg_username": {"$in": list(dict.fromkeys(tg_usernames))}}).to_list()
+    by_username = {user.tg_username: user for user in users}
+    return [by_username[item] for item in tg_usernames if item in by_username]
+
+
 async def get_user_ids_by_tg_usernames(tg_usernames: List[str]) -> List[str]:
-    user_ids: List[str] = []
-    for tg_username in tg_usernames:
-        user_id = await get_user_id_by_tg_username(tg_username)
-        if user_id:
-            user_ids.append(user_id)
-    return user_ids
+    return [str(user.id) for user in await get_users_by_tg_usernames(tg_usernames)]
 
 
 async def get_tg_usernames_by_user_ids(user_ids: List[str]) -> List[str]:
-    usernames: List[str] = []
-    for user_id in user_ids:
-        username = await get_tg_username_by_user_id(user_id)
-        if username:
-            usernames.append(username)
-    return usernames
+    return [user.tg_username for user in await get_users_by_ids(user_ids)]
 
 
 async def update_user(user_id: str, **kwargs) -> User:
@@ -82,6 +89,8 @@ async def update_user(user_id: str, **kwargs) -> User:
 async def delete_user(user_id: str) -> bool:
     user = await get_by_id(user_id)
     await user.delete()
+    clear_document(User, user.id)
+    await remove_leaderboard_member(str(user.id))
     return True
 
 
@@ -93,11 +102,11 @@ async def get_linked_students_for_parent(parent: User) -> List[User]:
     if parent.user_type != UserType.PARENT or not parent.linked_student_ids:
         return []
 
-    students: List[User] = []
-    for student_id in parent.linked_student_ids:
-        student = await User.get(student_id)
-        if student and student.user_type == UserType.STUDENT:
-            students.append(student)
+    students = [
+        student
+        for student in await get_users_by_ids(parent.linked_student_ids)
+        if student.user_type == UserType.STUDENT
+    ]
 
     students.sort(key=lambda item: (item.surname.lower(), item.name.lower(), item.tg_username.lower()))
     return students
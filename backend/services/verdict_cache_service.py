@@ -0,0 +1,199 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from models.programming_language import ProgrammingLanguage, normalize_programming_language
+from models.task import TaskTestCase, TaskTestRunResult
+from models.verdict_cache_entry import VerdictCacheEntry
+from services.code_runner_service import (
+    DEFAULT_TIMEOUT_SECONDS,
+    SOLUTION_REPORT_MODE,
+    build_check_options,
+)
+
+
+logger = logging.getLogger("verdict_cache")
+VERDICT_CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", "512"))
+VERDICT_CACHE_TTL_SECONDS = int(os.getenv("VERDICT_CACHE_TTL_SECONDS", "600"))
+VERDICT_CACHE_MONGO = os.getenv("VERDICT_CACHE_MONGO", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+# Outcomes that depend on host load or runner health rather than on the code.
+UNCACHEABLE_MARKERS = ("Time limit exceeded", "Runner ")
+
+SolutionOutcome = Tuple[bool, int, str, str, List[TaskTestRunResult]]
+ProgramOutcome = Tuple[bool, int, str, str, bool]
+solution_outcome_adapter = TypeAdapter(SolutionOutcome)
+program_outcome_adapter = TypeAdapter(ProgramOutcome)
+
+
+class VerdictCache:
+    """Thread-safe in-memory LRU with per-entry TTL."""
+
+    def __init__(self, max_entries: int = VERDICT_CACHE_SIZE, ttl_seconds: int = VERDICT_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Optional[str], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, _task_id, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, task_id: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), task_id, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_task(self, task_id: str) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[1] == task_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+verdict_cache = VerdictCache()
+
+
+def normalize_source(code: str) -> str:
+    # Only line endings and trailing whitespace at the end of the file are
+    # dropped: anything else may be significant inside string literals.
+    return (code or "").replace("\r\n", "\n").rstrip()
+
+
+def build_cache_key(kind: str, payload: dict) -> str:
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return f"{kind}:{hashlib.sha256(serialized.encode('utf-8')).hexdigest()}"
+
+
+def solution_cache_key(
+    language: str | ProgrammingLanguage,
+    code: str,
+    tests: List[TaskTestCase],
+    timeout_seconds: int | None = None,
+    check_mode: str | None = None,
+    float_tolerance: float | None = None,
+) -> str:
+    return build_cache_key(
+        "solution",
+        {
+            "language": normalize_programming_language(language).value,
+            "code": hashlib.sha256(normalize_source(code).encode("utf-8")).hexdigest(),
+            "tests": [
+                [case.input_data, case.expected_output, getattr(case, "is_public", True)]
+                for case in tests
+            ],
+            "timeout_seconds": timeout_seconds or DEFAULT_TIMEOUT_SECONDS,
+            "report_mode": SOLUTION_REPORT_MODE,
+            "check": build_check_options(check_mode, float_tolerance),
+        },
+    )
+
+
+def program_cache_key(
+    language: str | ProgrammingLanguage,
+    code: str,
+    input_data: str,
+    timeout_seconds: int | None = None,
+) -> str:
+    return build_cache_key(
+        "program",
+        {
+            "language": normalize_programming_language(language).value,
+            "code": hashlib.sha256(normalize_source(code).encode("utf-8")).hexdigest(),
+            "input_data": input_data,
+            "timeout_seconds": timeout_seconds or DEFAULT_TIMEOUT_SECONDS,
+        },
+    )
+
+
+def is_cacheable_text(value: str) -> bool:
+    return not any(marker in (value or "") for marker in UNCACHEABLE_MARKERS)
+
+
+async def get_cached_value(key: str, adapter: TypeAdapter) -> Any:
+    value = verdict_cache.get(key)
+    if value is None and VERDICT_CACHE_MONGO:
+        try:
+            entry = await VerdictCacheEntry.find_one(VerdictCacheEntry.key == key)
+        except Exception as exc:
+            logger.warning("Verdict cache lookup failed: %s", exc)
+            entry = None
+        if entry and (datetime.utcnow() - entry.created_at).total_seconds() <= VERDICT_CACHE_TTL_SECONDS:
+            value = entry.value
+            verdict_cache.set(key, value, task_id=entry.task_id)
+    if value is None:
+        return None
+    return adapter.validate_python(value)
+
+
+async def store_value(key: str, value: Any, adapter: TypeAdapter, task_id: Optional[str] = None) -> None:
+    serialized = adapter.dump_python(value, mode="json")
+    verdict_cache.set(key, serialized, task_id=task_id)
+    if not VERDICT_CACHE_MONGO:
+        return
+    try:
+        await VerdictCacheEntry.get_motor_collection().update_one(
+            {"key": key},
+            {"$set": {"task_id": task_id, "value": serialized, "created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except Exception as exc:
+        logger.warning("Verdict cache store failed: %s", exc)
+
+
+async def get_cached_solution(key: str) -> Optional[SolutionOutcome]:
+    return await get_cached_value(key, solution_outcome_adapter)
+
+
+async def store_solution(key: str, outcome: SolutionOutcome, task_id: str) -> None:
+    _passed, _passed_tests, _stdout, stderr, test_results = outcome
+    if not is_cacheable_text(stderr) or not all(is_cacheable_text(item.stderr) for item in test_results):
+        return
+    await store_value(key, outcome, solution_outcome_adapter, task_id=task_id)
+
+
+async def get_cached_program(key: str) -> Optional[ProgramOutcome]:
+    return await get_cached_value(key, program_outcome_adapter)
+
+
+async def store_program(key: str, outcome: ProgramOutcome) -> None:
+    _success, _exit_code, _stdout, stderr, timed_out = outcome
+    if timed_out or not is_cacheable_text(stderr):
+        return
+    await store_value(key, outcome, program_outcome_adapter)
+
+
+async def invalidate_task_verdicts(task_id: str) -> None:
+    verdict_cache.invalidate_task(task_id)
+    if not VERDICT_CACHE_MONGO:
+        return
+    try:
+        await VerdictCacheEntry.get_motor_collection().delete_many({"task_id": task_id})
+    except Exception as exc:
+        logger.warning("Verdict cache invalidation failed: %s", exc)
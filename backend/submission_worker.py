@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import logging
+import os
+import socket
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from database import close_database, init_database
+from models.submission_job import SubmissionJob
+from models.task import Task
+from models.user import User
+from routers.tasks import (
+    get_task_course,
+    judge_with_verdict_cache,
+    record_submission_result,
+    run_solution_for_language,
+)
+from services.code_runner_service import shutdown_runner_pool, start_runner_pool
+from services.submission_queue_service import (
+    QUEUE_HEARTBEAT_SECONDS,
+    claim_next_submission,
+    complete_submission,
+    fail_submission,
+    renew_submission_lease,
+)
+
+
+load_dotenv()
+logging.basicConfig(
+    level=logging.INFO,
+    filename=os.getenv("LOG_FILE", "app.log"),
+    filemode="a",
+    format="%(asctime)s | %(levelname)s | %(message)s",
+)
+logger = logging.getLogger("submission_worker")
+WORKER_CONCURRENCY = int(os.getenv("SUBMISSION_WORKER_CONCURRENCY", "2"))
+WORKER_POLL_SECONDS = float(os.getenv("SUBMISSION_WORKER_POLL_SECONDS", "0.5"))
+
+
+async def keep_submission_leased(job: SubmissionJob) -> None:
+    """Renew the lease of ``job`` while it is being judged, until the lease is lost."""
+    while True:
+        await asyncio.sleep(QUEUE_HEARTBEAT_SECONDS)
+        if not await renew_submission_lease(job):
+            logger.warning("Lost the lease of submission job %s", job.id)
+            return
+
+
+async def process_submission(job: SubmissionJob) -> None:
+    task = await Task.get(job.task_id)
+    user = await User.get(job.user_id)
+    if not task or not user:
+        await fail_submission(job, "Задача или ученик не найдены")
+        return
+    try:
+        course = await get_task_course(task)
+    except HTTPException as exc:
+        await fail_submission(job, str(exc.detail))
+        return
+
+    heartbeat = asyncio.create_task(keep_submission_leased(job))
+    try:
+        run_outcome = await judge_with_verdict_cache(
+            task,
+            job.code,
+            lambda: asyncio.to_thread(
+                run_solution_for_language,
+                task.language,
+                job.code,
+                task.tests,
+                check_mode=task.check_mode,
+                float_tolerance=task.float_tolerance,
+            ),
+        )
+    finally:
+        heartbeat.cancel()
+    task = await Task.get(job.task_id)
+    if not task:
+        await fail_submission(job, "Задача не найдена")
+        return
+    # A fresh lease covers the recording; without one another worker has
+    # reclaimed the job and records it instead.
+    if not await renew_submission_lease(job):
+        logger.warning("Submission job %s was taken over, its verdict is dropped", job.id)
+        return
+    newly_unlocked = await record_submission_result(task, user, course, job.code, run_outcome)
+    if not await complete_submission(job, [str(item.id) for item in newly_unlocked]):
+        logger.warning("Submission job %s was recorded after its lease was lost", job.id)
+
+
+async def consume_submissions(worker_id: str) -> None:
+    while True:
+        job = await claim_next_submission(worker_id)
+        if job is None:
+            await asyncio.sleep(WORKER_POLL_SECONDS)
+            continue
+        try:
+            await process_submission(job)
+        except Exception as exc:
+            logger.exception("Submission job %s failed", job.id)
+            await fail_submission(job, f"Ошибка проверки: {exc}")
+
+
+async def run_worker(concurrency: int) -> None:
+    await init_database(seed_defaults=False)
+    start_runner_pool()
+    worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("Submission worker %s started with concurrency %s", worker_prefix, concurrency)
+    try:
+        await asyncio.gather(
+            *(consume_submissions(f"{worker_prefix}:{index}") for index in range(concurrency))
+        )
+    finally:
+        shutdown_runner_pool()
+        await close_database()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Judge queued task submissions")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(run_worker(max(1, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
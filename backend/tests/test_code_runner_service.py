@@ -1,10 +1,16 @@
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
 from models.task import TaskTestCase
 from services.code_runner_service import (
+    RunnerPool,
     run_javascript_program,
     run_javascript_solution,
     run_python_program,
+    run_python_solution,
+    run_solution,
 )
 
 
@@ -57,6 +63,243 @@ class CodeRunnerServiceTest(unittest.TestCase):
         self.assertEqual(len(test_results), 2)
         self.assertTrue(all(item.passed for item in test_results))
 
+    def test_python_solution_stops_batch_on_first_failure(self):
+        pool = RunnerPool(size=1)
+        self.addCleanup(pool.shutdown)
+        with patch("services.code_runner_service.get_runner_pool", return_value=pool):
+            passed, passed_tests, _stdout, _stderr, test_results = run_python_solution(
+                "print(int(input()) * 2)\n",
+                [
+                    TaskTestCase(input_data="1", expected_output="2"),
+                    TaskTestCase(input_data="2", expected_output="5"),
+                    TaskTestCase(input_data="3", expected_output="6"),
+                ],
+                timeout_seconds=1,
+            )
+            worker_pid = pool._idle[0].process.pid
+            run_python_solution("print(1)", [TaskTestCase(expected_output="1")], timeout_seconds=1)
+
+        self.assertFalse(passed)
+        self.assertEqual(passed_tests, 1)
+        self.assertEqual([item.passed for item in test_results], [True, False])
+        self.assertEqual(test_results[1].actual_output, "4")
+        self.assertEqual(pool._idle[0].process.pid, worker_pid)
+
+    def test_solution_without_pool_charges_time_limit_to_the_slow_case(self):
+        with patch("services.code_runner_service.POOL_SIZE", 0):
+            passed, passed_tests, _stdout, _stderr, test_results = run_python_solution(
+                "n = int(input())\nwhile n == 2:\n    pass\nprint(n)\n",
+                [
+                    TaskTestCase(input_data="1", expected_output="1"),
+                    TaskTestCase(input_data="2", expected_output="2"),
+                    TaskTestCase(input_data="3", expected_output="3"),
+                ],
+                timeout_seconds=1,
+            )
+
+        self.assertFalse(passed)
+        self.assertEqual(passed_tests, 1)
+        self.assertEqual([item.passed for item in test_results], [True, False])
+        self.assertEqual(test_results[0].actual_output, "1")
+        self.assertIn("Time limit exceeded", test_results[1].stderr)
+
+    def test_parallel_solution_keeps_order_and_reports_all_cases(self):
+        pool = RunnerPool(size=3)
+        self.addCleanup(pool.shutdown)
+        with (
+            patch("services.code_runner_service.get_runner_pool", return_value=pool),
+            patch("services.code_runner_service._parallel_slots", threading.BoundedSemaphore(2)),
+        ):
+            passed, passed_tests, stdout, stderr, test_results = run_solution(
+                "python",
+                "import time\nvalue = int(input())\ntime.sleep(0.3 - value / 10)\nprint(value)\n",
+                [
+                    TaskTestCase(input_data="0", expected_output="0"),
+                    TaskTestCase(input_data="1", expected_output="9"),
+                    TaskTestCase(input_data="2", expected_output="2"),
+                ],
+                timeout_seconds=1,
+                report_mode="all",
+                parallel=True,
+            )
+
+        self.assertFalse(passed)
+        self.assertEqual(passed_tests, 2)
+        self.assertEqual(stdout, "1")
+        self.assertEqual(stderr, "")
+        self.assertEqual([item.actual_output for item in test_results], ["0", "1", "2"])
+        self.assertEqual([item.passed for item in test_results], [True, False, True])
+
+    def test_parallel_solution_returns_at_first_failure_without_waiting_for_other_cases(self):
+        pool = RunnerPool(size=3)
+        self.addCleanup(pool.shutdown)
+        slots = threading.BoundedSemaphore(2)
+        with (
+            patch("services.code_runner_service.get_runner_pool", return_value=pool),
+            patch("services.code_runner_service._parallel_slots", slots),
+            patch("services.code_runner_service.PARALLEL_WIDTH", 3),
+        ):
+            started_at = time.monotonic()
+            passed, passed_tests, _stdout, _stderr, test_results = run_solution(
+                "python",
+                "import time\nvalue = int(input())\ntime.sleep(value)\nprint(value)\n",
+                [
+                    TaskTestCase(input_data="0", expected_output="5"),
+                    TaskTestCase(input_data="1", expected_output="1"),
+                    TaskTestCase(input_data="1", expected_output="1"),
+                ],
+                timeout_seconds=2,
+                parallel=True,
+            )
+            elapsed = time.monotonic() - started_at
+            self.assertFalse(slots.acquire(blocking=False))
+            time.sleep(1.5)
+
+        self.assertFalse(passed)
+        self.assertEqual(passed_tests, 0)
+        self.assertEqual(len(test_results), 1)
+        self.assertLess(elapsed, 0.9)
+        self.assertTrue(slots.acquire(blocking=False))
+
+    def test_parallel_solution_with_syntax_error_is_not_started(self):
+        with (
+            patch("services.code_runner_service._parallel_slots", threading.BoundedSemaphore(2)),
+            patch("services.code_runner_service.PARALLEL_WIDTH", 3),
+            patch("services.code_runner_service.execute_program_with_details") as execute,
+        ):
+            passed, _passed_tests, _stdout, stderr, test_results = run_solution(
+                "python",
+                "print(int(input())\n",
+                [
+                    TaskTestCase(input_data="1", expected_output="1"),
+                    TaskTestCase(input_data="2", expected_output="2"),
+                ],
+                timeout_seconds=1,
+                report_mode="all",
+                parallel=True,
+            )
+
+        execute.assert_not_called()
+        self.assertFalse(passed)
+        self.assertIn("SyntaxError", stderr)
+        self.assertEqual(len(test_results), 2)
+
+    def test_python_solution_reports_usage_and_enforces_memory_limit(self):
+        passed, _passed_tests, _stdout, stderr, test_results = run_python_solution(
+            "data = bytearray(1024 * 1024 * 1024)\nprint(len(data))\n",
+            [TaskTestCase(expected_output="1073741824")],
+            timeout_seconds=2,
+        )
+
+        self.assertFalse(passed)
+        self.assertIn("MemoryError", stderr)
+        self.assertIsNotNone(test_results[0].cpu_time_ms)
+        self.assertGreater(test_results[0].peak_memory_kb, 0)
+
+    def test_python_runner_applies_cpu_limit_inside_the_solution(self):
+        success, _exit_code, stdout, _stderr, _timed_out = run_python_program(
+            "import resource\nprint(resource.getrlimit(resource.RLIMIT_CPU)[0])\n",
+            timeout_seconds=1,
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(stdout, "2")
+
+    def test_python_solution_stops_early_on_wrong_answer(self):
+        started_at = time.monotonic()
+        passed, _passed_tests, stdout, _stderr, test_results = run_python_solution(
+            "import time\nprint(1, flush=True)\ntime.sleep(5)\nprint(2)\n",
+            [TaskTestCase(expected_output="2\n2")],
+            timeout_seconds=3,
+        )
+
+        self.assertFalse(passed)
+        self.assertEqual(stdout, "1")
+        self.assertFalse(test_results[0].passed)
+        self.assertLess(time.monotonic() - started_at, 2)
+
+    def test_solution_uses_float_tolerance_check_mode(self):
+        passed, passed_tests, _stdout, _stderr, _test_results = run_python_solution(
+            "print(1 / 3)\n",
+            [TaskTestCase(expected_output="0.333333")],
+            timeout_seconds=1,
+            check_mode="float",
+            float_tolerance=1e-5,
+        )
+
+        self.assertTrue(passed)
+        self.assertEqual(passed_tests, 1)
+
+    def test_python_solution_with_syntax_error_fails_every_case(self):
+        passed, passed_tests, _stdout, stderr, test_results = run_solution(
+            "python",
+            "print(int(input())\n",
+            [
+                TaskTestCase(input_data="1", expected_output="1"),
+                TaskTestCase(input_data="2", expected_output="2"),
+            ],
+            timeout_seconds=1,
+            report_mode="all",
+        )
+
+        self.assertFalse(passed)
+        self.assertEqual(passed_tests, 0)
+        self.assertIn("SyntaxError", stderr)
+        self.assertEqual(len(test_results), 2)
+        self.assertTrue(all("SyntaxError" in item.stderr for item in test_results))
+
+    def test_python_runner_stops_runaway_output(self):
+        success, _exit_code, stdout, stderr, timed_out = run_python_program(
+            "while True:\n    print('spam' * 100)\n",
+            timeout_seconds=5,
+        )
+
+        self.assertFalse(success)
+        self.assertFalse(timed_out)
+        self.assertIn("Output limit exceeded", stderr)
+        self.assertIn("[output truncated]", stdout)
+
+
+class RunnerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = RunnerPool(size=1, max_jobs=2, healthcheck_seconds=0)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def run_print(self, value):
+        return self.pool.run(
+            {
+                "language": "python",
+                "code": f"print({value})",
+                "input_data": "",
+                "timeout_seconds": 1,
+            },
+            timeout_seconds=3,
+        )
+
+    def test_pool_reuses_worker_and_recycles_after_max_jobs(self):
+        self.pool.start()
+        first_pid = self.pool._idle[0].process.pid
+
+        self.assertEqual(self.run_print(1)["stdout"], "1")
+        self.assertEqual(self.pool._idle[0].process.pid, first_pid)
+
+        self.assertEqual(self.run_print(2)["stdout"], "2")
+        self.assertEqual(self.pool._idle, [])
+
+        self.assertEqual(self.run_print(3)["stdout"], "3")
+        self.assertNotEqual(self.pool._idle[0].process.pid, first_pid)
+
+    def test_pool_replaces_dead_worker(self):
+        self.pool.start()
+        dead_worker = self.pool._idle[0]
+        dead_worker.process.kill()
+        dead_worker.process.wait()
+
+        self.assertEqual(self.run_print(7)["stdout"], "7")
+        self.assertNotEqual(self.pool._idle[0].process.pid, dead_worker.process.pid)
+
 
 if __name__ == "__main__":
     unittest.main()
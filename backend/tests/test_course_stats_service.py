@@ -0,0 +1,136 @@
+import asyncio
+import copy
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from beanie import PydanticObjectId
+
+from services.course_stats_service import (
+    add_child_id,
+    apply_task_change,
+    rebuild_course_aggregates,
+    remove_child_id,
+    shift_totals,
+)
+from tests.test_support import AsyncListResult
+
+
+class FakeCollection:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append((query["_id"], update))
+
+
+class StoredDocuments:
+    """Documents by id that apply $inc/$addToSet/$pull/$set like MongoDB, yielding on every write."""
+
+    def __init__(self, **documents):
+        self.documents = documents
+
+    async def update_one(self, query, update):
+        await asyncio.sleep(0)
+        stored = self.documents[query["_id"]]
+        for field, value in update.get("$inc", {}).items():
+            stored[field] += value
+        for field, value in update.get("$addToSet", {}).items():
+            if value not in stored[field]:
+                stored[field].append(value)
+        for field, value in update.get("$pull", {}).items():
+            stored[field] = [item for item in stored[field] if item != value]
+        stored.update(update.get("$set", {}))
+
+    def load(self, document_id):
+        store = self
+
+        class LoadedDocument(SimpleNamespace):
+            async def update(self, update):
+                await store.update_one({"_id": self.id}, update)
+                self.__dict__.update(copy.deepcopy(store.documents[self.id]))
+
+        return LoadedDocument(id=document_id, **copy.deepcopy(self.documents[document_id]))
+
+
+class CourseStatsServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_shift_totals_increments_documents_in_place(self):
+        course = SimpleNamespace(id="course-1", total_points=30, total_tasks=3)
+        topic = SimpleNamespace(id="topic-1", total_points=10, total_tasks=1)
+        topic_collection = FakeCollection()
+        course_collection = FakeCollection()
+
+        with (
+            patch("services.course_stats_service.Topic.get_motor_collection", return_value=topic_collection),
+            patch("services.course_stats_service.Course.get_motor_collection", return_value=course_collection),
+        ):
+            await shift_totals(course, topic, points=-10, tasks=-1)
+
+        increment = {"$inc": {"total_points": -10, "total_tasks": -1}}
+        self.assertEqual(topic_collection.updates, [("topic-1", increment)])
+        self.assertEqual(course_collection.updates, [("course-1", increment)])
+        self.assertEqual((topic.total_points, topic.total_tasks), (0, 0))
+        self.assertEqual((course.total_points, course.total_tasks), (20, 2))
+
+    async def test_concurrent_task_create_and_delete_keep_lists_and_totals(self):
+        topics = StoredDocuments(**{"topic-1": {"task_ids": ["task-1"], "total_points": 10, "total_tasks": 1}})
+        courses = StoredDocuments(**{"course-1": {"topic_ids": ["topic-1"], "total_points": 10, "total_tasks": 1}})
+
+        async def create_task(course, topic):
+            await add_child_id(topic, "task_ids", "task-2")
+            await apply_task_change(course, topic, points=5, tasks=1)
+
+        async def delete_task(course, topic):
+            await remove_child_id(topic, "task_ids", "task-1")
+            await apply_task_change(course, topic, points=-10, tasks=-1)
+
+        with (
+            patch("services.course_stats_service.Topic.get_motor_collection", return_value=topics),
+            patch("services.course_stats_service.Course.get_motor_collection", return_value=courses),
+        ):
+            await asyncio.gather(
+                create_task(courses.load("course-1"), topics.load("topic-1")),
+                delete_task(courses.load("course-1"), topics.load("topic-1")),
+            )
+
+        stored_topic = topics.documents["topic-1"]
+        self.assertEqual(stored_topic["task_ids"], ["task-2"])
+        self.assertEqual((stored_topic["total_points"], stored_topic["total_tasks"]), (5, 1))
+        stored_course = courses.documents["course-1"]
+        self.assertEqual((stored_course["total_points"], stored_course["total_tasks"]), (5, 1))
+
+    async def test_rebuild_sums_lessons_into_the_course(self):
+        task_ids = [str(PydanticObjectId()) for _ in range(3)]
+        topics = [
+            SimpleNamespace(id="topic-1", task_ids=task_ids[:2]),
+            SimpleNamespace(id="topic-2", task_ids=task_ids[2:]),
+        ]
+        tasks = [
+            SimpleNamespace(id=task_ids[0], points=10, requires_manual_review=False),
+            SimpleNamespace(id=task_ids[1], points=5, requires_manual_review=True),
+            SimpleNamespace(id=task_ids[2], points=20, requires_manual_review=False),
+        ]
+        course = SimpleNamespace(id="course-1", topic_ids=[str(PydanticObjectId()) for _ in topics])
+        topic_collection = FakeCollection()
+        course_collection = FakeCollection()
+
+        with (
+            patch("services.course_stats_service.Topic.find", return_value=AsyncListResult(topics)),
+            patch("services.course_stats_service.Task.find", return_value=AsyncListResult(tasks)),
+            patch("services.course_stats_service.Topic.get_motor_collection", return_value=topic_collection),
+            patch("services.course_stats_service.Course.get_motor_collection", return_value=course_collection),
+        ):
+            await rebuild_course_aggregates(course)
+
+        self.assertEqual((topics[0].total_points, topics[0].total_tasks), (15, 2))
+        self.assertTrue(topics[0].has_manual_review_tasks)
+        self.assertFalse(topics[1].has_manual_review_tasks)
+        self.assertEqual(
+            course_collection.updates,
+            [
+                (
+                    "course-1",
+                    {"$set": {"total_points": 35, "total_tasks": 3, "has_manual_review_tasks": True}},
+                )
+            ],
+        )
@@ -1,8 +1,12 @@
+import asyncio
 import unittest
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
+from models.user import UserType
 from routers.courses import router as courses_router
+from services.auth_service import get_current_user_dependency
+from services.serializer_service import build_group_leaderboard
 
 from tests.test_support import AsyncListResult, FakeTopicRecord, course_response, make_client
 
@@ -61,5 +65,55 @@ class PublicCourseApiTest(unittest.TestCase):
         self.assertEqual(payload["lessons"][1]["total_tasks"], 3)
 
 
+
+class CourseLeaderboardApiTest(unittest.TestCase):
+    def setUp(self):
+        self.user = SimpleNamespace(id="student-2", user_type=UserType.STUDENT)
+        self.client, self.app = make_client(
+            courses_router,
+            overrides={get_current_user_dependency: lambda: self.user},
+        )
+
+    def tearDown(self):
+        self.app.dependency_overrides.clear()
+
+    def test_group_leaderboard_page_has_ranks_and_my_rank(self):
+        course = SimpleNamespace(id="course-1", total_points=40)
+        group = SimpleNamespace(id="group-1", course_id="course-1", students=["student-1", "student-2", "student-3"])
+        entries = [
+            SimpleNamespace(user_id="student-2", name="Anna", surname="Ivanova", tg_username="anna", points=0, solved=0)
+        ]
+        page = AsyncMock(return_value=(entries, 3))
+        rank = AsyncMock(return_value=2)
+
+        with (
+            patch("routers.courses.Course.get", new=AsyncMock(return_value=course)),
+            patch("routers.courses.Group.get", new=AsyncMock(return_value=group)),
+            patch("routers.courses.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("services.serializer_service.get_leaderboard_page", new=page),
+            patch("services.serializer_service.get_leaderboard_rank", new=rank),
+        ):
+            response = self.client.get("/course/course-1/leaderboard?group_id=group-1&offset=1&limit=1")
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual((payload["total"], payload["my_rank"]), (3, 2))
+        self.assertEqual(
+            [(item["user_id"], item["surname"], item["rank"], item["points"]) for item in payload["items"]],
+            [("student-2", "Ivanova", 2, 0)],
+        )
+        page.assert_awaited_once_with("course-1", group.students, 1, 1)
+        rank.assert_awaited_once_with("course-1", group.students, "student-2")
+
+    def test_group_leaderboard_in_course_detail_is_not_truncated(self):
+        course = SimpleNamespace(id="course-1", total_points=0)
+        group = SimpleNamespace(students=[f"student-{index}" for index in range(30)])
+        page = AsyncMock(return_value=([], 0))
+
+        with patch("services.serializer_service.get_leaderboard_page", new=page):
+            asyncio.run(build_group_leaderboard(course, group))
+
+        page.assert_awaited_once_with("course-1", group.students, 0, None)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from models.user import UserStatus, UserType
+from routers.users import router as users_router
+from schemas.responses import CourseRequestResponse, UserResponse
+from services.auth_service import get_current_user_dependency
+from services.response_cache_service import dashboard_cache
+
+from tests.test_support import AsyncListResult, make_client, patch_cache_versions
+
+
+class DashboardApiTest(unittest.TestCase):
+    def setUp(self):
+        self.client, self.app = make_client(users_router)
+        self.user = SimpleNamespace(id="teacher-1", user_type=UserType.TEACHER)
+        self.app.dependency_overrides[get_current_user_dependency] = lambda: self.user
+        dashboard_cache.clear()
+        self.versions = self.enterContext(patch_cache_versions())
+
+    def tearDown(self):
+        self.app.dependency_overrides.clear()
+        dashboard_cache.clear()
+
+    def test_section_is_paged_cached_and_revalidated_by_etag(self):
+        course = SimpleNamespace(id="course-1")
+        request = CourseRequestResponse(
+            id="request-1",
+            course_id="course-1",
+            course_name="Python Basics",
+            contact_value="@parent",
+            created_at=datetime(2026, 1, 1),
+        )
+        find = patch("routers.users.CourseRequest.find", return_value=AsyncListResult([object()], count=3))
+
+        with (
+            patch("routers.users.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.users.get_manageable_courses", new=AsyncMock(return_value=[course])),
+            patch("routers.users.serialize_course_request", return_value=request),
+            find as find_requests,
+        ):
+            response = self.client.get("/users/dashboard/course_requests?limit=1")
+            revalidated = self.client.get(
+                "/users/dashboard/course_requests?limit=1",
+                headers={"If-None-Match": response.headers["etag"]},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual((payload["total"], payload["offset"], payload["limit"]), (3, 0, 1))
+        self.assertEqual([item["id"] for item in payload["items"]], ["request-1"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers["etag"], response.headers["etag"])
+        self.assertEqual(find_requests.call_count, 2)
+
+    def test_write_in_another_process_makes_cached_sections_stale(self):
+        course = SimpleNamespace(id="course-1")
+        find = patch("routers.users.CourseRequest.find", return_value=AsyncListResult([], count=0))
+
+        with (
+            patch("routers.users.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.users.get_manageable_courses", new=AsyncMock(return_value=[course])),
+            find as find_requests,
+        ):
+            self.client.get("/users/dashboard/course_requests")
+            self.client.get("/users/dashboard/course_requests")
+            cached_reads = find_requests.call_count
+            # Another worker bumped the version; this process still holds the old entry.
+            self.versions.versions["dashboard"] = 1
+            self.client.get("/users/dashboard/course_requests")
+
+        self.assertEqual(len(dashboard_cache), 2)
+        self.assertEqual(find_requests.call_count, cached_reads * 2)
+
+    def test_unknown_section_is_not_found(self):
+        response = self.client.get("/users/dashboard/unknown")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_combined_dashboard_loads_shared_data_once(self):
+        self.user.user_type = UserType.STUDENT
+        get_courses = AsyncMock(return_value=[])
+        user_response = UserResponse(
+            user_id="teacher-1",
+            name="Anna",
+            surname="Ivanova",
+            tg_username="anna",
+            user_type=UserType.STUDENT,
+            status=UserStatus.ACTIVE,
+        )
+
+        with (
+            patch("routers.users.get_courses_for_user", new=get_courses),
+            patch("routers.users.serialize_courses", new=AsyncMock(return_value=[])),
+            patch("routers.users.Achievement.find_all", return_value=AsyncListResult([])),
+            patch("routers.users.build_dashboard_pending_reviews", new=AsyncMock(return_value=([], 0))),
+            patch("routers.users.serialize_user", return_value=user_response),
+        ):
+            response = self.client.get("/users/dashboard")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user"]["user_id"], "teacher-1")
+        self.assertEqual(response.json()["managed_students"], [])
+        get_courses.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from pymongo.errors import OperationFailure
+
+from database import create_custom_indexes
+
+
+class FakeCollection:
+    def __init__(self, name, created, indexes=None, failing_keys=()):
+        self.name = name
+        self.created = created
+        self.indexes = indexes or {}
+        self.failing_keys = failing_keys
+
+    async def index_information(self):
+        return self.indexes
+
+    async def create_index(self, keys, **_options):
+        if keys in self.failing_keys:
+            raise OperationFailure("Index with name already exists with different options")
+        self.created.append((self.name, keys))
+
+
+class FakeDatabase:
+    def __init__(self, indexes=None, failing_keys=None):
+        self.created = []
+        self.indexes = indexes or {}
+        self.failing_keys = failing_keys or {}
+        self.command = AsyncMock()
+
+    def __getitem__(self, name):
+        return FakeCollection(name, self.created, self.indexes.get(name), self.failing_keys.get(name, ()))
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+class CustomIndexesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_one_failing_index_does_not_skip_the_others(self):
+        database = FakeDatabase(failing_keys={"task_results": [[("task_id", 1), ("status", 1)]]})
+
+        await create_custom_indexes(database)
+
+        self.assertIn(("task_results", [("course_id", 1), ("last_submission.created_at", -1)]), database.created)
+        self.assertIn(("achievements", [("course_id", 1)]), database.created)
+        self.assertNotIn(("task_results", [("task_id", 1), ("status", 1)]), database.created)
+
+    async def test_changed_ttl_is_applied_in_place(self):
+        database = FakeDatabase(
+            indexes={"verdict_cache": {"created_at_1": {"key": [("created_at", 1)], "expireAfterSeconds": 1}}}
+        )
+
+        await create_custom_indexes(database)
+
+        command = database.command.await_args.args[0]
+        self.assertEqual(command["collMod"], "verdict_cache")
+        self.assertEqual(command["index"]["keyPattern"], {"created_at": 1})
+        self.assertNotIn(("verdict_cache", [("created_at", 1)]), database.created)
+
+
+if __name__ == "__main__":
+    unittest.main()
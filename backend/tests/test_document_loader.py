@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from beanie import PydanticObjectId
+
+from models.course import Course
+from services.document_loader import (
+    clear_document,
+    close_document_loader,
+    load_document,
+    load_documents,
+    open_document_loader,
+    prime_document,
+)
+from tests.test_support import AsyncListResult
+
+
+FIRST_ID = "65f000000000000000000001"
+SECOND_ID = "65f000000000000000000002"
+MISSING_ID = "65f000000000000000000003"
+
+
+class DocumentLoaderTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_loads_share_one_query_per_request(self):
+        courses = [SimpleNamespace(id=FIRST_ID), SimpleNamespace(id=SECOND_ID)]
+        queries = []
+
+        def find(query):
+            queries.append(query)
+            return AsyncListResult(courses)
+
+        token = open_document_loader()
+        try:
+            with patch.object(Course, "find", side_effect=find):
+                first, both, missing = await asyncio.gather(
+                    load_document(Course, FIRST_ID),
+                    load_documents(Course, [SECOND_ID, FIRST_ID, MISSING_ID]),
+                    load_document(Course, MISSING_ID),
+                )
+                again = await load_documents(Course, [MISSING_ID, SECOND_ID], keep_missing=True)
+        finally:
+            await close_document_loader(token)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(queries[0]["_id"]["$in"]), 3)
+        self.assertIs(first, courses[0])
+        self.assertEqual([item.id for item in both], [SECOND_ID, FIRST_ID])
+        self.assertIsNone(missing)
+        self.assertEqual(again, [None, courses[1]])
+
+    async def test_primed_and_cleared_documents_are_seen_by_later_loads(self):
+        created = Course.model_construct(id=PydanticObjectId(MISSING_ID))
+        get = AsyncMock(side_effect=[None, None])
+
+        token = open_document_loader()
+        try:
+            with patch.object(Course, "get", new=get):
+                before = await load_document(Course, MISSING_ID)
+                prime_document(created)
+                after = await load_document(Course, MISSING_ID)
+                clear_document(Course, MISSING_ID)
+                deleted = await load_document(Course, MISSING_ID)
+        finally:
+            await close_document_loader(token)
+
+        self.assertIsNone(before)
+        self.assertIs(after, created)
+        self.assertIsNone(deleted)
+        self.assertEqual(get.await_count, 2)
+
+    async def test_closing_cancels_lookups_still_running(self):
+        started = asyncio.Event()
+
+        async def slow_find(*_args):
+            started.set()
+            await asyncio.sleep(10)
+
+        token = open_document_loader()
+        waiting = asyncio.create_task(load_document(Course, FIRST_ID))
+        with patch.object(Course, "get", new=slow_find):
+            await started.wait()
+            await close_document_loader(token)
+
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+    async def test_without_a_request_every_load_reads_the_database(self):
+        course = SimpleNamespace(id=FIRST_ID)
+
+        with patch.object(Course, "get", new=AsyncMock(return_value=course)) as get:
+            self.assertIs(await load_document(Course, FIRST_ID), course)
+            self.assertIs(await load_document(Course, FIRST_ID), course)
+
+        self.assertEqual(get.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from services.leaderboard_service import add_leaderboard_members, get_leaderboard_rank, record_score_change
+from tests.test_support import AsyncListResult
+
+
+class FakeBoard:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.updates = []
+        self.bulk = []
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append((query, update))
+        return SimpleNamespace(matched_count=int(query["user_id"] in self.existing))
+
+    async def count_documents(self, query, limit=0):
+        return int(query["user_id"] in self.existing)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk.extend(operations)
+        for operation in operations:
+            self.existing.add(operation._filter["user_id"])
+
+
+class LeaderboardServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_score_change_increments_an_existing_entry(self):
+        board = FakeBoard(existing={"student-1"})
+
+        with patch("services.leaderboard_service.LeaderboardEntry.get_motor_collection", return_value=board):
+            await record_score_change("course-1", "student-1", points=10, solved=1)
+
+        self.assertEqual(board.updates, [({"course_id": "course-1", "user_id": "student-1"}, {"$inc": {"points": 10, "solved": 1}})])
+        self.assertEqual(board.bulk, [])
+
+    async def test_student_missing_from_the_board_joins_with_their_name(self):
+        board = FakeBoard()
+        student = SimpleNamespace(id="student-2", surname="Ivanova", name="Anna", tg_username="anna")
+
+        with (
+            patch("services.leaderboard_service.LeaderboardEntry.get_motor_collection", return_value=board),
+            patch("services.leaderboard_service.load_documents", new=AsyncMock(return_value=[student])),
+        ):
+            await record_score_change("course-1", "student-2", points=5)
+
+        self.assertEqual(
+            board.bulk[0]._doc,
+            {"$setOnInsert": {"points": 0, "solved": 0, "surname": "Ivanova", "name": "Anna", "tg_username": "anna"}},
+        )
+        self.assertEqual(board.updates[-1][1], {"$inc": {"points": 5, "solved": 0}})
+
+    async def test_members_join_with_zero_points(self):
+        board = FakeBoard()
+        students = [SimpleNamespace(id="student-1", surname="Petrov", name="Ivan", tg_username="ivan")]
+
+        with (
+            patch("services.leaderboard_service.LeaderboardEntry.get_motor_collection", return_value=board),
+            patch("services.leaderboard_service.load_documents", new=AsyncMock(return_value=students)),
+        ):
+            await add_leaderboard_members("course-1", ["student-1"])
+
+        self.assertEqual(board.existing, {"student-1"})
+        self.assertTrue(board.bulk[0]._upsert)
+
+    async def test_rank_counts_members_ahead_in_board_order(self):
+        entry = SimpleNamespace(points=20, surname="Petrov", name="Ivan")
+        counted = []
+
+        def find(query):
+            counted.append(query)
+            return AsyncListResult([], count=2)
+
+        with (
+            patch("services.leaderboard_service.LeaderboardEntry.find_one", new=AsyncMock(return_value=entry)),
+            patch("services.leaderboard_service.LeaderboardEntry.find", side_effect=find),
+        ):
+            rank = await get_leaderboard_rank("course-1", ["student-1", "student-2"], "student-2")
+            outsider = await get_leaderboard_rank("course-1", ["student-1"], "student-2")
+
+        self.assertEqual(rank, 3)
+        self.assertIsNone(outsider)
+        self.assertEqual(counted[0]["user_id"], {"$in": ["student-1", "student-2"]})
+        self.assertEqual(
+            counted[0]["$or"],
+            [
+                {"points": {"$gt": 20}},
+                {"points": 20, "surname": {"$lt": "Petrov"}},
+                {"points": 20, "surname": "Petrov", "name": {"$lt": "Ivan"}},
+                {"points": 20, "surname": "Petrov", "name": "Ivan", "user_id": {"$lt": "student-2"}},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
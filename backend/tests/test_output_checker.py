@@ -0,0 +1,42 @@
+import unittest
+
+from services.output_checker import OutputChecker, build_output_checker, outputs_match
+
+
+class OutputCheckerTest(unittest.TestCase):
+    def test_exact_mode_matches_normalized_output(self):
+        self.assertTrue(outputs_match("  1\r\n2 \n\n", "1\n2"))
+        self.assertFalse(outputs_match("1 2", "1  2"))
+        self.assertFalse(outputs_match("1\n2\n3", "1\n2"))
+
+    def test_exact_checker_stops_at_first_mismatch(self):
+        checker = build_output_checker("1\n2\n3")
+
+        self.assertTrue(checker.feed("1\n"))
+        self.assertFalse(checker.feed("5\n"))
+        self.assertFalse(checker.finish())
+
+    def test_token_and_float_modes(self):
+        self.assertTrue(outputs_match("1   2\n\n3", "1 2 3", "tokens"))
+        self.assertFalse(outputs_match("12", "1 2", "tokens"))
+        self.assertTrue(outputs_match("0.3333333 yes", "0.333333333 yes", "float", 1e-6))
+        self.assertFalse(outputs_match("0.34", "0.3333", "float", 1e-6))
+
+    def test_unordered_lines_mode(self):
+        self.assertTrue(outputs_match("b\na\n", "a\nb", "unordered_lines"))
+        self.assertFalse(outputs_match("a\na", "a\nb", "unordered_lines"))
+
+    def test_checkers_accept_output_split_into_chunks(self):
+        for mode in ["exact", "tokens", "float", "unordered_lines"]:
+            checker = build_output_checker("10 20\n30", mode)
+            for char in "10 20\r\n30\n":
+                self.assertTrue(checker.feed(char), mode)
+            self.assertTrue(checker.finish(), mode)
+
+    def test_checker_without_a_verdict_cannot_be_created(self):
+        class FeedOnlyChecker(OutputChecker):
+            def feed(self, text: str) -> bool:
+                return True
+
+        with self.assertRaises(TypeError):
+            FeedOnlyChecker()
@@ -0,0 +1,25 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from services.progress_service import get_topics_progress
+
+
+class ProgressServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_topics_progress_handles_lessons_without_points(self):
+        topics = [
+            SimpleNamespace(id="topic-1", total_points=10),
+            SimpleNamespace(id="topic-2", total_points=0),
+        ]
+        summarize = AsyncMock(return_value={"topic-1": (5, 0)})
+
+        with patch("services.progress_service.TaskResultRecord.summarize_by", new=summarize):
+            progress = await get_topics_progress(topics, "student-1")
+
+        self.assertEqual(progress["topic-1"].progress_percent, 50.0)
+        self.assertEqual(progress["topic-2"].progress_percent, 0.0)
+        summarize.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
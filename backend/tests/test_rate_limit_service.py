@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+from services.rate_limit_service import MongoRateLimiter, TokenBucketLimiter
+
+
+class FakeCounters:
+    def __init__(self):
+        self.counts = {}
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        key = (query["key"], query["window_start"])
+        self.counts[key] = self.counts.get(key, 0) + update["$inc"]["hits"]
+        return {"hits": self.counts[key]}
+
+    async def find_one(self, query, _projection=None):
+        count = self.counts.get((query["key"], query["window_start"]))
+        return None if count is None else {"hits": count}
+
+
+class RateLimitServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_token_bucket_refills_over_the_window(self):
+        now = {"value": 0.0}
+        limiter = TokenBucketLimiter(clock=lambda: now["value"])
+
+        self.assertEqual([await limiter.consume("run:a", 2, 10) for _ in range(3)], [True, True, False])
+        now["value"] = 5.0
+        self.assertTrue(await limiter.consume("run:a", 2, 10))
+        self.assertFalse(await limiter.consume("run:a", 2, 10))
+
+    async def test_token_bucket_drops_idle_and_oldest_keys(self):
+        now = {"value": 0.0}
+        limiter = TokenBucketLimiter(max_keys=2, clock=lambda: now["value"])
+
+        for key in ("a", "b", "c"):
+            await limiter.consume(key, 1, 10)
+        self.assertEqual(len(limiter), 2)
+        # "a" was evicted, so it starts with a full bucket again.
+        self.assertTrue(await limiter.consume("a", 1, 10))
+
+        now["value"] = 30.0
+        await limiter.consume("d", 1, 10)
+        self.assertEqual(len(limiter), 1)
+
+    async def test_mongo_limiter_counts_across_windows_and_falls_back(self):
+        counters = FakeCounters()
+        now = {"value": 100.0}
+        limiter = MongoRateLimiter(clock=lambda: now["value"])
+
+        with patch("services.rate_limit_service.RateLimitCounter.get_motor_collection", return_value=counters):
+            self.assertEqual([await limiter.consume("submit:a", 2, 10) for _ in range(3)], [True, True, False])
+            self.assertEqual(counters.counts[("submit:a", 10)], 2)
+            # Half of the previous window still overlaps the sliding window.
+            now["value"] = 115.0
+            self.assertTrue(await limiter.consume("submit:a", 2, 10))
+            self.assertFalse(await limiter.consume("submit:a", 2, 10))
+
+        with patch(
+            "services.rate_limit_service.RateLimitCounter.get_motor_collection",
+            side_effect=RuntimeError("down"),
+        ):
+            self.assertTrue(await limiter.consume("submit:b", 1, 10))
+            self.assertFalse(await limiter.consume("submit:b", 1, 10))
@@ -0,0 +1,128 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from models.course import Course
+from models.task import TaskStatus, TaskSubmission, TaskSubmissionRef
+from models.user import UserType
+from services.progress_service import StudentProgress
+from services.serializer_service import build_dashboard_pending_reviews, serialize_courses
+
+
+def make_course(course_id: str, name: str) -> Course:
+    return Course.model_construct(
+        id=course_id,
+        name=name,
+        description="",
+        public_info="",
+        accent_color="#16a085",
+        cover_image="",
+        programming_language="python",
+        group_ids=[],
+        topic_ids=[],
+        teacher_ids=["teacher-1"],
+        student_ids=[],
+        schedule_weekdays=[],
+        schedule_start_time=None,
+        schedule_end_time=None,
+        total_points=40,
+        total_tasks=4,
+        has_manual_review_tasks=False,
+    )
+
+
+class SerializeCoursesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_courses_are_summarized_with_one_call_per_source(self):
+        courses = [make_course("course-1", "Python"), make_course("course-2", "Web")]
+        group = SimpleNamespace(
+            id="group-1",
+            name="Morning",
+            students=["student-1", "student-2"],
+            teachers=[],
+            schedule_slots=[],
+        )
+        user = SimpleNamespace(id="student-1", user_type=UserType.STUDENT)
+        groups = AsyncMock(return_value={"course-1": [group], "course-2": []})
+        progress = AsyncMock(return_value={"course-1": StudentProgress(points=10, solved=1, progress_percent=25.0)})
+        assignments = AsyncMock(return_value={"course-1": group})
+        finances = AsyncMock(return_value={"course-1": None})
+
+        with (
+            patch("services.serializer_service.get_groups_for_courses", new=groups),
+            patch("services.serializer_service.get_courses_progress", new=progress),
+            patch("services.serializer_service.get_student_group_assignments", new=assignments),
+            patch("services.serializer_service.build_course_finance_snapshots", new=finances),
+        ):
+            responses = await serialize_courses(courses, user)
+
+        for source in (groups, progress, assignments, finances):
+            source.assert_awaited_once()
+        finances.assert_awaited_once_with("student-1", [(courses[0], group)])
+        self.assertEqual(responses[0].total_students, 2)
+        self.assertEqual(responses[0].earned_points, 10)
+        self.assertEqual(responses[0].active_group_name, "Morning")
+        self.assertEqual(responses[1].earned_points, 0)
+        self.assertIsNone(responses[1].active_group_id)
+        self.assertFalse(responses[0].can_edit)
+
+
+
+class PendingReviewsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_reviews_are_read_from_the_pending_queue_page(self):
+        courses = [make_course("course-1", "Python"), make_course("course-2", "Web")]
+        courses[1].teacher_ids = ["teacher-2"]
+        teacher = SimpleNamespace(id="teacher-1", user_type=UserType.TEACHER)
+        submission = TaskSubmission(
+            code="print(42)",
+            passed=True,
+            passed_tests=1,
+            total_tests=1,
+            waiting_manual_review=True,
+            created_at=datetime(2026, 1, 1),
+        )
+        result = SimpleNamespace(
+            course_id="course-1",
+            topic_id="topic-1",
+            task_id="task-1",
+            user_id="student-1",
+            status=TaskStatus.PENDING_REVIEW,
+            attempts=2,
+            review_comment=None,
+            last_submission=TaskSubmissionRef.of("submission-1", submission),
+        )
+        documents = {
+            "topic-1": SimpleNamespace(id="topic-1", name="Intro"),
+            "task-1": SimpleNamespace(id="task-1", title="Print 42"),
+        }
+        student = SimpleNamespace(id="student-1", name="Ivan", surname="Petrov", tg_username="ivan")
+        groups = AsyncMock(return_value={"course-1": [], "course-2": []})
+        page = AsyncMock(return_value=([result], 7))
+
+        async def load_documents(_model, document_ids):
+            return [documents[document_id] for document_id in document_ids]
+
+        with (
+            patch("services.serializer_service.get_groups_for_courses", new=groups),
+            patch("services.serializer_service.get_pending_review_page", new=page),
+            patch("services.serializer_service.load_documents", new=load_documents),
+            patch("services.serializer_service.get_users_by_ids", new=AsyncMock(return_value=[student])),
+            patch(
+                "services.serializer_service.load_submissions",
+                new=AsyncMock(return_value={"submission-1": submission}),
+            ),
+        ):
+            reviews, total = await build_dashboard_pending_reviews(teacher, courses, offset=5, limit=1)
+
+        editable_courses, offset, limit = page.await_args.args
+        self.assertEqual((list(editable_courses), offset, limit), (["course-1"], 5, 1))
+        self.assertEqual(total, 7)
+        self.assertEqual(
+            (reviews[0].course_name, reviews[0].lesson_name, reviews[0].task_title, reviews[0].student_tg_username),
+            ("Python", "Intro", "Print 42", "ivan"),
+        )
+        self.assertEqual(reviews[0].last_submission.code, "print(42)")
+
+
+if __name__ == "__main__":
+    unittest.main()
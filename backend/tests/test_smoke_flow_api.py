@@ -16,6 +16,8 @@ from tests.test_support import (
     FakeTask,
     course_response,
     make_client,
+    patch_cache_versions,
+    patch_task_results,
     task_response_model,
     topic_response,
 )
@@ -62,6 +64,7 @@ class SmokeFlowApiTest(unittest.TestCase):
                 get_current_user_dependency: lambda: self.user,
             },
         )
+        self.enterContext(patch_cache_versions())
 
     def tearDown(self):
         self.app.dependency_overrides.clear()
@@ -85,6 +88,7 @@ class SmokeFlowApiTest(unittest.TestCase):
             stack.enter_context(patch("routers.courses.Topic.course_id", "course_id", create=True))
             stack.enter_context(patch("routers.courses.get_groups_for_course", new=AsyncMock(return_value=[])))
             stack.enter_context(patch("routers.courses.Topic.find", return_value=AsyncListResult([self.topic])))
+            stack.enter_context(patch("routers.courses.get_topics_progress", new=AsyncMock(return_value={})))
             stack.enter_context(
                 patch("routers.courses.serialize_course", new=AsyncMock(return_value=course_response()))
             )
@@ -104,6 +108,7 @@ class SmokeFlowApiTest(unittest.TestCase):
             stack.enter_context(patch("routers.topics.Task.topic_id", "topic_id", create=True))
             stack.enter_context(patch("routers.topics.Topic.find", return_value=AsyncListResult([self.topic])))
             stack.enter_context(patch("routers.topics.Task.find", return_value=AsyncListResult([self.task])))
+            stack.enter_context(patch("routers.topics.get_topics_progress", new=AsyncMock(return_value={})))
             stack.enter_context(
                 patch("routers.topics.serialize_course", new=AsyncMock(return_value=course_response()))
             )
@@ -120,9 +125,14 @@ class SmokeFlowApiTest(unittest.TestCase):
                 patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[self.course]))
             )
             stack.enter_context(patch("routers.tasks.can_edit_course", new=AsyncMock(return_value=False)))
+            stack.enter_context(
+                patch("routers.tasks.get_student_group_for_course", new=AsyncMock(return_value=None))
+            )
             stack.enter_context(patch("routers.tasks.Topic.get", new=AsyncMock(return_value=self.topic)))
             stack.enter_context(patch("routers.tasks.ensure_topic_access", new=AsyncMock(return_value=None)))
             stack.enter_context(patch("routers.tasks.run_python_solution", return_value=(True, 1, "42", "", [])))
+            stack.enter_context(patch("routers.tasks.store_submission", new=AsyncMock(return_value="submission-1")))
+            stack.enter_context(patch_task_results(self.task))
             stack.enter_context(
                 patch("routers.tasks.unlock_achievements_for_trigger", new=AsyncMock(return_value=[]))
             )
@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import submission_worker
+from submission_worker import process_submission
+
+
+class SubmissionWorkerTest(unittest.IsolatedAsyncioTestCase):
+    def patch_judging(self, judge, renew):
+        task = SimpleNamespace(id="task-1", language="python", tests=[], check_mode="exact", float_tolerance=1e-6)
+        record = AsyncMock(return_value=[])
+        complete = AsyncMock(return_value=True)
+        patches = [
+            patch("submission_worker.Task.get", new=AsyncMock(return_value=task)),
+            patch("submission_worker.User.get", new=AsyncMock(return_value=SimpleNamespace(id="student-1"))),
+            patch("submission_worker.get_task_course", new=AsyncMock(return_value=SimpleNamespace(id="course-1"))),
+            patch("submission_worker.judge_with_verdict_cache", new=judge),
+            patch("submission_worker.renew_submission_lease", new=renew),
+            patch("submission_worker.record_submission_result", new=record),
+            patch("submission_worker.complete_submission", new=complete),
+        ]
+        for item in patches:
+            item.start()
+            self.addCleanup(item.stop)
+        return record, complete
+
+    async def test_lease_is_renewed_while_judging(self):
+        async def judge(*_args):
+            await asyncio.sleep(0.05)
+            return (True, 1, "", "", [])
+
+        renew = AsyncMock(return_value=True)
+        record, complete = self.patch_judging(judge, renew)
+        job = SimpleNamespace(id="job-1", task_id="task-1", user_id="student-1", code="print(1)")
+
+        with patch.object(submission_worker, "QUEUE_HEARTBEAT_SECONDS", 0.01):
+            await process_submission(job)
+
+        self.assertGreater(renew.await_count, 2)
+        record.assert_awaited_once()
+        complete.assert_awaited_once_with(job, [])
+
+    async def test_verdict_is_dropped_when_the_lease_was_lost(self):
+        judge = AsyncMock(return_value=(True, 1, "", "", []))
+        record, complete = self.patch_judging(judge, AsyncMock(return_value=False))
+        job = SimpleNamespace(id="job-1", task_id="task-1", user_id="student-1", code="print(1)")
+
+        await process_submission(job)
+
+        record.assert_not_awaited()
+        complete.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+from contextlib import contextmanager
 from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -8,15 +10,41 @@ from schemas.responses import TaskResponse
 
 
 class AsyncListResult:
-    def __init__(self, items):
+    def __init__(self, items, count=None):
         self.items = list(items)
+        self.total = len(self.items) if count is None else count
 
-    async def to_list(self):
+    async def to_list(self, length=None):
         return list(self.items)
 
+    async def count(self):
+        return self.total
+
     def sort(self, *_args, **_kwargs):
         return self
 
+    def skip(self, _offset):
+        return self
+
+    def limit(self, _limit):
+        return self
+
+
+class FakeCacheVersions:
+    """In-memory ``cache_versions`` collection: key -> version."""
+
+    def __init__(self):
+        self.versions = {}
+
+    def find(self, query, _projection=None):
+        keys = query["key"]["$in"]
+        return AsyncListResult(
+            [{"key": key, "version": self.versions[key]} for key in keys if key in self.versions]
+        )
+
+    async def update_one(self, query, update, upsert=False):
+        self.versions[query["key"]] = self.versions.get(query["key"], 0) + update["$inc"]["version"]
+
 
 class FakeTopicRecord(SimpleNamespace):
     async def get_total_tasks(self):
@@ -35,6 +63,8 @@ class FakeTask:
         self.language = language
         self.requires_manual_review = requires_manual_review
         self.tests = list(tests or [])
+        self.check_mode = "exact"
+        self.float_tolerance = 1e-6
         self.results = [result] if result else []
         self.order = 0
         self.saved = False
@@ -60,6 +90,63 @@ class FakeTask:
         self.saved = True
 
 
+@contextmanager
+def patch_task_results(task, module="routers.tasks"):
+    """Keep task results of ``module`` in ``task.results`` instead of MongoDB."""
+
+    async def update_task_result(_task, _course_id, user_id, change):
+        result = task.upsert_result(user_id)
+        return result, change(result)
+
+    with patch(f"{module}.update_task_result", new=AsyncMock(side_effect=update_task_result)) as update:
+        yield update
+
+
+@contextmanager
+def patch_submission_history(submissions, module="routers.tasks"):
+    """Keep the submission history of ``module`` in ``submissions`` (task_id, user_id, submission).
+
+    A stored submission's id is ``submission-<index in submissions>``.
+    """
+
+    async def store_submission(task_id, user_id, submission):
+        submissions.append((task_id, user_id, submission.model_copy(deep=True)))
+        return f"submission-{len(submissions) - 1}"
+
+    async def mark_submission_reviewed(submission_id, comment):
+        if submission_id:
+            _task_id, _user_id, submission = submissions[int(submission_id.removeprefix("submission-"))]
+            submission.waiting_manual_review = False
+            submission.review_comment = comment
+
+    async def get_submission_page(task_id, user_id, offset, limit):
+        stored = sorted(
+            (
+                submission
+                for stored_task_id, stored_user_id, submission in submissions
+                if (stored_task_id, stored_user_id) == (task_id, user_id)
+            ),
+            key=lambda item: item.created_at,
+            reverse=True,
+        )
+        return stored[offset:offset + limit], len(stored)
+
+    with (
+        patch(f"{module}.store_submission", new=store_submission),
+        patch(f"{module}.mark_submission_reviewed", new=mark_submission_reviewed),
+        patch(f"{module}.get_submission_page", new=get_submission_page),
+    ):
+        yield submissions
+
+
+@contextmanager
+def patch_cache_versions():
+    """Keep the dashboard cache versions in memory instead of MongoDB."""
+    versions = FakeCacheVersions()
+    with patch("services.response_cache_service.CacheVersion.get_motor_collection", return_value=versions):
+        yield versions
+
+
 def make_client(*routers, overrides=None):
     app = FastAPI()
     for router in routers:
@@ -178,7 +265,6 @@ def task_response(
             }
             if status != "no_attempts"
             else None,
-            "submission_history": [],
         },
         "public_examples": [],
     }
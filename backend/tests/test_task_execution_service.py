@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from services.task_execution_service import RUN_LANE, SUBMIT_LANE, RunnerScheduler
+
+
+class RunnerSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_submissions_are_admitted_before_waiting_runs(self):
+        scheduler = RunnerScheduler(initial=2, maximum=2, reserved_for_submit=1, adaptive=False)
+        started = []
+
+        async def occupy(lane, name, release):
+            async with scheduler.slot(lane):
+                started.append(name)
+                await release.wait()
+
+        first_release = asyncio.Event()
+        later_release = asyncio.Event()
+        first = asyncio.create_task(occupy(RUN_LANE, "run-1", first_release))
+        await asyncio.sleep(0)
+        second_run = asyncio.create_task(occupy(RUN_LANE, "run-2", later_release))
+        await asyncio.sleep(0)
+        submit = asyncio.create_task(occupy(SUBMIT_LANE, "submit", later_release))
+        await asyncio.sleep(0)
+
+        # The second slot is reserved for submissions.
+        self.assertEqual(started, ["run-1", "submit"])
+
+        first_release.set()
+        await asyncio.sleep(0.01)
+        self.assertEqual(started, ["run-1", "submit", "run-2"])
+
+        later_release.set()
+        await asyncio.gather(first, second_run, submit)
+        self.assertEqual(scheduler.active, {SUBMIT_LANE: 0, RUN_LANE: 0})
+
+    async def test_limit_grows_additively_and_shrinks_under_load(self):
+        load = {"value": 0.2}
+        scheduler = RunnerScheduler(initial=2, minimum=1, maximum=4, load_probe=lambda: load["value"])
+
+        for _ in range(6):
+            scheduler.observe(0.0)
+        self.assertEqual(scheduler.capacity, 4)
+
+        load["value"] = 3.0
+        scheduler.observe(0.0)
+        self.assertEqual(scheduler.capacity, 3)
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = RunnerScheduler(initial=1, maximum=1, adaptive=False)
+        await scheduler.acquire(SUBMIT_LANE)
+        waiter = asyncio.create_task(scheduler.acquire(SUBMIT_LANE))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        scheduler.release(SUBMIT_LANE)
+
+        self.assertEqual(scheduler.active[SUBMIT_LANE], 0)
+        self.assertEqual(scheduler.stats()["waiting"][SUBMIT_LANE], 0)
+
+    async def test_owners_share_the_queue_round_robin(self):
+        scheduler = RunnerScheduler(initial=1, maximum=1, reserved_for_submit=0, adaptive=False)
+        holder = await scheduler.acquire(SUBMIT_LANE, "holder")
+        greedy = [scheduler.enqueue(SUBMIT_LANE, "greedy") for _ in range(3)]
+        polite = scheduler.enqueue(SUBMIT_LANE, "polite")
+        teacher = scheduler.enqueue(SUBMIT_LANE, "teacher", weight=2.0)
+
+        self.assertEqual(scheduler.position(greedy[2]), 5)
+        self.assertEqual(scheduler.position(polite), 3)
+        self.assertEqual(scheduler.position(teacher), 1)
+
+        order = []
+        for _ in range(5):
+            scheduler.release(holder.lane)
+            holder = next(ticket for ticket in [*greedy, polite, teacher] if ticket.admitted and ticket not in order)
+            order.append(holder)
+
+        self.assertEqual(order, [teacher, greedy[0], polite, greedy[1], greedy[2]])
+        self.assertEqual(scheduler.stats()["waiting_owners"], 0)
@@ -0,0 +1,162 @@
+import unittest
+from contextlib import ExitStack
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from models.submission_record import SubmissionRecord
+from models.task import Task, TaskResult, TaskStatus
+from models.task_result_record import TaskResultRecord
+from models.topic import Topic
+from models.user import User
+from services.task_result_service import get_pending_review_page, save_task_result, update_task_result
+from tests.test_support import AsyncListResult
+
+
+class FakeResults:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+        self.calls = []
+
+    async def update_one(self, query, update):
+        self.calls.append((query, update))
+        return SimpleNamespace(matched_count=self.matched_count)
+
+
+class FakePendingQueue:
+    """Runs the lookup, skip, limit and count stages of a pending queue pipeline over ``rows``."""
+
+    def __init__(self, rows, existing):
+        self.rows = rows
+        self.existing = existing
+
+    def aggregate(self, pipeline):
+        rows = list(self.rows)
+        for stage in pipeline:
+            if "$lookup" in stage:
+                lookup = stage["$lookup"]
+                field = lookup["let"]["ref"]["$convert"]["input"].lstrip("$")
+                rows = [row for row in rows if self.read(row, field) in self.existing[lookup["from"]]]
+            elif "$skip" in stage:
+                rows = rows[stage["$skip"]:]
+            elif "$limit" in stage:
+                rows = rows[:stage["$limit"]]
+            elif "$count" in stage:
+                rows = [{"total": len(rows)}]
+        return AsyncListResult(rows)
+
+    @staticmethod
+    def read(row, field):
+        for part in field.split("."):
+            row = row.get(part) if row else None
+        return row
+
+
+class TaskResultServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_save_only_sets_state_of_the_version_it_read(self):
+        result = TaskResultRecord.model_construct(
+            id="result-1",
+            user_id="student-1",
+            task_id="task-1",
+            course_id="course-1",
+            topic_id="topic-1",
+            version=3,
+            score=10,
+            status=TaskStatus.CORRECT,
+            attempts=2,
+        )
+        collection = FakeResults(matched_count=1)
+
+        with patch.object(TaskResultRecord, "get_motor_collection", return_value=collection):
+            self.assertTrue(await save_task_result(result))
+
+        query, update = collection.calls[0]
+        self.assertEqual(query, {"_id": "result-1", "version": 3})
+        self.assertEqual(update["$inc"], {"version": 1})
+        self.assertEqual(update["$set"]["attempts"], 2)
+        self.assertNotIn("task_id", update["$set"])
+        self.assertEqual(result.version, 4)
+
+        collection.matched_count = 0
+        with patch.object(TaskResultRecord, "get_motor_collection", return_value=collection):
+            self.assertFalse(await save_task_result(result))
+
+    async def test_pending_review_page_leaves_out_results_with_missing_references_before_counting(self):
+        ids = {name: str(ObjectId()) for name in ["task", "gone", "topic", "student", "s1", "s2", "s3"]}
+        rows = [
+            {
+                "_id": ObjectId(),
+                "user_id": ids["student"],
+                "task_id": ids[task],
+                "course_id": "course-1",
+                "topic_id": ids["topic"],
+                "status": TaskStatus.PENDING_REVIEW.value,
+                "last_submission": {
+                    "submission_id": ids[submission],
+                    "passed": True,
+                    "passed_tests": 1,
+                    "total_tests": 1,
+                    "created_at": datetime(2026, 1, day),
+                },
+            }
+            for task, submission, day in [("task", "s1", 3), ("gone", "s2", 2), ("task", "s3", 1)]
+        ]
+        queue = FakePendingQueue(
+            rows,
+            {
+                "tasks": {ids["task"]},
+                "topics": {ids["topic"]},
+                "users": {ids["student"]},
+                "submissions": {ids["s1"], ids["s2"], ids["s3"]},
+            },
+        )
+
+        with ExitStack() as stack:
+            stack.enter_context(patch.object(TaskResultRecord, "get_motor_collection", return_value=queue))
+            for model, name in [(Task, "tasks"), (Topic, "topics"), (User, "users"), (SubmissionRecord, "submissions")]:
+                stack.enter_context(patch.object(model, "get_motor_collection", return_value=SimpleNamespace(name=name)))
+            first, total = await get_pending_review_page(["course-1"], 0, 1)
+            second, _total = await get_pending_review_page(["course-1"], 1, 1)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(first[0].last_submission.submission_id, ids["s1"])
+        self.assertEqual(second[0].last_submission.submission_id, ids["s3"])
+
+    async def test_update_rereads_retries_and_moves_the_leaderboard_once(self):
+        task = SimpleNamespace(id="task-1", topic_id="topic-1")
+        reads = [TaskResult(user_id="student-1", attempts=1), TaskResult(user_id="student-1", attempts=2)]
+
+        def add_attempt(result):
+            result.attempts += 1
+            result.score = 10
+            result.status = TaskStatus.CORRECT
+            return result.attempts
+
+        with (
+            patch("services.task_result_service.get_or_create_task_result", new=AsyncMock(side_effect=reads)),
+            patch("services.task_result_service.save_task_result", new=AsyncMock(side_effect=[False, True])),
+            patch("services.task_result_service.record_score_change", new=AsyncMock()) as score_change,
+        ):
+            result, attempts = await update_task_result(task, "course-1", "student-1", add_attempt)
+
+        self.assertIs(result, reads[1])
+        self.assertEqual(attempts, 3)
+        score_change.assert_awaited_once_with("course-1", "student-1", points=10, solved=1)
+
+    async def test_update_gives_up_after_repeated_conflicts(self):
+        task = SimpleNamespace(id="task-1", topic_id="topic-1")
+
+        with (
+            patch(
+                "services.task_result_service.get_or_create_task_result",
+                new=AsyncMock(side_effect=lambda *_args: TaskResult(user_id="student-1")),
+            ),
+            patch("services.task_result_service.save_task_result", new=AsyncMock(return_value=False)),
+        ):
+            with self.assertRaises(HTTPException) as context:
+                await update_task_result(task, "course-1", "student-1", lambda _result: None)
+
+        self.assertEqual(context.exception.status_code, 409)
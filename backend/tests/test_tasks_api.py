@@ -1,17 +1,32 @@
+import asyncio
 import unittest
+from datetime import datetime
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
-from models.task import TaskResult, TaskStatus, TaskSubmission
+from models.submission_job import SubmissionJob, SubmissionJobStatus
+from models.task import TaskResult, TaskStatus, TaskSubmission, TaskSubmissionRef, TaskTestRunResult
 from models.user import UserType
-from routers.tasks import router as tasks_router
+from routers.tasks import record_submission_result, router as tasks_router
 from services.auth_service import get_current_user_dependency
+from services.verdict_cache_service import verdict_cache
 
-from tests.test_support import FakeTask, make_client, task_response_model
+from tests.test_support import (
+    FakeTask,
+    make_client,
+    patch_cache_versions,
+    patch_submission_history,
+    patch_task_results,
+    task_response_model,
+)
 
 
 class TasksApiTest(unittest.TestCase):
+    def setUp(self):
+        self.versions = self.enterContext(patch_cache_versions())
+
     def tearDown(self):
+        verdict_cache.clear()
         if hasattr(self, "app"):
             self.app.dependency_overrides.clear()
 
@@ -29,6 +44,7 @@ class TasksApiTest(unittest.TestCase):
             patch("routers.tasks.Task.get", new=AsyncMock(return_value=task)),
             patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
             patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.tasks.get_student_group_for_course", new=AsyncMock(return_value=None)),
             patch("routers.tasks.can_edit_course", new=AsyncMock(return_value=False)),
             patch("routers.tasks.Topic.get", new=AsyncMock(return_value=topic)),
             patch("routers.tasks.ensure_topic_access", new=AsyncMock(return_value=None)),
@@ -58,6 +74,7 @@ class TasksApiTest(unittest.TestCase):
             patch("routers.tasks.Task.get", new=AsyncMock(return_value=task)),
             patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
             patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.tasks.get_student_group_for_course", new=AsyncMock(return_value=None)),
             patch("routers.tasks.can_edit_course", new=AsyncMock(return_value=False)),
             patch("routers.tasks.Topic.get", new=AsyncMock(return_value=topic)),
             patch("routers.tasks.ensure_topic_access", new=AsyncMock(return_value=None)),
@@ -107,7 +124,7 @@ class TasksApiTest(unittest.TestCase):
             tasks_router,
             overrides={get_current_user_dependency: lambda: teacher},
         )
-        topic = SimpleNamespace(id="topic-1", course_id="course-1", task_ids=[], touch=lambda: None, save=AsyncMock())
+        topic = SimpleNamespace(id="topic-1", course_id="course-1", task_ids=[], update=AsyncMock())
         course = SimpleNamespace(id="course-1", programming_language="javascript")
         created_tasks = []
 
@@ -136,6 +153,7 @@ class TasksApiTest(unittest.TestCase):
             patch("routers.tasks.Course.get", new=AsyncMock(return_value=course)),
             patch("routers.tasks.can_edit_course", new=AsyncMock(return_value=True)),
             patch("routers.tasks.Task", CapturedTask),
+            patch("routers.tasks.apply_task_change", new=AsyncMock()) as apply_task_change,
         ):
             response = client.post(
                 "/task/add",
@@ -149,6 +167,14 @@ class TasksApiTest(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(created_tasks[0].language, "javascript")
+        self.assertEqual(topic.update.await_args.args[0]["$addToSet"], {"task_ids": "task-1"})
+        apply_task_change.assert_awaited_once_with(
+            course,
+            topic,
+            points=10,
+            tasks=1,
+            manual_review_changed=False,
+        )
 
     def test_topic_route_is_not_shadowed_by_task_detail_route(self):
         user = SimpleNamespace(id="student-1", user_type=UserType.STUDENT)
@@ -168,6 +194,7 @@ class TasksApiTest(unittest.TestCase):
             patch("routers.tasks.ensure_topic_access", new=AsyncMock(return_value=None)),
             patch("routers.tasks.Task.topic_id", "topic_id", create=True),
             patch("routers.tasks.Task.find", return_value=SimpleNamespace(to_list=AsyncMock(return_value=[task]))),
+            patch("services.serializer_service.get_task_result", new=AsyncMock(return_value=None)),
         ):
             response = client.get("/task/topic/topic-1")
 
@@ -180,18 +207,20 @@ class TasksApiTest(unittest.TestCase):
             tasks_router,
             overrides={get_current_user_dependency: lambda: teacher},
         )
+        submission = TaskSubmission(
+            code="print(42)",
+            passed=True,
+            passed_tests=1,
+            total_tests=1,
+            waiting_manual_review=True,
+        )
         result = TaskResult(
             user_id="student-1",
             status=TaskStatus.PENDING_REVIEW,
             attempts=1,
-            last_submission=TaskSubmission(
-                code="print(42)",
-                passed=True,
-                passed_tests=1,
-                total_tests=1,
-                waiting_manual_review=True,
-            ),
+            last_submission=TaskSubmissionRef.of("submission-0", submission),
         )
+        history = [("task-1", "student-1", submission.model_copy(deep=True))]
         task = FakeTask(result=result, requires_manual_review=True)
         course = SimpleNamespace(id="course-1")
         student = SimpleNamespace(
@@ -214,6 +243,8 @@ class TasksApiTest(unittest.TestCase):
             patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
             patch("routers.tasks.can_edit_course", new=AsyncMock(return_value=True)),
             patch("routers.tasks.User.get", new=AsyncMock(return_value=student)),
+            patch_task_results(task),
+            patch_submission_history(history),
             patch("routers.tasks.unlock_achievements_for_trigger", new=AsyncMock(return_value=[])),
             patch("routers.tasks.serialize_task", new=serialize_task_response),
         ):
@@ -221,11 +252,248 @@ class TasksApiTest(unittest.TestCase):
                 "/task/task-1/review/student-1",
                 json={"approve": True, "comment": "Looks good"},
             )
+            history_response = client.get("/task/task-1/submissions?student_id=student-1")
 
         self.assertEqual(response.status_code, 200)
         payload = response.json()
         self.assertEqual(payload["result"]["status"], "correct")
         self.assertEqual(payload["result"]["score"], 10)
+        self.assertEqual(history_response.status_code, 200)
+        reviewed = history_response.json()["items"][0]
+        self.assertFalse(reviewed["waiting_manual_review"])
+        self.assertEqual(reviewed["review_comment"], "Looks good")
+        self.assertEqual(self.versions.versions, {"dashboard": 1})
+
+    def test_review_queue_is_paginated_per_course(self):
+        teacher = SimpleNamespace(id="teacher-1", user_type=UserType.TEACHER)
+        client, self.app = make_client(
+            tasks_router,
+            overrides={get_current_user_dependency: lambda: teacher},
+        )
+        courses = [SimpleNamespace(id="course-1"), SimpleNamespace(id="course-2")]
+        build_reviews = AsyncMock(return_value=([], 12))
+
+        with (
+            patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=courses)),
+            patch("routers.tasks.build_dashboard_pending_reviews", new=build_reviews),
+        ):
+            response = client.get("/task/reviews?course_id=course-2&offset=10&limit=5")
+            missing = client.get("/task/reviews?course_id=course-3")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"items": [], "total": 12, "offset": 10, "limit": 5})
+        build_reviews.assert_awaited_once_with(teacher, [courses[1]], 10, 5)
+        self.assertEqual(missing.status_code, 404)
+
+    def test_queued_submit_returns_job_without_running_code(self):
+        user = SimpleNamespace(id="student-1", user_type=UserType.STUDENT)
+        client, self.app = make_client(
+            tasks_router,
+            overrides={get_current_user_dependency: lambda: user},
+        )
+        task = FakeTask(requires_manual_review=False)
+        course = SimpleNamespace(id="course-1")
+        job = SubmissionJob.model_construct(
+            id="job-1",
+            task_id="task-1",
+            user_id="student-1",
+            code="print(42)",
+            status=SubmissionJobStatus.QUEUED,
+            created_at=datetime(2026, 3, 19),
+            started_at=None,
+            finished_at=None,
+            error=None,
+        )
+        enqueue = AsyncMock(return_value=job)
+
+        with (
+            patch("routers.tasks.Task.get", new=AsyncMock(return_value=task)),
+            patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
+            patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.tasks.Topic.get", new=AsyncMock(return_value=None)),
+            patch("routers.tasks.enqueue_submission", new=enqueue),
+            patch("routers.tasks.run_python_solution") as run_solution,
+            patch("services.serializer_service.get_queue_position", new=AsyncMock(return_value=3)),
+        ):
+            response = client.post(
+                "/task/task-1/submit?queued=true",
+                json={"code": "print(42)"},
+            )
+
+        self.assertEqual(response.status_code, 202)
+        payload = response.json()
+        self.assertEqual(payload["id"], "job-1")
+        self.assertEqual(payload["status"], "queued")
+        self.assertEqual(payload["queue_position"], 3)
+        enqueue.assert_awaited_once_with("task-1", "student-1", "print(42)")
+        run_solution.assert_not_called()
+        self.assertFalse(task.saved)
+
+    def test_job_detail_hides_other_students_jobs(self):
+        user = SimpleNamespace(id="student-2", user_type=UserType.STUDENT)
+        client, self.app = make_client(
+            tasks_router,
+            overrides={get_current_user_dependency: lambda: user},
+        )
+        job = SimpleNamespace(id="job-1", user_id="student-1")
+
+        with patch("routers.tasks.SubmissionJob.get", new=AsyncMock(return_value=job)):
+            response = client.get("/task/jobs/job-1")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_submission_history_is_paginated_and_hides_hidden_tests(self):
+        user = SimpleNamespace(id="student-1", user_type=UserType.STUDENT)
+        client, self.app = make_client(
+            tasks_router,
+            overrides={get_current_user_dependency: lambda: user},
+        )
+        task = FakeTask(requires_manual_review=False)
+        course = SimpleNamespace(id="course-1")
+        submission = TaskSubmission(
+            code="print(41)",
+            passed=False,
+            passed_tests=0,
+            total_tests=1,
+            test_results=[TaskTestRunResult(input_data="secret", expected_output="42", is_public=False)],
+        )
+        page = AsyncMock(return_value=([submission], 7))
+
+        with (
+            patch("routers.tasks.Task.get", new=AsyncMock(return_value=task)),
+            patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
+            patch("routers.tasks.can_edit_course", new=AsyncMock(return_value=False)),
+            patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.tasks.get_submission_page", new=page),
+        ):
+            response = client.get("/task/task-1/submissions?offset=5&limit=5")
+            foreign = client.get("/task/task-1/submissions?student_id=student-2")
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["total"], 7)
+        self.assertEqual(payload["items"][0]["code"], "print(41)")
+        self.assertEqual(payload["items"][0]["test_results"][0]["input_data"], "")
+        page.assert_awaited_once_with("task-1", "student-1", 5, 5)
+        self.assertEqual(foreign.status_code, 403)
+
+    def test_streaming_submit_pushes_each_test_then_verdict(self):
+        user = SimpleNamespace(
+            id="student-1",
+            user_type=UserType.STUDENT,
+            award_points=lambda _points: None,
+            save=AsyncMock(),
+        )
+        client, self.app = make_client(
+            tasks_router,
+            overrides={get_current_user_dependency: lambda: user},
+        )
+        task = FakeTask(requires_manual_review=False)
+        course = SimpleNamespace(id="course-1")
+        hidden_result = TaskTestRunResult(
+            input_data="secret",
+            expected_output="42",
+            actual_output="42",
+            passed=True,
+            is_public=False,
+        )
+
+        def run_solution(_code, _tests, on_test_result=None, **_kwargs):
+            on_test_result(hidden_result)
+            return True, 1, "42", "", [hidden_result]
+
+        async def serialize_task_response(task_obj, *_args, **_kwargs):
+            current = task_obj.get_result_for_student("student-1")
+            return task_response_model(status=current.status.value, score=current.score, attempts=1)
+
+        with (
+            patch("routers.tasks.Task.get", new=AsyncMock(return_value=task)),
+            patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
+            patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.tasks.get_student_group_for_course", new=AsyncMock(return_value=None)),
+            patch("routers.tasks.Topic.get", new=AsyncMock(return_value=None)),
+            patch("routers.tasks.run_python_solution", side_effect=run_solution),
+            patch("routers.tasks.store_submission", new=AsyncMock(return_value="submission-1")),
+            patch_task_results(task) as update_task_result,
+            patch("routers.tasks.unlock_achievements_for_trigger", new=AsyncMock(return_value=[])),
+            patch("routers.tasks.serialize_task", new=serialize_task_response),
+        ):
+            response = client.post("/task/task-1/submit/stream", json={"code": "print(42)"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = [
+            block.split("\n", 1)
+            for block in response.text.strip().split("\n\n")
+        ]
+        self.assertEqual([name for name, _data in events], ["event: test", "event: result"])
+        self.assertIn('"index": 1', events[0][1])
+        self.assertNotIn("secret", events[0][1])
+        self.assertIn('"status":"correct"', events[1][1])
+        update_task_result.assert_awaited_once()
+        self.assertEqual(self.versions.versions, {"dashboard:student-1": 1})
+
+    def test_submission_entering_review_makes_every_dashboard_stale(self):
+        user = SimpleNamespace(id="student-1", award_points=lambda _points: None, save=AsyncMock())
+        task = FakeTask(requires_manual_review=True)
+        passed = TaskTestRunResult(input_data="", expected_output="42", actual_output="42", passed=True)
+
+        with (
+            patch_task_results(task),
+            patch_submission_history([]),
+            patch("routers.tasks.unlock_achievements_for_trigger", new=AsyncMock(return_value=[])),
+        ):
+            asyncio.run(
+                record_submission_result(task, user, SimpleNamespace(id="course-1"), "print(42)", (True, 1, "42", "", [passed]))
+            )
+
+        self.assertEqual(task.get_result_for_student("student-1").status, TaskStatus.PENDING_REVIEW)
+        self.assertEqual(self.versions.versions, {"dashboard": 1})
+
+    def test_result_points_at_the_stored_submission(self):
+        user = SimpleNamespace(id="student-1", award_points=lambda _points: None, save=AsyncMock())
+        solved = TaskResult(user_id="student-1", status=TaskStatus.CORRECT, score=10, attempts=1)
+        task = FakeTask(result=solved, requires_manual_review=True)
+        passed = TaskTestRunResult(input_data="", expected_output="42", actual_output="42", passed=True)
+        history = []
+
+        with (
+            patch_task_results(task),
+            patch_submission_history(history),
+            patch("routers.tasks.unlock_achievements_for_trigger", new=AsyncMock(return_value=[])),
+        ):
+            asyncio.run(
+                record_submission_result(task, user, SimpleNamespace(id="course-1"), "print(42)", (True, 1, "42", "", [passed]))
+            )
+
+        result = task.get_result_for_student("student-1")
+        self.assertEqual(result.last_submission.submission_id, "submission-0")
+        self.assertEqual(result.best_submission.submission_id, "submission-0")
+        self.assertEqual(history[0][2].code, "print(42)")
+        self.assertFalse(history[0][2].waiting_manual_review)
+
+    def test_streaming_submit_logs_a_failed_judge(self):
+        user = SimpleNamespace(id="student-1", user_type=UserType.STUDENT)
+        client, self.app = make_client(
+            tasks_router,
+            overrides={get_current_user_dependency: lambda: user},
+        )
+        task = FakeTask(requires_manual_review=False)
+        course = SimpleNamespace(id="course-1")
+
+        with (
+            patch("routers.tasks.Task.get", new=AsyncMock(return_value=task)),
+            patch("routers.tasks.get_task_course", new=AsyncMock(return_value=course)),
+            patch("routers.tasks.get_courses_for_user", new=AsyncMock(return_value=[course])),
+            patch("routers.tasks.get_student_group_for_course", new=AsyncMock(return_value=None)),
+            patch("routers.tasks.Topic.get", new=AsyncMock(return_value=None)),
+            patch("routers.tasks.run_python_solution", side_effect=RuntimeError("runner crashed")),
+            self.assertLogs("tasks", level="ERROR") as logs,
+        ):
+            response = client.post("/task/task-1/submit/stream", json={"code": "print(42)"})
+
+        self.assertIn("event: error", response.text)
+        self.assertIn("runner crashed", logs.output[0])
 
 
 if __name__ == "__main__":
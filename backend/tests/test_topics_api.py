@@ -42,6 +42,7 @@ class TopicDetailApiTest(unittest.TestCase):
             patch("routers.topics.Topic.find", return_value=AsyncListResult([topic])),
             patch("routers.topics.Task.find", return_value=AsyncListResult([task])),
             patch("routers.topics.lesson_is_available_for_user", new=AsyncMock(return_value=True)),
+            patch("routers.topics.get_topics_progress", new=AsyncMock(return_value={})) as topics_progress,
             patch("routers.topics.serialize_course", new=AsyncMock(return_value=course_response())),
             patch("routers.topics.serialize_topic", new=AsyncMock(return_value=topic_response())),
             patch("routers.topics.serialize_task", new=AsyncMock(return_value=task_response())),
@@ -54,6 +55,7 @@ class TopicDetailApiTest(unittest.TestCase):
         self.assertEqual(payload["lesson"]["id"], "topic-1")
         self.assertEqual(len(payload["tasks"]), 1)
         self.assertEqual(payload["tasks"][0]["id"], "task-1")
+        topics_progress.assert_awaited_once_with([topic], str(self.user.id))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+from models.user import User
+from services.user_service import get_tg_usernames_by_user_ids, get_user_ids_by_tg_usernames, get_users_by_ids
+from tests.test_support import AsyncListResult
+
+
+class UserServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_bulk_lookups_use_one_query_and_keep_input_order(self):
+        users = [
+            SimpleNamespace(id="65f000000000000000000001", tg_username="anna"),
+            SimpleNamespace(id="65f000000000000000000002", tg_username="boris"),
+        ]
+        queries = []
+
+        def find(query):
+            queries.append(query)
+            return AsyncListResult(users)
+
+        with patch.object(User, "find", side_effect=find):
+            user_ids = await get_user_ids_by_tg_usernames(["boris", "nobody", "anna"])
+            usernames = await get_tg_usernames_by_user_ids(
+                ["65f000000000000000000002", "65f000000000000000000009", "65f000000000000000000001"]
+            )
+
+        self.assertEqual(user_ids, ["65f000000000000000000002", "65f000000000000000000001"])
+        self.assertEqual(usernames, ["boris", "anna"])
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(queries[0], {"tg_username": {"$in": ["boris", "nobody", "anna"]}})
+
+    async def test_bulk_lookups_let_database_errors_through(self):
+        error = ServerSelectionTimeoutError("no primary")
+
+        with patch.object(User, "find", side_effect=error):
+            with self.assertRaises(ServerSelectionTimeoutError):
+                await get_users_by_ids(["65f000000000000000000001", "65f000000000000000000002"])
+            with self.assertRaises(ServerSelectionTimeoutError):
+                await get_user_ids_by_tg_usernames(["anna"])
+
+
+if __name__ == "__main__":
+    unittest.main()
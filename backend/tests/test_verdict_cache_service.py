@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from models.task import TaskTestCase, TaskTestRunResult
+from services.verdict_cache_service import (
+    VerdictCache,
+    get_cached_solution,
+    program_cache_key,
+    solution_cache_key,
+    store_program,
+    store_solution,
+    verdict_cache,
+)
+
+
+class VerdictCacheServiceTest(unittest.TestCase):
+    def tearDown(self):
+        verdict_cache.clear()
+
+    def test_solution_key_ignores_line_endings_but_tracks_tests(self):
+        tests = [TaskTestCase(input_data="1", expected_output="2")]
+
+        self.assertEqual(
+            solution_cache_key("python", "print(2)\r\n\r\n", tests),
+            solution_cache_key("python", "print(2)", tests),
+        )
+        self.assertNotEqual(
+            solution_cache_key("python", "print(2)", tests),
+            solution_cache_key("python", "print(2)", [TaskTestCase(input_data="1", expected_output="3")]),
+        )
+        self.assertNotEqual(
+            solution_cache_key("python", "print(2)", tests),
+            solution_cache_key("javascript", "print(2)", tests),
+        )
+
+    def test_cached_solution_round_trips_as_fresh_copy(self):
+        key = solution_cache_key("python", "print(2)", [TaskTestCase(expected_output="2")])
+        outcome = (True, 1, "2", "", [TaskTestRunResult(expected_output="2", actual_output="2", passed=True)])
+
+        asyncio.run(store_solution(key, outcome, "task-1"))
+        cached = asyncio.run(get_cached_solution(key))
+
+        self.assertEqual(cached, outcome)
+        self.assertIsNot(cached[4][0], outcome[4][0])
+
+    def test_timeouts_are_not_cached(self):
+        key = program_cache_key("python", "while True: pass", "")
+
+        asyncio.run(store_program(key, (False, 0, "", "Time limit exceeded (2s)", True)))
+
+        self.assertIsNone(verdict_cache.get(key))
+
+    def test_lru_evicts_oldest_and_ttl_expires(self):
+        cache = VerdictCache(max_entries=2, ttl_seconds=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+        with patch("services.verdict_cache_service.time.monotonic", return_value=10**9):
+            self.assertIsNone(cache.get("a"))
+
+    def test_invalidate_task_drops_only_its_entries(self):
+        cache = VerdictCache()
+        cache.set("a", 1, task_id="task-1")
+        cache.set("b", 2, task_id="task-2")
+
+        cache.invalidate_task("task-1")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
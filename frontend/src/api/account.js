@@ -10,6 +10,10 @@ export async function getDashboard() {
   return api("/users/dashboard");
 }
 
+export async function getDashboardSection(section, { offset = 0, limit = 50 } = {}) {
+  return api(`/users/dashboard/${section}?offset=${offset}&limit=${limit}`);
+}
+
 export async function getProfile() {
   return api("/users/profile");
 }
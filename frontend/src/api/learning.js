@@ -14,6 +14,11 @@ export async function getCourseDetail(courseId) {
   return api(`/course/${courseId}`);
 }
 
+export async function getCourseLeaderboard(courseId, { groupId = "", offset = 0, limit = 20 } = {}) {
+  const group = groupId ? `&group_id=${groupId}` : "";
+  return api(`/course/${courseId}/leaderboard?offset=${offset}&limit=${limit}${group}`);
+}
+
 export async function getPublicCourseDetail(courseId) {
   return api(`/course/public/${courseId}`, { auth: false });
 }
@@ -149,6 +154,81 @@ export async function submitTask(taskId, payload) {
   });
 }
 
+function parseEventBlock(block) {
+  let event = "message";
+  const dataLines = [];
+  block.split("\n").forEach((line) => {
+    if (line.startsWith("event:")) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith("data:")) {
+      dataLines.push(line.slice(5).trim());
+    }
+  });
+  return { event, data: dataLines.length ? JSON.parse(dataLines.join("\n")) : null };
+}
+
+export async function submitTaskStream(taskId, payload, onTestResult, onQueuePosition) {
+  const headers = { "Content-Type": "application/json" };
+  const token = getToken();
+  if (token) {
+    headers.Authorization = `Bearer ${token}`;
+  }
+
+  const res = await fetch(`${API_URL}/task/${taskId}/submit/stream`, {
+    method: "POST",
+    headers,
+    body: JSON.stringify(payload),
+  });
+
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    let data;
+    try {
+      data = text ? JSON.parse(text) : null;
+    } catch {
+      data = text;
+    }
+    const msg = (data && (data.detail || data.message)) || res.statusText;
+    throw new Error(msg);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const { event, data } = parseEventBlock(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      if (event === "test" && onTestResult) {
+        onTestResult(data);
+      } else if (event === "queue" && onQueuePosition) {
+        onQueuePosition(data.position);
+      } else if (event === "result") {
+        result = data;
+      } else if (event === "error") {
+        throw new Error(data?.detail || "Не удалось проверить решение");
+      }
+    }
+  }
+
+  if (!result) {
+    throw new Error("Проверка решения прервалась");
+  }
+  return result;
+}
+
+export async function getTaskSubmissions(taskId, { offset = 0, limit = 20 } = {}) {
+  return api(`/task/${taskId}/submissions?offset=${offset}&limit=${limit}`);
+}
+
 export async function runTaskCode(taskId, payload) {
   return api(`/task/${taskId}/run`, {
     method: "POST",
@@ -162,3 +242,8 @@ export async function reviewTaskSubmission(taskId, studentId, payload) {
     body: payload,
   });
 }
+
+export async function getPendingReviews({ courseId = "", offset = 0, limit = 20 } = {}) {
+  const course = courseId ? `&course_id=${courseId}` : "";
+  return api(`/task/reviews?offset=${offset}&limit=${limit}${course}`);
+}
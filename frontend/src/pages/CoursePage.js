@@ -9,6 +9,7 @@ import {
   createLesson,
   deleteCourseGroup,
   getCourseDetail,
+  getCourseLeaderboard,
   uploadCourseCover,
   updateCourse,
   updateCourseGroup,
@@ -133,6 +134,8 @@ function CoursePage() {
   const [coverUploading, setCoverUploading] = useState(false);
   const [activeTab, setActiveTab] = useState("lessons");
   const [selectedRatingGroupId, setSelectedRatingGroupId] = useState("");
+  const [leaderboardPage, setLeaderboardPage] = useState(null);
+  const [leaderboardLoading, setLeaderboardLoading] = useState(false);
 
   const applyCourseResponse = useCallback((response) => {
     setData(response);
@@ -188,6 +191,39 @@ function CoursePage() {
     [ratingGroups, selectedRatingGroupId]
   );
 
+  const loadLeaderboard = useCallback(
+    async (groupId, offset = 0) => {
+      setLeaderboardLoading(true);
+      try {
+        const page = await getCourseLeaderboard(courseId, { groupId, offset });
+        setLeaderboardPage((current) => ({
+          groupId,
+          items: offset > 0 && current?.groupId === groupId ? [...current.items, ...page.items] : page.items,
+          total: page.total,
+          myRank: page.my_rank,
+        }));
+      } catch (err) {
+        setError(err.message);
+      } finally {
+        setLeaderboardLoading(false);
+      }
+    },
+    [courseId]
+  );
+
+  const selectedRatingGroupKey = selectedRatingGroup?.id || "";
+
+  useEffect(() => {
+    if (activeTab === "rating" && selectedRatingGroupKey) {
+      loadLeaderboard(selectedRatingGroupKey);
+    }
+  }, [activeTab, loadLeaderboard, selectedRatingGroupKey]);
+
+  const leaderboardEntries =
+    leaderboardPage && leaderboardPage.groupId === selectedRatingGroup?.id
+      ? leaderboardPage.items
+      : selectedRatingGroup?.leaderboard || EMPTY_LIST;
+
   const availableStudents = allStudents.length > 0 ? allStudents : students;
 
   const selectedEditorStudents = useMemo(() => {
@@ -827,13 +863,16 @@ function CoursePage() {
             </SectionHeader>
             {!selectedRatingGroup ? (
               <EmptyState>Для рейтинга пока нет группы.</EmptyState>
-            ) : selectedRatingGroup.leaderboard.length === 0 ? (
+            ) : leaderboardEntries.length === 0 ? (
               <EmptyState>В этой группе пока нет учеников с результатами.</EmptyState>
             ) : (
               <LeaderboardList>
-                {selectedRatingGroup.leaderboard.map((entry, index) => (
+                {isStudent && leaderboardPage?.myRank && (
+                  <SectionText>Ваше место в группе: {leaderboardPage.myRank}</SectionText>
+                )}
+                {leaderboardEntries.map((entry, index) => (
                   <LeaderboardRow key={`${selectedRatingGroup.id}-${entry.user_id}`}>
-                    <LeaderboardPlace>{index + 1}</LeaderboardPlace>
+                    <LeaderboardPlace>{entry.rank || index + 1}</LeaderboardPlace>
                     <LeaderboardPerson>
                       <strong>{entry.name} {entry.surname}</strong>
                       <small>@{entry.tg_username}</small>
@@ -841,6 +880,16 @@ function CoursePage() {
                     <LeaderboardPoints>{entry.points} XP</LeaderboardPoints>
                   </LeaderboardRow>
                 ))}
+                {leaderboardPage?.groupId === selectedRatingGroup.id &&
+                  leaderboardEntries.length < leaderboardPage.total && (
+                    <GhostButton
+                      type="button"
+                      onClick={() => loadLeaderboard(selectedRatingGroup.id, leaderboardEntries.length)}
+                      disabled={leaderboardLoading}
+                    >
+                      {leaderboardLoading ? "Загружаю..." : "Показать еще"}
+                    </GhostButton>
+                  )}
               </LeaderboardList>
             )}
           </SectionCard>
@@ -10,9 +10,10 @@ import {
   createTask,
   deleteTask,
   getLessonDetail,
+  getTaskSubmissions,
   runTaskCode,
   reviewTaskSubmission,
-  submitTask,
+  submitTaskStream,
   updateLesson,
   updateTask,
 } from "../api/learning";
@@ -38,10 +39,19 @@ function createEmptyTaskForm(language = "python") {
     attachments: "",
     requires_manual_review: false,
     tests: [{ input_data: "", expected_output: "", is_public: true }],
+    check_mode: "exact",
+    float_tolerance: 0.000001,
     order: 0,
   };
 }
 
+const checkModeOptions = [
+  { value: "exact", label: "Точное совпадение" },
+  { value: "tokens", label: "По словам, без учета пробелов" },
+  { value: "float", label: "Числа с погрешностью" },
+  { value: "unordered_lines", label: "Строки в любом порядке" },
+];
+
 const statusMetaMap = {
   no_attempts: {
     label: "Нет попыток",
@@ -101,6 +111,8 @@ function createTaskEditor(task) {
     language: normalizeTaskLanguage(task.language || "python"),
     attachments: (task.attachments || []).join("\n"),
     requires_manual_review: Boolean(task.requires_manual_review),
+    check_mode: task.check_mode || "exact",
+    float_tolerance: task.float_tolerance ?? 0.000001,
     order: task.order || 0,
     tests:
       task.tests && task.tests.length > 0
@@ -364,6 +376,35 @@ function TaskEditorFields({
           <span>После автотестов отправлять задачу на ручную проверку</span>
         </ToggleLabel>
       </SubCard>
+      <Grid2>
+        <Field>
+          <Label>Сравнение вывода</Label>
+          <Select
+            value={form.check_mode || "exact"}
+            onChange={(event) => onFieldChange("check_mode", event.target.value)}
+          >
+            {checkModeOptions.map((option) => (
+              <option key={option.value} value={option.value}>
+                {option.label}
+              </option>
+            ))}
+          </Select>
+        </Field>
+        {form.check_mode === "float" && (
+          <Field>
+            <Label>Допустимая погрешность</Label>
+            <Input
+              type="number"
+              min="0"
+              step="any"
+              value={form.float_tolerance}
+              onChange={(event) =>
+                onFieldChange("float_tolerance", event.target.value)
+              }
+            />
+          </Field>
+        )}
+      </Grid2>
       <Field>
         <Label>Стартовый код</Label>
         <CodeEditor
@@ -450,6 +491,7 @@ function LessonPage() {
   const [showCreateTask, setShowCreateTask] = useState(false);
   const [editingTaskId, setEditingTaskId] = useState("");
   const [historyDrawer, setHistoryDrawer] = useState(null);
+  const [submissionHistories, setSubmissionHistories] = useState({});
   const taskRefs = useRef({});
   const lessonRailRefs = useRef({});
   const { pushAchievements } = useAchievementToasts();
@@ -516,6 +558,41 @@ function LessonPage() {
     loadLesson();
   }, [loadLesson]);
 
+  const loadSubmissionHistory = useCallback(async (taskId, offset = 0) => {
+    setSubmissionHistories((prev) => ({
+      ...prev,
+      [taskId]: { items: [], total: 0, ...prev[taskId], loading: true },
+    }));
+    try {
+      const page = await getTaskSubmissions(taskId, { offset });
+      setSubmissionHistories((prev) => ({
+        ...prev,
+        [taskId]: {
+          items: offset > 0 ? [...(prev[taskId]?.items || []), ...page.items] : page.items,
+          total: page.total,
+          loading: false,
+        },
+      }));
+    } catch (err) {
+      setSubmissionHistories((prev) => ({
+        ...prev,
+        [taskId]: { ...prev[taskId], loading: false },
+      }));
+      setError(err.message || "Не удалось загрузить историю попыток");
+    }
+  }, []);
+
+  useEffect(() => {
+    if (!data || data.lesson?.can_edit) {
+      return;
+    }
+    Object.entries(expandedTasks).forEach(([taskId, expanded]) => {
+      if (expanded && !submissionHistories[taskId]) {
+        loadSubmissionHistory(taskId);
+      }
+    });
+  }, [data, expandedTasks, submissionHistories, loadSubmissionHistory]);
+
   useEffect(() => {
     const activeNode = lessonRailRefs.current[lessonId];
     if (!activeNode) {
@@ -715,6 +792,7 @@ function LessonPage() {
         topic_id: lessonId,
         language: courseLanguage,
         points: Number(newTask.points || 0),
+        float_tolerance: Number(newTask.float_tolerance || 0),
         order: Number(newTask.order || 0),
         attachments: newTask.attachments
           .split("\n")
@@ -739,6 +817,7 @@ function LessonPage() {
         ...editor,
         language: courseLanguage,
         points: Number(editor.points || 0),
+        float_tolerance: Number(editor.float_tolerance || 0),
         order: Number(editor.order || 0),
         attachments: editor.attachments
           .split("\n")
@@ -771,11 +850,23 @@ function LessonPage() {
       return;
     }
     await runAction(`submit-${taskId}`, async () => {
-      const response = await submitTask(taskId, {
-        code: studentCodes[taskId] || "",
-      });
+      setNotice("Решение проверяется...");
+      const response = await submitTaskStream(
+        taskId,
+        { code: studentCodes[taskId] || "" },
+        (progress) => {
+          setNotice(`Проверено тестов: ${progress.index} из ${progress.total}`);
+        },
+        (position) => {
+          setNotice(`Решение в очереди на проверку. Место в очереди: ${position}`);
+        }
+      );
       pushAchievements(response.newly_unlocked_achievements || []);
       setNotice("Решение отправлено на проверку.");
+      setSubmissionHistories((prev) => {
+        const { [taskId]: _stale, ...rest } = prev;
+        return rest;
+      });
       await loadLesson({ showLoader: false });
     });
   };
@@ -1036,7 +1127,8 @@ function LessonPage() {
             const statusMeta = getStatusMeta(result?.status || "no_attempts");
             const lastSubmission = result?.last_submission;
             const bestSubmission = result?.best_submission;
-            const submissionHistory = result?.submission_history || [];
+            const submissionHistory = submissionHistories[task.id];
+            const historyItems = submissionHistory?.items || [];
             const pendingReviews = task.pending_reviews || [];
             const isSolved = result?.status === "correct";
             const isExpanded = Boolean(expandedTasks[task.id]);
@@ -1051,8 +1143,8 @@ function LessonPage() {
               lastSubmission?.passed
             );
             const attemptsToShow =
-              submissionHistory.length > 0
-                ? submissionHistory
+              historyItems.length > 0
+                ? historyItems
                 : lastSubmission
                 ? [lastSubmission]
                 : [];
@@ -1440,6 +1532,22 @@ function LessonPage() {
                                 </AttemptButton>
                               ))}
                             </AttemptList>
+                            {historyItems.length > 0 &&
+                              historyItems.length < submissionHistory.total && (
+                                <ButtonRow>
+                                  <SecondaryButton
+                                    type="button"
+                                    onClick={() =>
+                                      loadSubmissionHistory(task.id, historyItems.length)
+                                    }
+                                    disabled={submissionHistory.loading}
+                                  >
+                                    {submissionHistory.loading
+                                      ? "Загружаю..."
+                                      : "Показать еще попытки"}
+                                  </SecondaryButton>
+                                </ButtonRow>
+                              )}
                           </Stack>
                         )}
                       </>
@@ -1781,6 +1889,15 @@ const Input = styled.input`
   background: #fff;
 `;
 
+const Select = styled.select`
+  width: 100%;
+  border: 1px solid #d7dbe4;
+  border-radius: 12px;
+  padding: 13px 14px;
+  font: inherit;
+  background: #fff;
+`;
+
 const ReadonlyFieldValue = styled.div`
   width: 100%;
   border: 1px solid #d7dbe4;